@@ -0,0 +1,70 @@
+import argparse
+import json
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from protocol_aura.data.loader import EMBEDDINGS_FILE, MANIFOLD_FILE, load_catalog
+from protocol_aura.data.registry import CatalogEntry
+from protocol_aura.data.synthetic import write_synthetic_catalog
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk catalog loading")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--dir", type=str, default="", help="Reuse or create the catalog here")
+    parser.add_argument("--output", type=str, default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    directory = Path(args.dir) if args.dir else Path(tempfile.mkdtemp()) / "catalog"
+    if not (directory / MANIFOLD_FILE).exists():
+        start = time.perf_counter()
+        write_synthetic_catalog(directory, args.products, args.dims)
+        print(f"generated {args.products} products in {time.perf_counter() - start:.1f}s")
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    manifold = load_catalog(directory)
+    load_s = time.perf_counter() - start
+    rss_loaded = rss_mb()
+
+    start = time.perf_counter()
+    entry = CatalogEntry(manifold)
+    index_s = time.perf_counter() - start
+    rss_indexed = rss_mb()
+
+    start = time.perf_counter()
+    for row in range(0, len(entry), max(1, len(entry) // 1000)):
+        manifold.products[row]
+    materialize_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    results = {
+        "products": len(entry),
+        "embedding_dims": int(entry.embeddings.shape[1]) if entry.embeddings is not None else 0,
+        "embeddings_on_disk_mb": round((directory / EMBEDDINGS_FILE).stat().st_size / 2**20, 1),
+        "load_s": round(load_s, 2),
+        "index_s": round(index_s, 2),
+        "rss_load_mb": round(rss_loaded - rss_before, 1),
+        "rss_index_mb": round(rss_indexed - rss_loaded, 1),
+        "materialize_product_us": round(materialize_us, 1),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import os
+
+os.environ.setdefault("AURA_DEMO_MODE", "true")
+os.environ.setdefault("AURA_SIMULATE_LATENCY", "false")
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from protocol_aura.agents import BoutiqueAgent, ShopperAgent
+from protocol_aura.core.diagnostics import memory_report, probe_growth
+from protocol_aura.core.inventory import InventoryService
+from protocol_aura.core.receipts import build_receipt, prove_message, verify_proof, verify_receipts
+from protocol_aura.core.negotiation import NegotiationEngine, NegotiationStatus
+from protocol_aura.data import catalog_registry
+from protocol_aura.data.ann import build_ivf, exact_search
+from protocol_aura.data.indexes import constraint_mask
+from protocol_aura.data.loader import load_catalog
+from protocol_aura.data.registry import CatalogEntry
+from protocol_aura.data.synthetic import write_synthetic_catalog
+from protocol_aura.protocol.embeddings import HashingEmbedder
+from protocol_aura.protocol import (
+    Mandate,
+    decode_message,
+    dump_message,
+    encode_message,
+    parse_message,
+    vibe_service,
+)
+
+
+PROMPT = "Cyber CEO who codes at night and DJs on weekends"
+BUDGET = 400.0
+CATALOG_SIZES = (1_000, 10_000, 100_000)
+QUICK_CATALOG_SIZES = (1_000, 10_000)
+CATALOG_DIMS = 64
+RESERVATION_TTL_SECONDS = 60
+
+
+def _timed(fn: Callable, number: int, loop: asyncio.AbstractEventLoop, is_async: bool) -> float:
+    if is_async:
+        async def many():
+            for _ in range(number):
+                await fn()
+
+        start = time.perf_counter()
+        loop.run_until_complete(many())
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable, loop: asyncio.AbstractEventLoop, repeat: int = 5, target_s: float = 0.05) -> dict:
+    probe = fn()
+    is_async = inspect.isawaitable(probe)
+    if is_async:
+        loop.run_until_complete(probe)
+
+    number = 1
+    while _timed(fn, number, loop, is_async) < target_s and number < 1_000_000:
+        number *= 2
+    samples = [_timed(fn, number, loop, is_async) / number * 1e6 for _ in range(repeat)]
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "max_us": round(max(samples), 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _shopper() -> ShopperAgent:
+    return ShopperAgent(
+        user_id="bench-user",
+        user_name="Bench Shopper",
+        mandate=Mandate(user_id="bench-user", budget_cap=BUDGET),
+        style_goal=PROMPT,
+    )
+
+
+def build_cases(loop: asyncio.AbstractEventLoop, sizes: tuple[int, ...], workdir: Path) -> dict[str, Callable]:
+    shopper = _shopper()
+    target = loop.run_until_complete(shopper.initialize_vibe(PROMPT))
+    query = loop.run_until_complete(shopper.create_query(PROMPT))
+    other = catalog_registry.get("cyber-noir").manifold.vibe_center
+    inventory = InventoryService(catalog_registry, ttl_seconds=RESERVATION_TTL_SECONDS)
+
+    cases: dict[str, Callable] = {
+        "vibe.demo_generate": lambda: vibe_service.generate_vibe_vector(PROMPT),
+        "similarity.pairwise": lambda: target.similarity(other),
+    }
+
+    for size in sizes:
+        directory = workdir / f"catalog-{size}"
+        if not directory.exists():
+            write_synthetic_catalog(directory, size, CATALOG_DIMS)
+        entry = CatalogEntry(load_catalog(directory))
+        boutique = BoutiqueAgent(
+            store_id=entry.store_id,
+            store_name=entry.manifold.store_name,
+            manifold=entry.manifold,
+            flexibility=0.6,
+            catalog=entry,
+            inventory=inventory,
+            history_limit=0,
+        )
+        allowed = constraint_mask(entry, query.constraints)
+        in_stock = inventory.in_stock_mask(entry)
+        eligible = allowed & in_stock
+
+        cases[f"similarity.batch[{size}]"] = lambda entry=entry: target.similarity_batch(entry.axis_matrix)
+        cases[f"bundle.budget_fit[{size}]"] = (
+            lambda b=boutique, e=entry, el=eligible, al=allowed, st=in_stock: b._build_budget_fit_bundle(query, e, el, al, st)
+        )
+        cases[f"bundle.vibe_fit[{size}]"] = (
+            lambda b=boutique, e=entry, el=eligible, al=allowed: b._build_vibe_fit_bundle(query, e, el, al)
+        )
+        cases[f"boutique.query[{size}]"] = lambda b=boutique: b.process_message(query)
+
+        probe = np.asarray(entry.embeddings[size // 2]) + 0.01
+        index = build_ivf(entry.embeddings)
+        cases[f"ann.exact[{size}]"] = lambda e=entry, p=probe: exact_search(e.embeddings, p, 64)
+        cases[f"ann.ivf[{size}]"] = lambda e=entry, i=index, p=probe: i.search(e.embeddings, p, 64)
+
+    embedder = HashingEmbedder(768)
+    descriptions = [f"{name} {text}" for name, text in zip(entry.products.names, entry.products.descriptions)][:1000]
+    cases["embed.hashing[1000]"] = lambda: embedder.embed(descriptions)
+
+    engine = NegotiationEngine(max_sessions=128)
+    manifold = catalog_registry.get("cyber-noir").manifold
+    store = BoutiqueAgent(
+        manifold.store_id, manifold.store_name, manifold, flexibility=0.6, inventory=inventory, history_limit=0
+    )
+
+    async def negotiate():
+        negotiator = _shopper()
+        negotiator.target_vibe = target
+        session = await engine.start_negotiation(negotiator, store, PROMPT)
+        # Accepted bundles stay held; hand them back so repeated runs don't sell out.
+        await engine.cancel(session, store)
+        return session
+
+    session = loop.run_until_complete(negotiate())
+    offer = session.rounds[0].store_message
+    sessions = {s.session_id: s for s in [session, *(loop.run_until_complete(negotiate()) for _ in range(99))]}
+    # The negotiation and receipt cases are meant to time the accept path.
+    _require_accepted(sessions.values())
+    receipts = [build_receipt(s) for s in sessions.values()]
+    proof = prove_message(session, 1)
+    offer_json = dump_message(offer)
+    offer_binary = encode_message(offer)
+
+    cases.update({
+        "negotiation.start": _accepted_only(negotiate),
+        "transcript.build": lambda: engine.get_transcript(session),
+        "receipt.build": lambda: build_receipt(session),
+        "receipt.prove": lambda: prove_message(session, 1),
+        "receipt.verify_proof": lambda: verify_proof(proof),
+        "receipt.verify_batch[100]": lambda: verify_receipts(receipts, sessions),
+        "serialize.offer_json_dump": lambda: dump_message(offer),
+        "serialize.offer_json_parse": lambda: parse_message(offer_json),
+        "serialize.offer_binary_encode": lambda: encode_message(offer),
+        "serialize.offer_binary_decode": lambda: decode_message(offer_binary),
+    })
+    return cases
+
+
+def _require_accepted(sessions):
+    statuses = Counter(session.status.value for session in sessions)
+    if set(statuses) != {NegotiationStatus.ACCEPTED.value}:
+        raise RuntimeError(f"Benchmark negotiations did not all end accepted: {dict(statuses)}")
+
+
+def _accepted_only(negotiate: Callable) -> Callable:
+    async def run():
+        session = await negotiate()
+        if session.status != NegotiationStatus.ACCEPTED:
+            _require_accepted([session])
+        return session
+    return run
+
+
+def memory_profile(loop: asyncio.AbstractEventLoop, iterations: int) -> dict:
+    engine = NegotiationEngine(max_sessions=iterations * 2, record_outcomes=False)
+    manifold = catalog_registry.get("cyber-noir").manifold
+    inventory = InventoryService(catalog_registry, ttl_seconds=RESERVATION_TTL_SECONDS)
+    store = BoutiqueAgent(manifold.store_id, manifold.store_name, manifold, flexibility=0.6, inventory=inventory)
+
+    async def negotiate():
+        session = await engine.start_negotiation(_shopper(), store, PROMPT)
+        await engine.cancel(session, store)
+        return session
+
+    growth = loop.run_until_complete(probe_growth(negotiate, iterations=iterations))
+    report = memory_report(engine, [store], catalog_registry.loaded(), top=0)
+    return {
+        "session_bytes": report["sessions"],
+        "agent_history": report["agents"],
+        "catalogs": report["catalogs"],
+        "retained_bytes_per_negotiation": growth["retained_bytes_per_iteration"],
+        "growing_types": {name: series[-1] - series[0] for name, series in growth["growing_types"].items()},
+        "growing_allocations": growth["growing_allocations"],
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = result["median_us"] / previous["median_us"] if previous["median_us"] else 1.0
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:40s} {previous['median_us']:>12.2f}us -> {result['median_us']:>12.2f}us  x{ratio:.2f} {marker}")
+        if marker:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the negotiation hot paths")
+    parser.add_argument("--quick", action="store_true", help="Skip the largest catalog size")
+    parser.add_argument("--filter", type=str, default="", help="Only run cases containing this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workdir", type=str, default="", help="Reuse synthetic catalogs from here")
+    parser.add_argument("--output", type=str, default="", help="Write results as JSON")
+    parser.add_argument("--baseline", type=str, default="", help="Compare against a previous JSON run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing")
+    parser.add_argument("--memory", type=int, default=0, help="Also profile memory over this many negotiations")
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp())
+    loop = asyncio.new_event_loop()
+    cases = build_cases(loop, QUICK_CATALOG_SIZES if args.quick else CATALOG_SIZES, workdir)
+
+    results = {}
+    for name, fn in cases.items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(fn, loop, repeat=args.repeat)
+        print(f"{name:40s} {results[name]['median_us']:>12.2f}us")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+        },
+        "results": results,
+    }
+    if args.memory:
+        report["memory"] = memory_profile(loop, args.memory)
+        memory = report["memory"]
+        print(f"{'memory.session_mean':40s} {memory['session_bytes'].get('mean_bytes', 0):>12d}B")
+        print(f"{'memory.retained_per_negotiation':40s} {memory['retained_bytes_per_negotiation']:>12d}B")
+        for name, growth in memory["growing_types"].items():
+            print(f"{'memory.growing.' + name:40s} {growth:>+12d}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Optional
 from protocol_aura.protocol import (
     AuraMessage,
@@ -9,10 +10,10 @@ from protocol_aura.protocol import (
 
 
 class BaseAgent(ABC):
-    def __init__(self, agent_id: str, name: str):
+    def __init__(self, agent_id: str, name: str, history_limit: Optional[int] = None):
         self.agent_id = agent_id
         self.name = name
-        self.conversation_history: list[AuraMessage] = []
+        self.conversation_history: deque[AuraMessage] = deque(maxlen=history_limit)
     
     @abstractmethod
     async def process_message(self, message: AuraMessage) -> Optional[AuraMessage]:
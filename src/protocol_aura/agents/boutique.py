@@ -1,10 +1,17 @@
 from typing import Optional
+import asyncio
 import random
 import time
 import uuid
 
+import numpy as np
+
 from protocol_aura.agents.base import BaseAgent
 from protocol_aura.core.config import settings
+from protocol_aura.core.inventory import InventoryService, inventory_service
+from protocol_aura.core.metrics import span
+from protocol_aura.data.indexes import constraint_mask
+from protocol_aura.data.registry import CatalogEntry, catalog_registry
 from protocol_aura.protocol import (
     AuraMessage,
     AuraProfile,
@@ -15,6 +22,7 @@ from protocol_aura.protocol import (
     AuraReject,
     VibeTransformation,
     ConstraintCheck,
+    Constraints,
     OfferBundle,
     BrandManifold,
     Product,
@@ -67,24 +75,56 @@ class BoutiqueAgent(BaseAgent):
         store_name: str,
         manifold: BrandManifold,
         flexibility: float = 0.5,
+        catalog: Optional[CatalogEntry] = None,
+        inventory: Optional[InventoryService] = None,
+        history_limit: Optional[int] = None,
     ):
-        super().__init__(agent_id=store_id, name=store_name)
+        super().__init__(agent_id=store_id, name=store_name, history_limit=history_limit)
         self.manifold = manifold
         self.flexibility = flexibility
+        self.inventory = inventory or inventory_service
+        self._catalog = catalog or self._resolve_catalog(manifold)
+    
+    @staticmethod
+    def _resolve_catalog(manifold: BrandManifold) -> Optional[CatalogEntry]:
+        try:
+            entry = catalog_registry.get(manifold.store_id)
+        except ValueError:
+            entry = None
+        if entry is not None and entry.manifold is manifold:
+            return None
+        return CatalogEntry(manifold)
+    
+    @property
+    def catalog(self) -> CatalogEntry:
+        return self._catalog or catalog_registry.get(self.manifold.store_id)
     
     async def process_message(self, message: AuraMessage) -> Optional[AuraMessage]:
         self.log_message(message)
         
         if isinstance(message, AuraQuery):
-            return await self._handle_query(message)
+            with span("boutique.query"):
+                return await self._handle_query(message)
+        if isinstance(message, AuraAccept):
+            with span("boutique.accept"):
+                return self._handle_accept(message)
         return None
     
-    async def _handle_query(self, query: AuraQuery) -> AuraOffer:
+    async def _handle_query(self, query: AuraQuery) -> AuraMessage:
         start_time = time.time()
-        time.sleep(random.uniform(0.12, 0.35))
+        if settings.simulate_latency:
+            await asyncio.sleep(random.uniform(0.12, 0.35))
         
-        option_a = self._build_budget_fit_bundle(query)
-        option_b = self._build_vibe_fit_bundle(query) if option_a.total_price != query.constraints.max_budget else None
+        catalog = self.catalog
+        with span("boutique.filter"):
+            in_stock = self.inventory.in_stock_mask(catalog)
+            if not in_stock.any():
+                return self._sold_out(query)
+            allowed = constraint_mask(catalog, query.constraints)
+            eligible = allowed & in_stock
+        with span("boutique.bundle"):
+            option_a = self._build_budget_fit_bundle(query, catalog, eligible, allowed, in_stock)
+            option_b = self._build_vibe_fit_bundle(query, catalog, eligible, allowed) if option_a.total_price != query.constraints.max_budget and eligible.any() else None
         
         if option_b and option_b.match_score > option_a.match_score + 0.05:
             recommended = "B"
@@ -110,23 +150,78 @@ class BoutiqueAgent(BaseAgent):
         self.log_message(offer)
         return offer
     
-    def _build_budget_fit_bundle(self, query: AuraQuery) -> OfferBundle:
-        budget = query.constraints.max_budget
-        products = [p for p in self.manifold.products if p.price <= budget * 0.6]
-        products.sort(key=lambda p: p.price)
+    def _sold_out(self, query: AuraQuery) -> AuraReject:
+        reject = AuraReject(
+            sender_id=self.agent_id,
+            recipient_id=query.shopper_id,
+            session_id=query.session_id,
+            turn_id=query.turn_id + 1,
+            in_reply_to=query.message_id,
+            reason="Sold out: nothing in stock to offer",
+            constraint_violations=[ConstraintCheck(
+                constraint="stock",
+                satisfied=False,
+                actual_value="0 items",
+                required_value="in stock",
+                message="Every product is sold out or held by another shopper",
+            )],
+            would_accept_if="Try again once stock is released",
+        )
+        self.log_message(reject)
+        return reject
+    
+    def _handle_accept(self, accept: AuraAccept) -> Optional[AuraReject]:
+        catalog = self.catalog
+        reservation = self.inventory.reserve(
+            catalog,
+            [p.id for p in accept.accepted_products],
+            session_id=accept.session_id,
+        )
+        if reservation:
+            return None
         
-        selected = []
-        total = 0.0
-        for p in products:
-            if total + p.price <= budget:
-                selected.append(p)
-                total += p.price
-            if len(selected) >= 3:
-                break
+        in_stock = self.inventory.in_stock_mask(catalog)
+        unavailable = [
+            p.name for p in accept.accepted_products
+            if catalog.row_of(p.id) is None or not in_stock[catalog.row_of(p.id)]
+        ]
+        reject = AuraReject(
+            sender_id=self.agent_id,
+            recipient_id=accept.shopper_id,
+            session_id=accept.session_id,
+            turn_id=accept.turn_id + 1,
+            in_reply_to=accept.message_id,
+            reason=f"Out of stock: {', '.join(unavailable)}" if unavailable else "Bundle no longer available",
+            constraint_violations=[ConstraintCheck(
+                constraint="stock",
+                satisfied=False,
+                actual_value="unavailable",
+                required_value="in stock",
+                message="Items sold out while negotiating",
+            )],
+            would_accept_if="Re-negotiate against current inventory",
+        )
+        self.log_message(reject)
+        return reject
+    
+    def _build_budget_fit_bundle(
+        self,
+        query: AuraQuery,
+        catalog: CatalogEntry,
+        eligible: np.ndarray,
+        allowed: np.ndarray,
+        in_stock: np.ndarray,
+    ) -> OfferBundle:
+        budget = query.constraints.max_budget
+        candidates = catalog.price_order[eligible[catalog.price_order]]
+        rows = candidates[catalog.prices[candidates] <= budget * 0.6][:3]
+        rows = rows[np.cumsum(catalog.prices[rows]) <= budget]
         
-        if not selected:
-            selected = [min(self.manifold.products, key=lambda p: p.price)]
-            total = selected[0].price
+        if not len(rows):
+            fallback = candidates if len(candidates) else catalog.price_order[in_stock[catalog.price_order]]
+            rows = fallback[:1]
+        selected = [catalog.products[int(row)] for row in rows]
+        total = sum(p.price for p in selected)
         
         transformations = self._compute_transformations(query.target_vibe)
         achievable_vibe = self._apply_transformations(query.target_vibe, transformations)
@@ -142,6 +237,9 @@ class BoutiqueAgent(BaseAgent):
             required_value=f"≤${budget:.0f}",
             message=f"${total:.0f} within ${budget:.0f} cap" if budget_ok else f"Exceeds by ${total - budget:.0f}",
         )]
+        catalog_check = self._catalog_check(query, selected, rows, allowed)
+        if catalog_check:
+            constraint_checks.append(catalog_check)
         
         return OfferBundle(
             bundle_type="budget_fit",
@@ -155,8 +253,14 @@ class BoutiqueAgent(BaseAgent):
             summary=f"Budget-optimized: {len(selected)} items, ${total:.0f}",
         )
     
-    def _build_vibe_fit_bundle(self, query: AuraQuery) -> OfferBundle:
-        products = sorted(self.manifold.products, key=lambda p: p.price, reverse=True)[:3]
+    def _build_vibe_fit_bundle(
+        self, query: AuraQuery, catalog: CatalogEntry, eligible: np.ndarray, allowed: np.ndarray
+    ) -> OfferBundle:
+        rows = self._semantic_rows(query, catalog, eligible)
+        if rows is None:
+            candidates = catalog.price_order[eligible[catalog.price_order]]
+            rows = candidates[::-1][:3]
+        products = [catalog.products[int(row)] for row in rows]
         total = sum(p.price for p in products)
         
         transformations = self._compute_transformations(query.target_vibe, fewer=True)
@@ -176,6 +280,9 @@ class BoutiqueAgent(BaseAgent):
             required_value=f"≤${budget:.0f}",
             message=f"${total:.0f} within cap" if budget_ok else f"Over by ${over_by:.0f} (+{over_by/budget*100:.0f}%)",
         )]
+        catalog_check = self._catalog_check(query, products, rows, allowed)
+        if catalog_check:
+            constraint_checks.append(catalog_check)
         
         return OfferBundle(
             bundle_type="vibe_fit",
@@ -189,6 +296,42 @@ class BoutiqueAgent(BaseAgent):
             summary=f"Vibe-optimized: {len(products)} items, ${total:.0f}",
         )
     
+    def _semantic_rows(self, query: AuraQuery, catalog: CatalogEntry, eligible: np.ndarray) -> Optional[np.ndarray]:
+        with span("boutique.semantic"):
+            rows, scores = catalog.semantic_search(query.target_vibe.embedding, settings.semantic_candidates, eligible)
+        if not len(rows):
+            return None
+        axis_scores = query.target_vibe.similarity_batch(catalog.axis_matrix[rows])
+        weight = settings.semantic_weight
+        combined = weight * np.clip(scores, 0.0, 1.0) + (1 - weight) * axis_scores
+        return rows[np.argsort(-combined, kind="stable")[:3]]
+    
+    def _catalog_check(
+        self, query: AuraQuery, products: list[Product], rows: np.ndarray, allowed: np.ndarray
+    ) -> Optional[ConstraintCheck]:
+        constraints = query.constraints
+        requested = []
+        if constraints.categories:
+            requested.append(f"categories: {', '.join(constraints.categories)}")
+        if constraints.materials_exclude:
+            requested.append(f"no {', '.join(constraints.materials_exclude)}")
+        if constraints.min_rating > 0:
+            requested.append(f"rating ≥{constraints.min_rating:g}")
+        if constraints.delivery_days_max != Constraints.model_fields["delivery_days_max"].default:
+            requested.append(f"delivery ≤{constraints.delivery_days_max}d")
+        
+        failing = [p.name for p, row in zip(products, rows) if not allowed[row]]
+        if not failing and not requested:
+            return None
+        
+        return ConstraintCheck(
+            constraint="catalog",
+            satisfied=not failing,
+            actual_value=f"{len(products) - len(failing)}/{len(products)} items match",
+            required_value="; ".join(requested),
+            message="All items match catalog constraints" if not failing else f"Outside constraints: {', '.join(failing)}",
+        )
+    
     def _compute_distance(self, target: VibeVector, achievable: VibeVector) -> float:
         import math
         sum_sq = 0.0
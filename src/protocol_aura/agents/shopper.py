@@ -2,6 +2,7 @@ from typing import Optional
 
 from protocol_aura.agents.base import BaseAgent
 from protocol_aura.core.config import settings
+from protocol_aura.core.metrics import span
 from protocol_aura.protocol import (
     AuraMessage,
     AuraQuery,
@@ -39,10 +40,11 @@ class ShopperAgent(BaseAgent):
     async def process_message(self, message: AuraMessage) -> Optional[AuraMessage]:
         self.log_message(message)
         
-        if isinstance(message, AuraOffer):
-            return self._evaluate_offer(message)
-        elif isinstance(message, AuraCounteroffer):
-            return self._evaluate_counteroffer(message)
+        with span("shopper.evaluate"):
+            if isinstance(message, AuraOffer):
+                return self._evaluate_offer(message)
+            elif isinstance(message, AuraCounteroffer):
+                return self._evaluate_counteroffer(message)
         return None
     
     async def create_query(self, emotional_prompt: str, context: str = "", session_id: str = "") -> AuraQuery:
@@ -138,7 +140,7 @@ class ShopperAgent(BaseAgent):
         )
     
     def _check_bundle_valid(self, bundle: OfferBundle) -> bool:
-        budget_ok = all(c.satisfied for c in bundle.constraint_checks if c.constraint == "budget")
+        budget_ok = all(c.satisfied for c in bundle.constraint_checks if c.constraint in ("budget", "catalog"))
         match_ok = bundle.match_score >= 0.50
         return budget_ok and match_ok
     
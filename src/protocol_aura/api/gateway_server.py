@@ -0,0 +1,109 @@
+from typing import Optional
+import argparse
+import asyncio
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel, Field
+
+from protocol_aura.core.config import settings
+from protocol_aura.protocol.embeddings import HashingEmbedder, vibe_service
+from protocol_aura.protocol.gateway import EMBEDDINGS_PATH, HEALTH_PATH, VIBES_PATH, encode_embeddings
+
+
+MAX_TEXTS = 1024
+
+
+class GatewayConfig:
+    def __init__(self):
+        self.dims = settings.vibe_dimensions
+        self.api_key = ""
+        self.batch_ms = 0.0
+        self.item_ms = 0.0
+        self._embedder: Optional[HashingEmbedder] = None
+
+    @property
+    def embedder(self) -> HashingEmbedder:
+        if self._embedder is None or self._embedder.dims != self.dims:
+            self._embedder = HashingEmbedder(self.dims)
+        return self._embedder
+
+
+class EmbeddingsRequest(BaseModel):
+    texts: list[str] = Field(max_length=MAX_TEXTS)
+    encoding: str = Field(default="float", pattern="^(float|base64)$")
+
+
+class VibesRequest(BaseModel):
+    texts: list[str] = Field(max_length=MAX_TEXTS)
+
+
+config = GatewayConfig()
+app = FastAPI(title="AURA Inference Gateway (local stand-in)")
+app.state.requests = 0
+app.state.texts = 0
+
+
+def _authorize(authorization: Optional[str]):
+    if config.api_key and authorization != f"Bearer {config.api_key}":
+        raise HTTPException(status_code=401, detail="Invalid gateway API key")
+
+
+async def _simulate(count: int):
+    # Stand-in for model cost: a fixed per-call overhead plus a per-text increment,
+    # which is the shape that makes client-side batching pay off.
+    delay = (config.batch_ms + config.item_ms * count) / 1000
+    if delay > 0:
+        await asyncio.sleep(delay)
+    app.state.requests += 1
+    app.state.texts += count
+
+
+@app.get(HEALTH_PATH)
+async def health():
+    return {
+        "status": "ok",
+        "dims": config.dims,
+        "requests": app.state.requests,
+        "texts": app.state.texts,
+    }
+
+
+@app.post(EMBEDDINGS_PATH)
+async def embeddings(request: EmbeddingsRequest, authorization: Optional[str] = Header(default=None)):
+    _authorize(authorization)
+    await _simulate(len(request.texts))
+    matrix = config.embedder.embed(request.texts)
+    if request.encoding == "base64":
+        return {"model": "hashing", "dims": config.dims, "embeddings_b64": encode_embeddings(matrix)}
+    return {"model": "hashing", "dims": config.dims, "embeddings": matrix.tolist()}
+
+
+@app.post(VIBES_PATH)
+async def vibes(request: VibesRequest, authorization: Optional[str] = Header(default=None)):
+    _authorize(authorization)
+    await _simulate(len(request.texts))
+    scored = [vibe_service.score_axes(text) for text in request.texts]
+    return {"vibes": [{"axes": axes, "description": description} for axes, description in scored]}
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Local stand-in for the AURA inference gateway")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--dims", type=int, default=settings.vibe_dimensions)
+    parser.add_argument("--api-key", type=str, default=settings.gateway_api_key, help="Require this bearer token")
+    parser.add_argument("--batch-ms", type=float, default=0.0, help="Simulated fixed cost per call")
+    parser.add_argument("--item-ms", type=float, default=0.0, help="Simulated cost per text")
+    args = parser.parse_args()
+
+    config.dims = args.dims
+    config.api_key = args.api_key
+    config.batch_ms = args.batch_ms
+    config.item_ms = args.item_ms
+    config.embedder.embed(["warm up"])
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,250 @@
+from collections import Counter, deque
+from pathlib import Path
+from typing import Optional
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+
+from protocol_aura.data.synthetic import SyntheticShopper, generate_shoppers, load_shoppers
+
+
+ENDPOINTS = {
+    "negotiate": "/negotiate",
+    "analyze-vibe": "/analyze-vibe",
+    "session": "/sessions/{id}",
+}
+DEFAULT_MIX = "negotiate=6,analyze-vibe=3,session=1"
+PERCENTILES = (50, 95, 99)
+SESSION_POOL = 1024
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name!r} (expected one of {list(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Request mix needs at least one positive weight")
+    return mix
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.statuses: Counter = Counter()
+
+    def record(self, seconds: float, status: str, ok: bool):
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        count = len(self.latencies)
+        latencies_ms = np.array(self.latencies) * 1000
+        report = {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "statuses": dict(self.statuses),
+        }
+        if count:
+            for p, value in zip(PERCENTILES, np.percentile(latencies_ms, PERCENTILES)):
+                report[f"p{p}_ms"] = round(float(value), 2)
+            report["max_ms"] = round(float(latencies_ms.max()), 2)
+        return report
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        shoppers: list[SyntheticShopper],
+        mix: dict[str, float],
+        concurrency: int = 8,
+        rate: float = 0.0,
+        seed: int = 7,
+    ):
+        self.client = client
+        self.shoppers = shoppers
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.stats = {kind: EndpointStats() for kind in self.kinds}
+        self.session_ids: deque[str] = deque(maxlen=SESSION_POOL)
+
+    def _next_kind(self) -> str:
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        if kind == "session" and not self.session_ids:
+            return "negotiate"
+        return kind
+
+    async def _send(self, kind: str) -> httpx.Response:
+        shopper = self.random.choice(self.shoppers)
+        if kind == "negotiate":
+            body = shopper.model_dump(include={"emotional_prompt", "budget", "context", "target_stores"})
+            response = await self.client.post(ENDPOINTS[kind], json=body)
+            if response.status_code == 200:
+                self.session_ids.append(response.json()["session_id"])
+            return response
+        if kind == "analyze-vibe":
+            return await self.client.post(ENDPOINTS[kind], json={"text": shopper.emotional_prompt})
+        session_id = self.random.choice(self.session_ids)
+        return await self.client.get(ENDPOINTS[kind].format(id=session_id))
+
+    async def _issue(self, kind: str, started: float):
+        stats = self.stats.setdefault(kind, EndpointStats())
+        try:
+            response = await self._send(kind)
+        except httpx.HTTPError as e:
+            stats.record(time.perf_counter() - started, type(e).__name__, ok=False)
+            return
+        stats.record(time.perf_counter() - started, str(response.status_code), ok=response.status_code < 400)
+
+    async def _closed_loop(self, deadline: float, budget: Optional[list[int]]):
+        async def worker():
+            while time.perf_counter() < deadline:
+                if budget is not None:
+                    if budget[0] <= 0:
+                        return
+                    budget[0] -= 1
+                await self._issue(self._next_kind(), time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _open_loop(self, deadline: float, budget: Optional[list[int]]):
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async def arrival(kind: str, scheduled: float):
+            # Latency is measured from the scheduled arrival so queueing behind
+            # saturated slots shows up instead of being hidden (coordinated omission).
+            async with slots:
+                await self._issue(kind, scheduled)
+
+        scheduled = time.perf_counter()
+        while scheduled < deadline and (budget is None or budget[0] > 0):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if budget is not None:
+                budget[0] -= 1
+            task = asyncio.create_task(arrival(self._next_kind(), scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            scheduled += self.random.expovariate(self.rate)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run(self, duration: float = 10.0, requests: int = 0) -> dict:
+        budget = [requests] if requests else None
+        deadline = time.perf_counter() + (duration if duration > 0 else float("inf"))
+        start = time.perf_counter()
+        if self.rate > 0:
+            await self._open_loop(deadline, budget)
+        else:
+            await self._closed_loop(deadline, budget)
+        elapsed = time.perf_counter() - start
+
+        endpoints = {
+            ENDPOINTS[kind]: stats.summary(elapsed) for kind, stats in self.stats.items() if stats.latencies
+        }
+        combined = EndpointStats()
+        for stats in self.stats.values():
+            combined.latencies.extend(stats.latencies)
+            combined.errors += stats.errors
+            combined.statuses.update(stats.statuses)
+        return {
+            "mode": "open" if self.rate > 0 else "closed",
+            "concurrency": self.concurrency,
+            "target_rate_rps": self.rate or None,
+            "elapsed_s": round(elapsed, 3),
+            "total": combined.summary(elapsed),
+            "endpoints": endpoints,
+        }
+
+
+def make_client(base_url: str = "", timeout: float = 30.0, concurrency: int = 8) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits)
+
+    from protocol_aura.api.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://aura.local",
+        timeout=timeout,
+    )
+
+
+def print_report(report: dict):
+    header = f"{'endpoint':18s} {'reqs':>7s} {'err%':>6s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}"
+    print(f"{report['mode']}-loop, concurrency {report['concurrency']}, {report['elapsed_s']}s")
+    print(header)
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:18s} {stats['requests']:>7d} {stats['error_rate'] * 100:>5.1f}% {stats['throughput_rps']:>8.1f}"
+            + "".join(f" {stats.get(key, 0.0):>6.1f}ms" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        )
+
+
+async def _main(args) -> dict:
+    if args.corpus:
+        shoppers = load_shoppers(args.corpus)
+    else:
+        shoppers = generate_shoppers(args.shoppers, args.seed)
+    if args.stores:
+        stores = [store.strip() for store in args.stores.split(",") if store.strip()]
+        shoppers = [shopper.model_copy(update={"target_stores": stores}) for shopper in shoppers]
+
+    async with make_client(args.url, args.timeout, args.concurrency) as client:
+        if args.warmup > 0:
+            await LoadGenerator(client, shoppers, parse_mix(args.mix), args.concurrency, seed=args.seed + 1).run(
+                duration=args.warmup
+            )
+        generator = LoadGenerator(client, shoppers, parse_mix(args.mix), args.concurrency, args.rate, args.seed)
+        return await generator.run(duration=args.duration, requests=args.requests)
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Drive the AURA API and report latency percentiles")
+    parser.add_argument("--url", type=str, default="", help="Server base URL (default: in-process ASGI app)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (0 = until --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers (closed loop) or max in flight (open loop)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals per second (0 = closed loop)")
+    parser.add_argument("--mix", type=str, default=DEFAULT_MIX, help="Endpoint weights, e.g. negotiate=6,session=1")
+    parser.add_argument("--corpus", type=str, default="", help="shoppers.jsonl from protocol_aura.data.synthetic")
+    parser.add_argument("--shoppers", type=int, default=500, help="Synthetic shoppers when no corpus is given")
+    parser.add_argument("--stores", type=str, default="", help="Comma-separated target stores for every shopper")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unreported warm-up traffic")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="", help="Write the report as JSON")
+    args = parser.parse_args()
+    if args.duration <= 0 and args.requests <= 0:
+        parser.error("Set --duration or --requests")
+
+    report = asyncio.run(_main(args))
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    run()
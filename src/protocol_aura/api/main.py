@@ -1,14 +1,50 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+import asyncio
+import base64
+import hashlib
+import json
+import numpy as np
 import uvicorn
 
 from protocol_aura.agents import BoutiqueAgent, ShopperAgent
-from protocol_aura.protocol import Mandate, VibeVector
-from protocol_aura.core.negotiation import negotiation_engine, NegotiationSession
+from protocol_aura.api.profiling import ProfilingMiddleware
+from protocol_aura.protocol import (
+    AURA_CONTENT_TYPE,
+    AuraAccept,
+    AuraMessage,
+    AuraQuery,
+    AuraReject,
+    Constraints,
+    Mandate,
+    MessageType,
+    Product,
+    VibeVector,
+    decode_message,
+    decode_payload,
+    dump_message,
+    encode_message,
+    parse_message,
+    vibe_service,
+)
+from protocol_aura.core.negotiation import (
+    negotiation_engine,
+    NegotiationEngine,
+    NegotiationSession,
+    NegotiationStatus,
+    TranscriptCallback,
+)
 from protocol_aura.core.config import settings
-from protocol_aura.data import get_all_boutiques, get_boutique
+from protocol_aura.core.diagnostics import memory_report, probe_growth, start_tracing
+from protocol_aura.core.export import CONTENT_TYPES, EXPORT_FORMATS, iter_export, iter_export_sessions, naive_utc
+from protocol_aura.core.inventory import InventoryService
+from protocol_aura.core.metrics import metrics, span, track_stages
+from protocol_aura.core.receipts import InclusionProof, TranscriptReceipt, build_receipt, prove_message
+from protocol_aura.data import CatalogEntry, catalog_registry, get_boutique
 
 
 app = FastAPI(
@@ -23,8 +59,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Aura-Profile-Id", "X-Aura-Profile-File", "X-Aura-Profile-Top"],
 )
 
+if settings.profile_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.profile_dir,
+        sample_rate=settings.profile_sample_rate,
+    )
+
+if settings.diagnostics_enabled:
+    start_tracing()
+
 
 class NegotiationRequest(BaseModel):
     emotional_prompt: str = Field(description="User's emotional/aesthetic goal")
@@ -40,6 +87,7 @@ class NegotiationResponse(BaseModel):
     final_products: list[dict]
     match_score: Optional[float] = None
     vibe_report: Optional[dict] = None
+    stage_timings_ms: dict[str, float] = Field(default_factory=dict)
 
 
 class VibeAnalysisRequest(BaseModel):
@@ -59,102 +107,261 @@ async def root():
     }
 
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+PRODUCT_FIELDS = frozenset(Product.model_fields)
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+def _product_projection(fields: Optional[str], include_embeddings: bool) -> dict:
+    include = None
+    if fields:
+        include = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = include - PRODUCT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown product fields: {', '.join(sorted(unknown))}")
+    exclude = None if include_embeddings else {"vibe_vector": {"embedding"}}
+    return {"include": include, "exclude": exclude}
+
+
+def _vibe_exclude(include_embeddings: bool) -> Optional[set]:
+    return None if include_embeddings else {"embedding"}
+
+
+def _encode_cursor(product_id: str, row: int) -> str:
+    raw = json.dumps([product_id, row]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        product_id, row = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(product_id), int(row)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_rows(entry: CatalogEntry, cursor: Optional[str], limit: int) -> np.ndarray:
+    start = 0
+    if cursor:
+        product_id, row = _decode_cursor(cursor)
+        found = entry.row_index.get(product_id)
+        start = (found if found is not None and found < entry.size else row) + 1
+    return np.flatnonzero(entry.active[start:])[:limit] + start
+
+
 @app.get("/boutiques", response_model=BoutiqueListResponse)
-async def list_boutiques():
-    boutiques = get_all_boutiques()
+async def list_boutiques(request: Request, response: Response):
+    entries = catalog_registry.all()
+    etag = _etag([(e.store_id, e.version) for e in entries])
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
     return BoutiqueListResponse(
         boutiques=[
             {
-                "id": b.store_id,
-                "name": b.store_name,
-                "style_tags": b.style_tags,
-                "vibe_description": b.vibe_center.description,
-                "product_count": len(b.products),
+                "id": e.manifold.store_id,
+                "name": e.manifold.store_name,
+                "style_tags": e.manifold.style_tags,
+                "vibe_description": e.manifold.vibe_center.description,
+                "product_count": len(e),
+                "catalog_version": e.version,
             }
-            for b in boutiques
+            for e in entries
         ]
     )
 
 
 @app.get("/boutiques/{store_id}")
-async def get_boutique_details(store_id: str):
+async def get_boutique_details(
+    store_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(default=None, description="Comma-separated product fields to return"),
+    include_embeddings: bool = Query(default=False, description="Include 768-d embeddings"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from a previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     try:
-        boutique = get_boutique(store_id)
-        return {
-            "id": boutique.store_id,
-            "name": boutique.store_name,
-            "style_tags": boutique.style_tags,
-            "vibe_center": boutique.vibe_center.model_dump(),
-            "vibe_boundaries": boutique.vibe_boundaries,
-            "products": [p.model_dump() for p in boutique.products],
-        }
+        entry = catalog_registry.get(store_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    
+    projection = _product_projection(fields, include_embeddings)
+    etag = _etag(store_id, entry.version, fields, include_embeddings, cursor, limit)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    rows = _page_rows(entry, cursor, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = int(rows[-1])
+        next_cursor = _encode_cursor(entry.product_ids[last], last)
+    
+    boutique = entry.manifold
+    response.headers["ETag"] = etag
+    return {
+        "id": boutique.store_id,
+        "name": boutique.store_name,
+        "style_tags": boutique.style_tags,
+        "vibe_center": boutique.vibe_center.model_dump(exclude=_vibe_exclude(include_embeddings)),
+        "vibe_boundaries": boutique.vibe_boundaries,
+        "catalog_version": entry.version,
+        "product_count": len(entry),
+        "products": [entry.products[int(row)].model_dump(**projection) for row in rows],
+        "next_cursor": next_cursor,
+    }
 
 
-@app.post("/negotiate", response_model=NegotiationResponse)
-async def start_negotiation(request: NegotiationRequest):
+DEFAULT_STORES = ["cyber-noir", "vintage-romantic", "chaotic-maximalist"]
+
+
+def _create_shopper(request: NegotiationRequest) -> ShopperAgent:
     mandate = Mandate(
         user_id="demo-user",
         budget_cap=request.budget,
         auto_purchase_enabled=False,
     )
     
-    shopper = ShopperAgent(
+    return ShopperAgent(
         user_id="demo-user",
         user_name="Demo Shopper",
         mandate=mandate,
         style_goal=request.emotional_prompt,
     )
+
+
+def _accepted_score(session: NegotiationSession) -> Optional[float]:
+    bundle = negotiation_engine.get_accepted_bundle(session)
+    return bundle.match_score if bundle else None
+
+
+def _session_summary(session: NegotiationSession) -> dict:
+    return {
+        "session_id": session.session_id,
+        "store_id": session.store_id,
+        "store_name": session.store_name,
+        "status": session.status.value,
+        "match_score": _accepted_score(session),
+        "latency_ms": session.latency_ms,
+    }
+
+
+def _rank_sessions(sessions: list[NegotiationSession]) -> list[NegotiationSession]:
+    return sorted(
+        sessions,
+        key=lambda s: (_accepted_score(s) is not None, _accepted_score(s) or 0.0),
+        reverse=True,
+    )
+
+
+def _create_boutique(
+    store_id: str,
+    history_limit: Optional[int] = None,
+    inventory: Optional[InventoryService] = None,
+) -> BoutiqueAgent:
+    manifold = get_boutique(store_id)
+    return BoutiqueAgent(
+        store_id=manifold.store_id,
+        store_name=manifold.store_name,
+        manifold=manifold,
+        flexibility=0.6,
+        inventory=inventory,
+        history_limit=history_limit,
+    )
+
+
+async def _negotiate_stores(
+    request: NegotiationRequest,
+    on_event: Optional[TranscriptCallback] = None,
+    on_session: Optional[Callable[[NegotiationSession], Awaitable[None]]] = None,
+    target_vibe: Optional[VibeVector] = None,
+    boutiques: Optional[dict[str, BoutiqueAgent]] = None,
+    engine: Optional[NegotiationEngine] = None,
+) -> list[NegotiationSession]:
+    engine = engine or negotiation_engine
+    shopper = _create_shopper(request)
+    with track_stages() as shared_timings:
+        if target_vibe is not None:
+            shopper.target_vibe = target_vibe
+        else:
+            await shopper.initialize_vibe(request.emotional_prompt)
     
-    target_stores = request.target_stores if request.target_stores else ["cyber-noir", "vintage-romantic", "chaotic-maximalist"]
-    
-    best_session = None
-    best_score = 0.0
-    
-    for store_id in target_stores:
+    async def negotiate(store_id: str) -> Optional[NegotiationSession]:
         try:
-            manifold = get_boutique(store_id)
-            boutique = BoutiqueAgent(
-                store_id=manifold.store_id,
-                store_name=manifold.store_name,
-                manifold=manifold,
-                flexibility=0.6,
-            )
+            boutique = boutiques.get(store_id) if boutiques is not None else None
+            if boutique is None:
+                boutique = _create_boutique(store_id)
             
-            session = await negotiation_engine.start_negotiation(
+            session = await engine.start_negotiation(
                 shopper=shopper,
                 boutique=boutique,
                 emotional_prompt=request.emotional_prompt,
                 context=request.context,
+                on_event=on_event,
             )
-            
-            if session.final_result and hasattr(session.final_result, "match_score"):
-                if session.final_result.match_score > best_score:
-                    best_score = session.final_result.match_score
-                    best_session = session
-            elif best_session is None:
-                best_session = session
-                
-        except Exception as e:
-            continue
-    
-    if not best_session:
+        except Exception:
+            return None
+        for stage, ms in shared_timings.items():
+            session.stage_timings_ms.setdefault(stage, round(ms, 3))
+        if on_session:
+            await on_session(session)
+        return session
+    
+    target_stores = request.target_stores or DEFAULT_STORES
+    results = await asyncio.gather(*(negotiate(store_id) for store_id in target_stores))
+    return [session for session in results if session is not None]
+
+
+@app.post("/negotiate", response_model=NegotiationResponse)
+async def start_negotiation(
+    request: NegotiationRequest,
+    include_embeddings: bool = Query(default=False, description="Include 768-d embeddings"),
+):
+    sessions = await _negotiate_stores(request)
+    if not sessions:
         raise HTTPException(status_code=500, detail="Failed to negotiate with any stores")
     
+    best_session = _rank_sessions(sessions)[0]
     transcript = negotiation_engine.get_transcript(best_session)
     
+    with span("api.serialize"):
+        return _negotiation_response(request, best_session, transcript, include_embeddings)
+
+
+def _negotiation_response(
+    request: NegotiationRequest,
+    best_session: NegotiationSession,
+    transcript: list[dict],
+    include_embeddings: bool,
+) -> NegotiationResponse:
     final_products = []
     match_score = None
     vibe_report = None
     
     if best_session.final_result:
         if hasattr(best_session.final_result, "accepted_products"):
-            final_products = [p.model_dump() for p in best_session.final_result.accepted_products]
-            match_score = best_score
+            projection = _product_projection(None, include_embeddings)
+            final_products = [p.model_dump(**projection) for p in best_session.final_result.accepted_products]
+            match_score = _accepted_score(best_session)
+            final_vibe = best_session.final_result.final_vibe
             vibe_report = {
                 "original_prompt": request.emotional_prompt,
-                "achieved_vibe": best_session.final_result.final_vibe.model_dump() if best_session.final_result.final_vibe else None,
+                "achieved_vibe": final_vibe.model_dump(exclude=_vibe_exclude(include_embeddings)) if final_vibe else None,
                 "transformations": [
                     t.model_dump() for t in best_session.final_result.transformations_accepted
                 ] if hasattr(best_session.final_result, "transformations_accepted") else [],
@@ -167,13 +374,274 @@ async def start_negotiation(request: NegotiationRequest):
         final_products=final_products,
         match_score=match_score,
         vibe_report=vibe_report,
+        stage_timings_ms=best_session.stage_timings_ms,
+    )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/negotiate/stream")
+async def stream_negotiation(request: NegotiationRequest):
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_event(session: NegotiationSession, entry: dict):
+        queue.put_nowait(_sse("transcript", {
+            "session_id": session.session_id,
+            "store_id": session.store_id,
+            "entry": entry,
+        }))
+    
+    async def on_session(session: NegotiationSession):
+        queue.put_nowait(_sse("session", _session_summary(session)))
+    
+    async def events():
+        task = asyncio.create_task(_negotiate_stores(request, on_event=on_event, on_session=on_session))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+            sessions = task.result()
+            if not sessions:
+                yield _sse("error", {"detail": "Failed to negotiate with any stores"})
+                return
+            yield _sse("ranking", [_session_summary(s) for s in _rank_sessions(sessions)])
+        finally:
+            task.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchNegotiationRequest(BaseModel):
+    requests: list[NegotiationRequest] = Field(description="Negotiations to run")
+    concurrency: int = Field(default=8, ge=1, le=64, description="Negotiations in flight at once")
+    include_transcript: bool = Field(default=False, description="Include the best session's transcript")
+
+
+VIBE_BATCH_SIZE = 32
+
+
+async def _iter_batch_results(batch: BatchNegotiationRequest):
+    store_ids = {
+        store_id
+        for request in batch.requests
+        for store_id in (request.target_stores or DEFAULT_STORES)
+    }
+    boutiques = {}
+    for store_id in store_ids:
+        try:
+            boutiques[store_id] = _create_boutique(store_id, history_limit=0)
+        except ValueError:
+            pass
+    
+    work: asyncio.Queue = asyncio.Queue(maxsize=batch.concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=batch.concurrency)
+    
+    async def produce():
+        for start in range(0, len(batch.requests), VIBE_BATCH_SIZE):
+            chunk = batch.requests[start:start + VIBE_BATCH_SIZE]
+            vibes = await vibe_service.generate_vibe_vectors([r.emotional_prompt for r in chunk])
+            for offset, (request, vibe) in enumerate(zip(chunk, vibes)):
+                await work.put((start + offset, request, vibe))
+        for _ in range(batch.concurrency):
+            await work.put(None)
+    
+    async def consume():
+        while (item := await work.get()) is not None:
+            index, request, vibe = item
+            sessions = await _negotiate_stores(request, target_vibe=vibe, boutiques=boutiques)
+            result = {"index": index, "emotional_prompt": request.emotional_prompt}
+            if sessions:
+                ranked = _rank_sessions(sessions)
+                result["best"] = _session_summary(ranked[0])
+                result["sessions"] = [_session_summary(s) for s in ranked]
+                if batch.include_transcript:
+                    result["transcript"] = negotiation_engine.get_transcript(ranked[0])
+            else:
+                result["error"] = "Failed to negotiate with any stores"
+            await results.put(json.dumps(result) + "\n")
+    
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(consume()) for _ in range(batch.concurrency)]
+    done = asyncio.gather(*tasks)
+    try:
+        while True:
+            line = asyncio.ensure_future(results.get())
+            await asyncio.wait({line, done}, return_when=asyncio.FIRST_COMPLETED)
+            if not line.done():
+                line.cancel()
+                break
+            yield line.result()
+        while not results.empty():
+            yield results.get_nowait()
+        done.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/negotiate/batch")
+async def batch_negotiation(batch: BatchNegotiationRequest):
+    return StreamingResponse(_iter_batch_results(batch), media_type="application/x-ndjson")
+
+
+_session_boutiques: dict[str, BoutiqueAgent] = {}
+
+
+def _session_boutique(store_id: str) -> BoutiqueAgent:
+    boutique = _session_boutiques.get(store_id)
+    if boutique is None or boutique.manifold is not get_boutique(store_id):
+        boutique = _session_boutiques[store_id] = _create_boutique(store_id, history_limit=0)
+    return boutique
+
+
+def _merge_query(previous: AuraQuery, frame: dict) -> AuraQuery:
+    delta = {k: v for k, v in frame.items() if k not in ("message_id", "timestamp")}
+    if "constraints" in delta:
+        if not isinstance(delta["constraints"], dict):
+            raise ValueError("constraints must be a JSON object of fields to change")
+        delta["constraints"] = Constraints.model_validate({
+            **previous.constraints.model_dump(),
+            **delta["constraints"],
+        })
+    fields = {k: v for k, v in previous if k not in ("message_id", "timestamp")}
+    return AuraQuery.model_validate({**fields, **delta})
+
+
+def _protocol_error(store_id: str, shopper_id: str, session_id: str, reason: str) -> AuraReject:
+    return AuraReject(
+        sender_id=store_id,
+        recipient_id=shopper_id,
+        session_id=session_id,
+        reason=reason,
     )
 
 
+async def _send_frame(websocket: WebSocket, message: AuraMessage, binary: bool):
+    if binary:
+        await websocket.send_bytes(encode_message(message))
+    else:
+        await websocket.send_text(dump_message(message).decode())
+
+
+@app.websocket("/ws/{store_id}")
+async def negotiation_socket(websocket: WebSocket, store_id: str):
+    try:
+        boutique = _session_boutique(store_id)
+    except ValueError:
+        await websocket.close(code=4404, reason="Unknown boutique")
+        return
+    
+    await websocket.accept()
+    session = None
+    query: Optional[AuraQuery] = None
+    
+    try:
+        while True:
+            try:
+                incoming = await asyncio.wait_for(websocket.receive(), settings.ws_idle_timeout_seconds)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1001, reason="Idle timeout")
+                return
+            if incoming["type"] == "websocket.disconnect":
+                return
+            binary = incoming.get("bytes") is not None
+            raw = incoming["bytes"] if binary else incoming["text"]
+            
+            session_id = session.session_id if session else ""
+            shopper_id = query.shopper_id if query else ""
+            try:
+                message: AuraMessage
+                if query is None:
+                    message = decode_message(raw) if binary else parse_message(raw)
+                    if not isinstance(message, AuraQuery):
+                        raise ValueError("First message must be a full AURA_QUERY")
+                else:
+                    frame = decode_payload(raw) if binary else json.loads(raw)
+                    if not isinstance(frame, dict):
+                        raise ValueError("Message must be a JSON object")
+                    frame["session_id"] = session_id
+                    if frame.get("type") == MessageType.AURA_QUERY.value:
+                        message = _merge_query(query, frame)
+                    else:
+                        message = parse_message(frame)
+                        if not isinstance(message, (AuraAccept, AuraReject)):
+                            raise ValueError(f"Unsupported message type: {message.type.value}")
+                        if isinstance(message, AuraAccept):
+                            message = negotiation_engine.resolve_accept(session, message)
+            except ValueError as e:
+                reply = _protocol_error(store_id, shopper_id, session_id, f"Invalid message: {e}")
+                await _send_frame(websocket, reply, binary)
+                continue
+            
+            if session is None:
+                session = negotiation_engine.open_session(message.shopper_id, boutique, message.emotional_prompt)
+                message.session_id = session.session_id
+            
+            if isinstance(message, AuraQuery):
+                if session.turns_used >= session.max_turns:
+                    reply = _protocol_error(store_id, shopper_id, session.session_id, "Turn limit reached")
+                    await _send_frame(websocket, reply, binary)
+                    await websocket.close(code=1008, reason="Turn limit reached")
+                    return
+                query = message
+                message.turn_id = session.turns_used + 1
+            
+            response = await negotiation_engine.handle_turn(session, boutique, message)
+            if response is not None:
+                await _send_frame(websocket, response, binary)
+            elif isinstance(message, AuraAccept):
+                await _send_frame(websocket, message, binary)
+            
+            if isinstance(message, AuraReject) or session.status == NegotiationStatus.ACCEPTED:
+                await websocket.close(code=1000)
+                return
+    except WebSocketDisconnect:
+        pass
+
+
+def _wants_binary(request: Request, binary_request: bool) -> bool:
+    accept = request.headers.get("accept", "")
+    if AURA_CONTENT_TYPE in accept:
+        return True
+    return binary_request and "json" not in accept
+
+
+@app.post("/boutiques/{store_id}/messages")
+async def post_message(store_id: str, request: Request):
+    try:
+        boutique = _session_boutique(store_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    body = await request.body()
+    binary = request.headers.get("content-type", "").startswith(AURA_CONTENT_TYPE)
+    try:
+        message = decode_message(body) if binary else parse_message(body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Accepts reserve stock, which only a negotiation session can settle.
+    if isinstance(message, (AuraAccept, AuraReject)):
+        raise HTTPException(
+            status_code=422,
+            detail=f"{message.type.value} needs a negotiation session; use /ws/{store_id}",
+        )
+    
+    response = await boutique.process_message(message)
+    if response is None:
+        return Response(status_code=204)
+    if _wants_binary(request, binary):
+        return Response(encode_message(response), media_type=AURA_CONTENT_TYPE)
+    return Response(dump_message(response), media_type="application/json")
+
+
 @app.post("/analyze-vibe")
 async def analyze_vibe(request: VibeAnalysisRequest):
-    from protocol_aura.protocol import vibe_service
-    
     vibe = await vibe_service.generate_vibe_vector(request.text)
     return {
         "description": vibe.description,
@@ -181,6 +649,86 @@ async def analyze_vibe(request: VibeAnalysisRequest):
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/export/sessions")
+async def export_sessions(
+    since: Optional[datetime] = Query(default=None, description="Created at or after (UTC)"),
+    until: Optional[datetime] = Query(default=None, description="Created before (UTC)"),
+    store: list[str] = Query(default=[], description="Only these stores"),
+    status: list[str] = Query(default=[], description="Only these statuses"),
+    format: str = Query(default="jsonl", description=f"One of {EXPORT_FORMATS}"),
+    gzip: bool = Query(default=True),
+    include_transcript: bool = Query(default=True),
+    include_messages: bool = Query(default=False, description="Include raw AURA messages (leaf preimages)"),
+    include_open: bool = Query(default=False, description="Include sessions still negotiating (non-final receipts)"),
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {format}")
+    sessions = iter_export_sessions(
+        list(negotiation_engine.sessions.values()),
+        negotiation_engine.archive,
+        since=naive_utc(since) if since else None,
+        until=naive_utc(until) if until else None,
+        store_ids=store,
+        statuses=status,
+        include_open=include_open,
+    )
+    chunks = iter_export(
+        sessions,
+        negotiation_engine,
+        fmt=format,
+        compress=gzip,
+        include_transcript=include_transcript,
+        include_messages=include_messages,
+    )
+    filename = f"aura-sessions-{datetime.utcnow():%Y%m%dT%H%M%S}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _require_diagnostics():
+    if not settings.diagnostics_enabled:
+        raise HTTPException(status_code=404, detail="Diagnostics are disabled (set AURA_DIAGNOSTICS_ENABLED)")
+
+
+@app.get("/debug/memory")
+async def debug_memory(top: int = Query(default=10, ge=1, le=100)):
+    _require_diagnostics()
+    return await asyncio.to_thread(
+        memory_report,
+        negotiation_engine,
+        list(_session_boutiques.values()),
+        catalog_registry.loaded(),
+        top,
+    )
+
+
+@app.post("/debug/memory/growth")
+async def debug_memory_growth(
+    iterations: int = Query(default=20, ge=2, le=500),
+    store_id: str = Query(default=DEFAULT_STORES[0]),
+    prompt: str = Query(default="Cyber CEO who codes at night and DJs on weekends"),
+):
+    _require_diagnostics()
+    if store_id not in catalog_registry.store_ids():
+        raise HTTPException(status_code=404, detail=f"Store not found: {store_id}")
+    request = NegotiationRequest(emotional_prompt=prompt, target_stores=[store_id])
+    # Probe runs stay out of the live session table, archive, metrics, analytics and stock.
+    engine = NegotiationEngine(max_sessions=iterations + 2, archive=None, record_outcomes=False)
+    boutiques = {store_id: _create_boutique(store_id, inventory=InventoryService(catalog_registry))}
+    return await probe_growth(
+        lambda: _negotiate_stores(request, boutiques=boutiques, engine=engine),
+        iterations=iterations,
+    )
+
+
 @app.get("/sessions/{session_id}")
 async def get_session(session_id: str):
     session = negotiation_engine.get_session(session_id)
@@ -192,10 +740,60 @@ async def get_session(session_id: str):
         "status": session.status.value,
         "emotional_prompt": session.emotional_prompt,
         "rounds": len(session.rounds),
+        "stage_timings_ms": session.stage_timings_ms,
+        "transcript_root": session.transcript_root,
         "transcript": negotiation_engine.get_transcript(session),
     }
 
 
+def _reservation_response(session: NegotiationSession, reservation, action: str) -> dict:
+    if reservation is None:
+        raise HTTPException(status_code=409, detail="Session has no active reservation")
+    return {
+        "session_id": session.session_id,
+        "reservation_id": reservation.reservation_id,
+        "items": reservation.items,
+        "status": action,
+    }
+
+
+@app.post("/sessions/{session_id}/confirm")
+async def confirm_session(session_id: str):
+    session = negotiation_engine.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    reservation = await negotiation_engine.confirm(session, _session_boutique(session.store_id))
+    return _reservation_response(session, reservation, "confirmed")
+
+
+@app.post("/sessions/{session_id}/cancel")
+async def cancel_session(session_id: str):
+    session = negotiation_engine.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    reservation = await negotiation_engine.cancel(session, _session_boutique(session.store_id))
+    return _reservation_response(session, reservation, "cancelled")
+
+
+@app.get("/sessions/{session_id}/receipt", response_model=TranscriptReceipt)
+async def get_session_receipt(session_id: str):
+    session = negotiation_engine.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return build_receipt(session)
+
+
+@app.get("/sessions/{session_id}/proof/{index}", response_model=InclusionProof)
+async def get_message_proof(session_id: str, index: int):
+    session = negotiation_engine.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        return prove_message(session, index)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 def run():
     uvicorn.run(
         "protocol_aura.api.main:app",
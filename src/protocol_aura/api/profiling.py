@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+import cProfile
+import pstats
+import random
+import uuid
+
+
+PROFILE_HEADER = "x-aura-profile"
+PROFILED_PATHS = frozenset({"/negotiate", "/analyze-vibe"})
+SUMMARY_FUNCTIONS = 5
+PACKAGE_DIR = str(Path(__file__).resolve().parents[1])
+
+
+def _sampling_profiler_class():
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return None
+    return Profiler
+
+
+class _CProfileRun:
+    suffix = ".prof"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path: Path):
+        self.profiler.dump_stats(path)
+
+    def top_functions(self, limit: int) -> list[tuple[str, float]]:
+        stats = pstats.Stats(self.profiler).stats
+        own = {key: value for key, value in stats.items() if key[0].startswith(PACKAGE_DIR) and key[0] != __file__}
+        ranked = sorted((own or stats).items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [(f"{func} ({Path(file).name}:{line})", cumtime) for (file, line, func), (_, _, _, cumtime, _) in ranked]
+
+
+class _SamplingRun:
+    suffix = ".pyisession"
+
+    def __init__(self, profiler_class):
+        self.profiler = profiler_class(async_mode="enabled")
+        self.session = None
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.session = self.profiler.stop()
+
+    def save(self, path: Path):
+        self.session.save(str(path))
+
+    def top_functions(self, limit: int) -> list[tuple[str, float]]:
+        cumulative: dict[tuple[str, int, str], float] = defaultdict(float)
+        root = self.session.root_frame()
+        stack = [(root, frozenset())] if root else []
+        while stack:
+            frame, callers = stack.pop()
+            key = (frame.file_path or "", frame.line_no, frame.function)
+            # A recursive call's time is already inside the outermost call's.
+            if key not in callers:
+                cumulative[key] += frame.time
+            stack.extend((child, callers | {key}) for child in frame.children)
+        own = {key: value for key, value in cumulative.items() if key[0].startswith(PACKAGE_DIR) and key[0] != __file__}
+        ranked = sorted((own or cumulative).items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(f"{func} ({Path(file).name}:{line})", seconds) for (file, line, func), seconds in ranked]
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app,
+        directory: Union[str, Path],
+        sample_rate: float = 0.0,
+        paths: frozenset[str] = PROFILED_PATHS,
+    ):
+        self.app = app
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.paths = paths
+        self._active = False
+
+    def _requested(self, scope) -> bool:
+        if scope["type"] != "http" or scope["path"] not in self.paths or self._active:
+            return False
+        for name, value in scope["headers"]:
+            if name.decode("latin-1").lower() == PROFILE_HEADER:
+                return value.decode("latin-1").strip().lower() in ("1", "true", "yes", "on")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _new_run(self) -> Union[_SamplingRun, _CProfileRun]:
+        profiler_class = _sampling_profiler_class()
+        return _SamplingRun(profiler_class) if profiler_class else _CProfileRun()
+
+    async def __call__(self, scope, receive, send):
+        if not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        run = self._new_run()
+        profile_id = uuid.uuid4().hex[:12]
+        stopped = False
+
+        def finish() -> list[tuple[bytes, bytes]]:
+            nonlocal stopped
+            stopped = True
+            run.stop()
+            self._active = False
+
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+            path = self.directory / f"{stamp}-{scope['path'].strip('/').replace('/', '_')}-{profile_id}{run.suffix}"
+            self.directory.mkdir(parents=True, exist_ok=True)
+            run.save(path)
+
+            summary = "; ".join(
+                f"{name} {seconds * 1000:.1f}ms" for name, seconds in run.top_functions(SUMMARY_FUNCTIONS)
+            )
+            return [
+                (b"x-aura-profile-id", profile_id.encode("latin-1")),
+                (b"x-aura-profile-file", path.name.encode("latin-1", "replace")),
+                (b"x-aura-profile-top", summary.encode("latin-1", "replace")),
+            ]
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start" and not stopped:
+                message = {**message, "headers": [*message.get("headers", []), *finish()]}
+            await send(message)
+
+        run.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            if not stopped:
+                stopped = True
+                run.stop()
+                self._active = False
+
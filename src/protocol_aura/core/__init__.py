@@ -1,4 +1,36 @@
 from protocol_aura.core.config import settings
+from protocol_aura.core.archive import SessionArchive
+from protocol_aura.core.analytics import SessionAnalytics, session_analytics
+from protocol_aura.core.inventory import inventory_service, InventoryService, Reservation
 from protocol_aura.core.negotiation import negotiation_engine, NegotiationSession, NegotiationEngine
+from protocol_aura.core.receipts import (
+    InclusionProof,
+    MerkleLog,
+    TranscriptReceipt,
+    build_receipt,
+    prove_message,
+    verify_proof,
+    verify_receipt,
+    verify_receipts,
+)
 
-__all__ = ["settings", "negotiation_engine", "NegotiationSession", "NegotiationEngine"]
+__all__ = [
+    "settings",
+    "SessionArchive",
+    "SessionAnalytics",
+    "session_analytics",
+    "inventory_service",
+    "InventoryService",
+    "Reservation",
+    "negotiation_engine",
+    "NegotiationSession",
+    "NegotiationEngine",
+    "InclusionProof",
+    "MerkleLog",
+    "TranscriptReceipt",
+    "build_receipt",
+    "prove_message",
+    "verify_proof",
+    "verify_receipt",
+    "verify_receipts",
+]
@@ -0,0 +1,285 @@
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import os
+import threading
+import time
+
+import numpy as np
+
+from protocol_aura.core.archive import SessionArchive
+from protocol_aura.protocol import AuraQuery, VibeAxis
+
+
+STATUSES = ("pending", "queried", "responded", "negotiating", "accepted", "rejected", "timeout")
+MATCH_EDGES = np.linspace(0.0, 1.0, 21)
+LATENCY_EDGES_MS = np.concatenate(([0.0], np.geomspace(1.0, 100_000.0, 41)))
+VIBE_GRID = 64
+SNAPSHOT_NAME = "analytics.npz"
+# Directory mtimes are only as fine as the kernel clock tick, so a day touched this
+# recently may gain files without its mtime moving; such days are rescanned.
+DAY_SETTLE_NS = 2_000_000_000
+
+_STATUS_INDEX = {status: i for i, status in enumerate(STATUSES)}
+_AXES = [axis.value for axis in VibeAxis]
+_ANGLES = np.linspace(0.0, 2 * np.pi, len(_AXES), endpoint=False)
+# Star-coordinate projection: each axis pulls along its own direction, so a
+# neutral vibe (0.5 everywhere) lands on the origin and the plot reads like the radar.
+PROJECTION = np.stack([np.cos(_ANGLES), np.sin(_ANGLES)], axis=1) * 2 / len(_AXES)
+VIBE_EXTENT = float(0.5 * np.abs(PROJECTION).sum(axis=0).max())
+
+
+def project_axes(axes: dict[str, float]) -> np.ndarray:
+    values = np.array([axes.get(axis, 0.5) for axis in _AXES]) - 0.5
+    return values @ PROJECTION
+
+
+def axis_directions() -> dict[str, tuple[float, float]]:
+    directions = PROJECTION / np.linalg.norm(PROJECTION, axis=1, keepdims=True) * VIBE_EXTENT
+    return {axis: (float(x), float(y)) for axis, (x, y) in zip(_AXES, directions)}
+
+
+def shopper_axes(session) -> Optional[dict[str, float]]:
+    for round_data in session.rounds:
+        if isinstance(round_data.shopper_message, AuraQuery):
+            return round_data.shopper_message.target_vibe.axes
+    return None
+
+
+def _bin(edges: np.ndarray, value: float) -> int:
+    return min(max(int(np.searchsorted(edges, value, side="right")) - 1, 0), len(edges) - 2)
+
+
+def histogram_percentile(counts: np.ndarray, edges: np.ndarray, q: float) -> float:
+    total = counts.sum()
+    if not total:
+        return 0.0
+    cumulative = np.cumsum(counts)
+    target = total * q / 100
+    i = int(np.searchsorted(cumulative, target))
+    below = cumulative[i - 1] if i else 0
+    fraction = (target - below) / counts[i] if counts[i] else 0.0
+    return float(edges[i] + fraction * (edges[i + 1] - edges[i]))
+
+
+class SessionAnalytics:
+    def __init__(self):
+        self.store_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.status_counts = np.zeros((0, len(STATUSES)), dtype=np.int64)
+        self.match_counts = np.zeros((0, len(MATCH_EDGES) - 1), dtype=np.int64)
+        self.latency_counts = np.zeros((0, len(LATENCY_EDGES_MS) - 1), dtype=np.int64)
+        self.match_sum = np.zeros(0)
+        self.latency_sum = np.zeros(0)
+        self.vibe_counts = np.zeros((VIBE_GRID, VIBE_GRID), dtype=np.int64)
+        self.watermark_ns = 0
+        self._watermark_names: set[str] = set()
+        self._day_cursors: dict[str, int] = {}
+        self._day_names: dict[str, set[str]] = {}
+        self._scan: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self.status_counts.sum())
+
+    def _row(self, store_id: str) -> int:
+        row = self._rows.get(store_id)
+        if row is not None:
+            return row
+        row = len(self.store_ids)
+        if row == len(self.match_sum):
+            grow = max(row, 8)
+            self.status_counts = np.concatenate([self.status_counts, np.zeros((grow, len(STATUSES)), dtype=np.int64)])
+            self.match_counts = np.concatenate([self.match_counts, np.zeros((grow, self.match_counts.shape[1]), dtype=np.int64)])
+            self.latency_counts = np.concatenate([self.latency_counts, np.zeros((grow, self.latency_counts.shape[1]), dtype=np.int64)])
+            self.match_sum = np.concatenate([self.match_sum, np.zeros(grow)])
+            self.latency_sum = np.concatenate([self.latency_sum, np.zeros(grow)])
+        self.store_ids.append(store_id)
+        self._rows[store_id] = row
+        return row
+
+    def observe(self, session):
+        status = _STATUS_INDEX.get(session.status.value)
+        if status is None:
+            return
+        axes = shopper_axes(session)
+        cell = None
+        if axes:
+            x, y = project_axes(axes)
+            scale = VIBE_GRID / (2 * VIBE_EXTENT)
+            cell = (
+                min(max(int((y + VIBE_EXTENT) * scale), 0), VIBE_GRID - 1),
+                min(max(int((x + VIBE_EXTENT) * scale), 0), VIBE_GRID - 1),
+            )
+
+        with self._lock:
+            row = self._row(session.store_id)
+            self.status_counts[row, status] += 1
+            if session.match_score > 0:
+                self.match_counts[row, _bin(MATCH_EDGES, session.match_score)] += 1
+                self.match_sum[row] += session.match_score
+                self.latency_counts[row, _bin(LATENCY_EDGES_MS, session.latency_ms)] += 1
+                self.latency_sum[row] += session.latency_ms
+            if cell is not None:
+                self.vibe_counts[cell] += 1
+
+    def observe_many(self, sessions: Iterable):
+        for session in sessions:
+            self.observe(session)
+
+    def _select(self, store_ids: Optional[Iterable[str]]) -> Union[slice, list[int]]:
+        if store_ids is None:
+            return slice(0, len(self.store_ids))
+        return [self._rows[store_id] for store_id in store_ids if store_id in self._rows]
+
+    def match_histogram(self, store_ids: Optional[Iterable[str]] = None) -> tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            return MATCH_EDGES, self.match_counts[self._select(store_ids)].sum(axis=0)
+
+    def latency_histogram(self, store_ids: Optional[Iterable[str]] = None) -> tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            return LATENCY_EDGES_MS, self.latency_counts[self._select(store_ids)].sum(axis=0)
+
+    def vibe_density(self) -> tuple[np.ndarray, float]:
+        with self._lock:
+            return self.vibe_counts.copy(), VIBE_EXTENT
+
+    def summary(self) -> list[dict]:
+        accepted = _STATUS_INDEX["accepted"]
+        rows = []
+        with self._lock:
+            for row, store_id in enumerate(self.store_ids):
+                sessions = int(self.status_counts[row].sum())
+                offers = int(self.match_counts[row].sum())
+                rows.append({
+                    "store_id": store_id,
+                    "sessions": sessions,
+                    "accepted": int(self.status_counts[row, accepted]),
+                    "acceptance_rate": round(float(self.status_counts[row, accepted]) / sessions, 4) if sessions else 0.0,
+                    "mean_match": round(float(self.match_sum[row]) / offers, 4) if offers else 0.0,
+                    "mean_latency_ms": round(float(self.latency_sum[row]) / offers, 1) if offers else 0.0,
+                    "p95_latency_ms": round(histogram_percentile(self.latency_counts[row], LATENCY_EDGES_MS, 95), 1),
+                })
+        return rows
+
+    def pending_paths(self, archive: SessionArchive) -> list[tuple[int, Path]]:
+        # One stat per day directory: days whose mtime matches the cursor left by the
+        # last complete fold are skipped, and in the rest only unseen names are stat'ed.
+        now = time.time_ns()
+        self._scan = {}
+        pending = []
+        last_day = None
+        for day_dir in archive.iter_days():
+            day = last_day = day_dir.name
+            try:
+                dir_mtime = day_dir.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self._day_cursors.get(day) == dir_mtime:
+                continue
+
+            known = self._day_names.get(day, ())
+            count = 0
+            for path in archive.day_paths(day_dir):
+                if path.name in known:
+                    continue
+                try:
+                    mtime = path.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime < self.watermark_ns or (mtime == self.watermark_ns and path.name in self._watermark_names):
+                    continue
+                pending.append((mtime, path))
+                count += 1
+            if now - dir_mtime <= DAY_SETTLE_NS:
+                self._day_cursors.pop(day, None)
+            elif count:
+                self._scan[day] = (dir_mtime, count)
+            else:
+                self._day_cursors[day] = dir_mtime
+
+        if last_day is not None:
+            # Sessions land under their creation day, so only the last two days keep
+            # receiving files; older days rely on their cursor and the mtime watermark.
+            keep_from = (date.fromisoformat(last_day) - timedelta(days=1)).isoformat()
+            for day in [day for day in self._day_names if day < keep_from and day in self._day_cursors]:
+                del self._day_names[day]
+        pending.sort()
+        return pending
+
+    def fold(self, archive: SessionArchive, pending: Iterable[tuple[int, Path]]) -> int:
+        folded = 0
+        for mtime, path in pending:
+            self.observe(archive.load_path(path))
+            if mtime > self.watermark_ns:
+                self.watermark_ns = mtime
+                self._watermark_names = set()
+            self._watermark_names.add(path.name)
+            day = path.parent.name
+            self._day_names.setdefault(day, set()).add(path.name)
+            scan = self._scan.get(day)
+            if scan is not None:
+                dir_mtime, left = scan[0], scan[1] - 1
+                if left:
+                    self._scan[day] = (dir_mtime, left)
+                else:
+                    del self._scan[day]
+                    self._day_cursors[day] = dir_mtime
+            folded += 1
+        return folded
+
+    def refresh(self, archive: SessionArchive) -> int:
+        return self.fold(archive, self.pending_paths(archive))
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        rows = len(self.store_ids)
+        name_days = [day for day, names in self._day_names.items() for _ in names]
+        with self._lock, open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                store_ids=np.array(self.store_ids, dtype=str),
+                status_counts=self.status_counts[:rows],
+                match_counts=self.match_counts[:rows],
+                latency_counts=self.latency_counts[:rows],
+                match_sum=self.match_sum[:rows],
+                latency_sum=self.latency_sum[:rows],
+                vibe_counts=self.vibe_counts,
+                watermark_ns=np.array(self.watermark_ns, dtype=np.int64),
+                watermark_names=np.array(sorted(self._watermark_names), dtype=str),
+                cursor_days=np.array(list(self._day_cursors), dtype=str),
+                cursor_mtimes=np.array(list(self._day_cursors.values()), dtype=np.int64),
+                name_days=np.array(name_days, dtype=str),
+                names=np.array([name for names in self._day_names.values() for name in names], dtype=str),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SessionAnalytics":
+        analytics = cls()
+        with np.load(path, allow_pickle=False) as data:
+            analytics.store_ids = [str(store_id) for store_id in data["store_ids"]]
+            analytics._rows = {store_id: row for row, store_id in enumerate(analytics.store_ids)}
+            analytics.status_counts = data["status_counts"]
+            analytics.match_counts = data["match_counts"]
+            analytics.latency_counts = data["latency_counts"]
+            analytics.match_sum = data["match_sum"]
+            analytics.latency_sum = data["latency_sum"]
+            analytics.vibe_counts = data["vibe_counts"]
+            analytics.watermark_ns = int(data["watermark_ns"])
+            analytics._watermark_names = {str(name) for name in data["watermark_names"]}
+            if "cursor_days" in data:
+                analytics._day_cursors = dict(zip(data["cursor_days"].tolist(), data["cursor_mtimes"].tolist()))
+                for day, name in zip(data["name_days"].tolist(), data["names"].tolist()):
+                    analytics._day_names.setdefault(day, set()).add(name)
+        return analytics
+
+    @classmethod
+    def for_archive(cls, archive: SessionArchive) -> "SessionAnalytics":
+        path = archive.directory / SNAPSHOT_NAME
+        return cls.load(path) if path.exists() else cls()
+
+
+session_analytics = SessionAnalytics()
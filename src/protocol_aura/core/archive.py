@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import os
+import uuid
+
+from pydantic import BaseModel
+
+from protocol_aura.protocol.wire import decode_model, encode_model
+
+
+ARCHIVE_SUFFIX = ".aura"
+DAY_FORMAT = "%Y-%m-%d"
+INDEX_DIR = "ids"
+
+
+def valid_session_id(session_id: str) -> bool:
+    try:
+        return str(uuid.UUID(session_id)) == session_id
+    except (ValueError, TypeError):
+        return False
+
+
+class SessionArchive:
+    def __init__(self, directory: Union[str, Path], model: type[BaseModel]):
+        self.directory = Path(directory)
+        self.model = model
+
+    def path_for(self, session_id: str, created_at: datetime) -> Path:
+        return self.directory / created_at.strftime(DAY_FORMAT) / f"{session_id}{ARCHIVE_SUFFIX}"
+
+    def index_path(self, session_id: str) -> Path:
+        return self.directory / INDEX_DIR / session_id[:2] / session_id
+
+    def save(self, session: BaseModel) -> Path:
+        path = self.path_for(session.session_id, session.created_at)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f"{ARCHIVE_SUFFIX}.tmp")
+        tmp.write_bytes(encode_model(session))
+        os.replace(tmp, path)
+        self._ensure_index()
+        self._index(session.session_id, path)
+        return path
+
+    def _ensure_index(self):
+        # Archives written before the id index existed get it built once.
+        if self.directory.exists() and not (self.directory / INDEX_DIR).exists():
+            self.reindex()
+
+    def _index(self, session_id: str, path: Path):
+        pointer = self.index_path(session_id)
+        pointer.parent.mkdir(parents=True, exist_ok=True)
+        tmp = pointer.with_suffix(".tmp")
+        tmp.write_text(path.relative_to(self.directory).as_posix(), encoding="utf-8")
+        os.replace(tmp, pointer)
+
+    def reindex(self) -> int:
+        (self.directory / INDEX_DIR).mkdir(parents=True, exist_ok=True)
+        count = 0
+        for path in self.iter_paths():
+            if valid_session_id(path.stem):
+                self._index(path.stem, path)
+                count += 1
+        return count
+
+    def locate(self, session_id: str) -> Optional[Path]:
+        # Ids come from request paths: only canonical UUIDs are looked up, and the
+        # pointer under ids/ resolves them without scanning the day directories.
+        if not valid_session_id(session_id):
+            return None
+        self._ensure_index()
+        try:
+            relative = self.index_path(session_id).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        path = self.directory / relative
+        return path if path.exists() else None
+
+    def load(self, session_id: str) -> Optional[BaseModel]:
+        path = self.locate(session_id)
+        return self.load_path(path) if path is not None else None
+
+    def load_path(self, path: Path) -> BaseModel:
+        return decode_model(path.read_bytes(), self.model)
+
+    def iter_days(self, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Path]:
+        if not self.directory.exists():
+            return
+        for day_dir in sorted(self.directory.iterdir()):
+            try:
+                day = datetime.strptime(day_dir.name, DAY_FORMAT).date()
+            except ValueError:
+                continue
+            if (since and day < since) or (until and day > until):
+                continue
+            yield day_dir
+
+    def day_paths(self, day_dir: Path) -> list[Path]:
+        return sorted(day_dir.glob(f"*{ARCHIVE_SUFFIX}"))
+
+    def iter_paths(self, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Path]:
+        for day_dir in self.iter_days(since, until):
+            yield from self.day_paths(day_dir)
+
+    def iter_sessions(self, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[BaseModel]:
+        for path in self.iter_paths(since, until):
+            yield self.load_path(path)
@@ -10,12 +10,37 @@ class Settings(BaseSettings):
     
     vibe_dimensions: int = Field(default=768, description="Dimensionality of vibe vectors")
     negotiation_max_rounds: int = Field(default=5, description="Maximum negotiation rounds")
+    max_sessions: int = Field(default=10000, description="Completed sessions kept in memory for lookup")
     similarity_threshold: float = Field(default=0.75, description="Minimum similarity for match")
+    semantic_weight: float = Field(default=0.5, ge=0.0, le=1.0, description="Weight of embedding similarity vs axis similarity in vibe-fit ranking")
+    semantic_candidates: int = Field(default=64, description="Products retrieved from the embedding index per query")
+    ann_nprobe: int = Field(default=8, description="Inverted lists probed per ANN query")
     
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8000, description="API port")
+    ws_idle_timeout_seconds: int = Field(default=300, description="Close WebSocket sessions idle for this long")
     
     demo_mode: bool = Field(default=True, description="Use demo mode without API calls")
+    embedding_backend: str = Field(default="", description="demo, local (offline hashing embedder), http (inference gateway) or gemini; empty follows demo_mode")
+    gateway_url: str = Field(default="", description="Base URL of the inference gateway for the http backend")
+    gateway_api_key: str = Field(default="", description="Bearer token sent to the inference gateway")
+    gateway_timeout_seconds: float = Field(default=10.0, description="Per-request timeout for gateway calls")
+    gateway_max_connections: int = Field(default=32, description="Connection pool size for the gateway client")
+    gateway_max_keepalive: int = Field(default=16, description="Idle keep-alive connections kept in the pool")
+    gateway_keepalive_seconds: float = Field(default=30.0, description="Seconds an idle gateway connection is kept")
+    gateway_http2: bool = Field(default=True, description="Use HTTP/2 when the h2 package is installed")
+    gateway_batch_window_ms: float = Field(default=3.0, description="Milliseconds to collect texts into one gateway call")
+    gateway_max_batch: int = Field(default=64, description="Texts per gateway call before flushing early")
+    simulate_latency: bool = Field(default=True, description="Inject artificial network latency in demo agents")
+    
+    catalog_dir: str = Field(default="", description="Directory of bulk catalogs to register at startup")
+    archive_dir: str = Field(default="", description="Directory for archived sessions in the AURA binary format")
+    profile_enabled: bool = Field(default=False, description="Install the request profiling middleware")
+    profile_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="Fraction of requests profiled without the header")
+    profile_dir: str = Field(default="profiles", description="Directory for request profiles")
+    diagnostics_enabled: bool = Field(default=False, description="Trace allocations and serve /debug/memory")
+    reservation_ttl_seconds: int = Field(default=900, description="Seconds before an unconfirmed stock reservation is released")
+    commit_accepted_stock: bool = Field(default=False, description="Decrement stock as soon as a bundle is accepted instead of holding it until confirmed, cancelled or expired")
     
     class Config:
         env_file = ".env"
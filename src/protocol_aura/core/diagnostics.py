@@ -0,0 +1,181 @@
+from collections import Counter
+from types import FunctionType, ModuleType
+from typing import Awaitable, Callable, Iterable, Optional
+import asyncio
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+
+
+TRACE_FRAMES = 8
+TOP_ALLOCATIONS = 10
+GROWTH_TOP_TYPES = 20
+
+_OPAQUE = (type, ModuleType, FunctionType)
+
+
+def _walk(roots: Iterable, exclude: Optional[set[int]] = None) -> Iterable:
+    seen = set(exclude or ())
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        yield obj
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                stack.append(obj.base)
+            continue
+        stack.extend(gc.get_referents(obj))
+
+
+def reachable_ids(*roots) -> set[int]:
+    return {id(obj) for obj in _walk(roots)}
+
+
+def deep_sizeof(*roots, exclude: Optional[set[int]] = None) -> dict[str, int]:
+    heap = 0
+    mapped = 0
+    objects = 0
+    for obj in _walk(roots, exclude):
+        objects += 1
+        if isinstance(obj, np.memmap) and not isinstance(obj.base, np.ndarray):
+            mapped += obj.nbytes
+        heap += sys.getsizeof(obj)
+    return {"bytes": heap, "mapped_bytes": mapped, "objects": objects}
+
+
+def _stats(sizes: list[int]) -> dict:
+    if not sizes:
+        return {"count": 0, "total_bytes": 0}
+    return {
+        "count": len(sizes),
+        "total_bytes": int(sum(sizes)),
+        "mean_bytes": int(np.mean(sizes)),
+        "p95_bytes": int(np.percentile(sizes, 95)),
+        "max_bytes": int(max(sizes)),
+    }
+
+
+def _own_traces_excluded(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+
+
+def _own_snapshot() -> tracemalloc.Snapshot:
+    return _own_traces_excluded(tracemalloc.take_snapshot())
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, limit: int) -> list[dict]:
+    return [
+        {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "blocks": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def start_tracing(frames: int = TRACE_FRAMES) -> bool:
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    return True
+
+
+def memory_report(engine, agents: Iterable = (), catalogs: Iterable = (), top: int = TOP_ALLOCATIONS) -> dict:
+    catalogs = list(catalogs)
+    agents = list(agents)
+    catalog_ids = reachable_ids(*catalogs)
+
+    report = {
+        "catalogs": {
+            entry.store_id: {"version": entry.version, "products": len(entry), **deep_sizeof(entry)}
+            for entry in catalogs
+        },
+        "agents": {
+            agent.agent_id: {
+                "history_messages": len(agent.conversation_history),
+                "history_bytes": deep_sizeof(agent.conversation_history, exclude=catalog_ids)["bytes"],
+            }
+            for agent in agents
+        },
+    }
+
+    sessions = list(engine.sessions.values())
+    sizes = [deep_sizeof(session, exclude=catalog_ids)["bytes"] for session in sessions]
+    report["sessions"] = {"capacity": engine.max_sessions, **_stats(sizes)}
+
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report["tracemalloc"] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_allocations": _top_allocations(_own_snapshot(), top),
+        }
+    else:
+        report["tracemalloc"] = None
+    return report
+
+
+def type_counts(ignore: Iterable = ()) -> Counter:
+    gc.collect()
+    skip = {id(obj) for obj in ignore}
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects() if id(obj) not in skip)
+
+
+def growing_types(samples: list[Counter], min_growth: int = 1) -> dict[str, list[int]]:
+    if len(samples) < 2:
+        return {}
+    names = set().union(*samples)
+    growing = {}
+    for name in names:
+        series = [sample.get(name, 0) for sample in samples]
+        if all(b > a for a, b in zip(series, series[1:])) and series[-1] - series[0] >= min_growth:
+            growing[name] = series
+    ranked = sorted(growing.items(), key=lambda item: item[1][-1] - item[1][0], reverse=True)
+    return dict(ranked[:GROWTH_TOP_TYPES])
+
+
+async def probe_growth(
+    run_once: Callable[[], Awaitable],
+    iterations: int = 20,
+    warmup: int = 2,
+    top: int = TOP_ALLOCATIONS,
+) -> dict:
+    started = start_tracing()
+    try:
+        for _ in range(warmup):
+            await run_once()
+
+        # Full collections and heap walks take long enough to stall the event loop.
+        samples = [await asyncio.to_thread(type_counts)]
+        before = await asyncio.to_thread(_own_snapshot)
+        traced_before = tracemalloc.get_traced_memory()[0]
+        for _ in range(iterations):
+            await run_once()
+            samples.append(await asyncio.to_thread(type_counts, samples))
+        after = await asyncio.to_thread(_own_snapshot)
+        retained = tracemalloc.get_traced_memory()[0] - traced_before
+
+        growth = [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size_diff,
+                "blocks": stat.count_diff,
+            }
+            for stat in after.compare_to(before, "lineno")[:top]
+            if stat.size_diff > 0
+        ]
+        return {
+            "iterations": iterations,
+            "retained_bytes": retained,
+            "retained_bytes_per_iteration": retained // iterations if iterations else 0,
+            "growing_types": growing_types(samples),
+            "growing_allocations": growth,
+        }
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,232 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+import argparse
+import gzip
+import json
+import struct
+import sys
+import zlib
+
+from protocol_aura.core.archive import SessionArchive
+from protocol_aura.core.config import settings
+from protocol_aura.core.negotiation import NegotiationEngine, NegotiationSession, NegotiationStatus, negotiation_engine
+from protocol_aura.core.receipts import build_receipt, iter_transcript_messages
+from protocol_aura.protocol.wire import decode_payload, encode_payload
+
+
+EXPORT_FORMATS = ("jsonl", "aura")
+CONTENT_TYPES = {"jsonl": "application/x-ndjson", "aura": "application/x-aura-stream"}
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_LEVEL = 6
+_FRAME = struct.Struct("<I")
+FINAL_STATUSES = frozenset({NegotiationStatus.ACCEPTED, NegotiationStatus.REJECTED, NegotiationStatus.TIMEOUT})
+
+
+def _matches(
+    session: NegotiationSession,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    store_ids: frozenset[str],
+    statuses: frozenset[str],
+) -> bool:
+    if since and session.created_at < since:
+        return False
+    if until and session.created_at >= until:
+        return False
+    if store_ids and session.store_id not in store_ids:
+        return False
+    return not statuses or session.status.value in statuses
+
+
+def iter_export_sessions(
+    sessions: Iterable[NegotiationSession] = (),
+    archive: Optional[SessionArchive] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    store_ids: Iterable[str] = (),
+    statuses: Iterable[str] = (),
+    include_open: bool = False,
+) -> Iterator[NegotiationSession]:
+    # Snapshot in-memory sessions now, on the caller's thread: the generator is
+    # drained from a worker thread while the engine keeps inserting and evicting.
+    # Open sessions still move their receipt root, so they are left out unless asked for.
+    snapshot = [
+        session if session.status in FINAL_STATUSES else _frozen(session)
+        for session in sessions
+        if include_open or session.status in FINAL_STATUSES
+    ]
+    return _iter_export_sessions(snapshot, archive, since, until, frozenset(store_ids), frozenset(statuses))
+
+
+def _frozen(session: NegotiationSession) -> NegotiationSession:
+    # The engine keeps appending to an open session's rounds and transcript log on
+    # the event loop; the copy gets its own round list and rebuilds its own log.
+    copy = session.model_copy(update={"rounds": list(session.rounds)})
+    copy._transcript_log = None
+    return copy
+
+
+def _iter_export_sessions(
+    sessions: list[NegotiationSession],
+    archive: Optional[SessionArchive],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    store_ids: frozenset[str],
+    statuses: frozenset[str],
+) -> Iterator[NegotiationSession]:
+    seen = set()
+    for session in sessions:
+        seen.add(session.session_id)
+        if _matches(session, since, until, store_ids, statuses):
+            yield session
+
+    if archive is None:
+        return
+    last_day = (until - timedelta(microseconds=1)).date() if until else None
+    for path in archive.iter_paths(since.date() if since else None, last_day):
+        if path.stem in seen:
+            continue
+        session = archive.load_path(path)
+        if _matches(session, since, until, store_ids, statuses):
+            yield session
+
+
+def export_record(
+    session: NegotiationSession,
+    engine: NegotiationEngine = negotiation_engine,
+    include_transcript: bool = True,
+    include_messages: bool = False,
+) -> dict:
+    record = {
+        "session_id": session.session_id,
+        "shopper_id": session.shopper_id,
+        "store_id": session.store_id,
+        "store_name": session.store_name,
+        "status": session.status.value,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "match_score": session.match_score,
+        "receipt": build_receipt(session).model_dump(mode="json"),
+    }
+    if include_transcript:
+        record["transcript"] = engine.get_transcript(session)
+    if include_messages:
+        record["messages"] = [message.model_dump(mode="json") for _, _, message in iter_transcript_messages(session)]
+    return record
+
+
+def iter_encoded(records: Iterable[dict], fmt: str = "jsonl") -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {EXPORT_FORMATS})")
+    for record in records:
+        if fmt == "jsonl":
+            yield json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        else:
+            payload = encode_payload(record)
+            yield _FRAME.pack(len(payload)) + payload
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(
+    sessions: Iterable[NegotiationSession],
+    engine: NegotiationEngine = negotiation_engine,
+    fmt: str = "jsonl",
+    compress: bool = True,
+    include_transcript: bool = True,
+    include_messages: bool = False,
+) -> Iterator[bytes]:
+    records = (export_record(session, engine, include_transcript, include_messages) for session in sessions)
+    chunks = iter_encoded(records, fmt)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def read_export(source: Union[str, Path, BinaryIO], fmt: str = "jsonl") -> Iterator[dict]:
+    stream = open(source, "rb") if isinstance(source, (str, Path)) else source
+    try:
+        if hasattr(stream, "peek") and stream.peek(2)[:2] == GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=stream)
+        if fmt == "jsonl":
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        while header := stream.read(_FRAME.size):
+            if len(header) < _FRAME.size:
+                raise ValueError("Truncated AURA export frame")
+            (size,) = _FRAME.unpack(header)
+            yield decode_payload(stream.read(size))
+    finally:
+        if isinstance(source, (str, Path)):
+            stream.close()
+
+
+def naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_bound(value: str, end: bool = False) -> datetime:
+    parsed = naive_utc(datetime.fromisoformat(value))
+    if end and len(value) <= len("YYYY-MM-DD"):
+        return parsed + timedelta(days=1)
+    return parsed
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Stream archived AURA sessions, receipts and transcripts")
+    parser.add_argument("--archive-dir", type=str, default="", help="Session archive (default: AURA_ARCHIVE_DIR)")
+    parser.add_argument("--day", type=str, default="", help="Export one UTC day (YYYY-MM-DD)")
+    parser.add_argument("--since", type=str, default="", help="Start (ISO date or datetime, inclusive)")
+    parser.add_argument("--until", type=str, default="", help="End (ISO date inclusive, or datetime exclusive)")
+    parser.add_argument("--store", action="append", default=[], help="Only this store (repeatable)")
+    parser.add_argument("--status", action="append", default=[], help="Only this status (repeatable)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--no-gzip", action="store_true", help="Write uncompressed output")
+    parser.add_argument("--no-transcript", action="store_true", help="Receipts only")
+    parser.add_argument("--messages", action="store_true", help="Include raw AURA messages (leaf preimages)")
+    parser.add_argument("-o", "--output", type=str, default="-", help="Output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    directory = args.archive_dir or settings.archive_dir
+    if not directory:
+        parser.error("Set --archive-dir or AURA_ARCHIVE_DIR")
+
+    since = parse_bound(args.since or args.day) if args.since or args.day else None
+    until = parse_bound(args.until or args.day, end=True) if args.until or args.day else None
+    sessions = iter_export_sessions(
+        archive=SessionArchive(directory, NegotiationSession),
+        since=since,
+        until=until,
+        store_ids=args.store,
+        statuses=args.status,
+    )
+    chunks = iter_export(
+        sessions,
+        NegotiationEngine(max_sessions=0),
+        fmt=args.format,
+        compress=not args.no_gzip,
+        include_transcript=not args.no_transcript,
+        include_messages=args.messages,
+    )
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    run()
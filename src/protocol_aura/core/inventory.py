@@ -0,0 +1,157 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+import heapq
+import threading
+import uuid
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from protocol_aura.core.config import settings
+from protocol_aura.data.registry import CatalogEntry, CatalogRegistry, catalog_registry
+
+
+class Reservation(BaseModel):
+    reservation_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    store_id: str
+    session_id: str
+    items: dict[str, int]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+
+class _StoreInventory:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.held: Counter = Counter()
+        self.reservations: dict[str, Reservation] = {}
+        self.expiry: list[tuple[datetime, str]] = []
+        self.generation = 0
+        self.mask_cache: Optional[tuple[CatalogEntry, int, np.ndarray]] = None
+
+
+class InventoryService:
+    def __init__(self, registry: CatalogRegistry = catalog_registry, ttl_seconds: Optional[int] = None):
+        self.registry = registry
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.reservation_ttl_seconds
+        self._stores: dict[str, _StoreInventory] = {}
+        self._stores_lock = threading.Lock()
+
+    def _store(self, store_id: str) -> _StoreInventory:
+        store = self._stores.get(store_id)
+        if store is None:
+            with self._stores_lock:
+                store = self._stores.setdefault(store_id, _StoreInventory())
+        return store
+
+    def _expire_locked(self, store: _StoreInventory, now: datetime):
+        while store.expiry and store.expiry[0][0] <= now:
+            _, session_id = heapq.heappop(store.expiry)
+            reservation = store.reservations.get(session_id)
+            if reservation and reservation.expires_at <= now:
+                self._drop_locked(store, session_id)
+
+    def _drop_locked(self, store: _StoreInventory, session_id: str) -> Optional[Reservation]:
+        reservation = store.reservations.pop(session_id, None)
+        if reservation:
+            store.held.subtract(reservation.items)
+            store.held = +store.held
+            store.generation += 1
+        return reservation
+
+    def in_stock_mask(self, entry: CatalogEntry) -> np.ndarray:
+        store = self._store(entry.store_id)
+        if store.expiry and store.expiry[0][0] <= datetime.utcnow():
+            with store.lock:
+                self._expire_locked(store, datetime.utcnow())
+
+        cached = store.mask_cache
+        if cached and cached[0] is entry and cached[1] == store.generation:
+            return cached[2]
+
+        with store.lock:
+            held = dict(store.held)
+            generation = store.generation
+
+        mask = entry.active & (entry.stock > 0)
+        if held:
+            mask = mask.copy()
+            for product_id, qty in held.items():
+                row = entry.row_of(product_id)
+                if row is not None and entry.stock[row] - qty <= 0:
+                    mask[row] = False
+        mask.setflags(write=False)
+        store.mask_cache = (entry, generation, mask)
+        return mask
+
+    def reserve(
+        self,
+        entry: CatalogEntry,
+        product_ids: Iterable[str],
+        session_id: str,
+        ttl_seconds: Optional[int] = None,
+    ) -> Optional[Reservation]:
+        items = dict(Counter(product_ids))
+        store = self._store(entry.store_id)
+        now = datetime.utcnow()
+        with store.lock:
+            self._expire_locked(store, now)
+            # The session's current hold is swapped out only if the new one fits,
+            # so a failed re-reserve leaves it in place.
+            current = store.reservations.get(session_id)
+            own = current.items if current else {}
+            for product_id, qty in items.items():
+                row = entry.row_of(product_id)
+                if row is None or entry.stock[row] - store.held[product_id] + own.get(product_id, 0) < qty:
+                    return None
+
+            self._drop_locked(store, session_id)
+            reservation = Reservation(
+                store_id=entry.store_id,
+                session_id=session_id,
+                items=items,
+                expires_at=now + timedelta(seconds=ttl_seconds or self.ttl_seconds),
+            )
+            store.reservations[session_id] = reservation
+            store.held.update(items)
+            store.generation += 1
+            heapq.heappush(store.expiry, (reservation.expires_at, session_id))
+        return reservation
+
+    def get_reservation(self, store_id: str, session_id: str) -> Optional[Reservation]:
+        reservation = self._store(store_id).reservations.get(session_id)
+        if reservation and reservation.expires_at > datetime.utcnow():
+            return reservation
+        return None
+
+    def release(self, store_id: str, session_id: str) -> Optional[Reservation]:
+        store = self._store(store_id)
+        with store.lock:
+            return self._drop_locked(store, session_id)
+
+    def commit(self, store_id: str, session_id: str) -> Optional[Reservation]:
+        store = self._store(store_id)
+        with store.lock:
+            reservation = store.reservations.get(session_id)
+            if reservation is None or reservation.expires_at <= datetime.utcnow():
+                return None
+            entry = self.registry.get(store_id)
+            self.registry.apply(
+                store_id,
+                stock={
+                    product_id: max(0, int(entry.stock[entry.row_of(product_id)]) - qty)
+                    for product_id, qty in reservation.items.items()
+                    if entry.row_of(product_id) is not None
+                },
+            )
+            return self._drop_locked(store, session_id)
+
+    def held(self, store_id: str) -> dict[str, int]:
+        store = self._store(store_id)
+        with store.lock:
+            self._expire_locked(store, datetime.utcnow())
+            return dict(store.held)
+
+
+inventory_service = InventoryService()
@@ -0,0 +1,140 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import threading
+import time
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_METRIC = "aura_stage_duration_seconds"
+STAGE_HELP = "Time spent in each negotiation stage"
+
+COUNTER_HELP = {
+    "aura_negotiations_total": "Completed negotiations by store and outcome",
+}
+
+_stage_timings: ContextVar[Optional[dict[str, float]]] = ContextVar("aura_stage_timings", default=None)
+
+
+def _label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{int(value)}"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._stages: dict[str, Histogram] = {}
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        self.histogram(stage).observe(seconds)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def stages(self) -> dict[str, Histogram]:
+        with self._lock:
+            return dict(self._stages)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        lines = [f"# HELP {STAGE_METRIC} {STAGE_HELP}", f"# TYPE {STAGE_METRIC} histogram"]
+        for stage, histogram in sorted(self.stages().items()):
+            counts, total, count = histogram.snapshot()
+            label = f'stage="{_label_value(stage)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{STAGE_METRIC}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{STAGE_METRIC}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{STAGE_METRIC}_sum{{{label}}} {total!r}")
+            lines.append(f"{STAGE_METRIC}_count{{{label}}} {count}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            rendered = ",".join(f'{key}="{_label_value(val)}"' for key, val in labels)
+            lines.append(f"{name}{{{rendered}}} {_format_number(value)}" if rendered else f"{name} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        metrics.observe(self.stage, elapsed)
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings[self.stage] = timings.get(self.stage, 0.0) + elapsed * 1000
+        return False
+
+
+def span(stage: str) -> Span:
+    return Span(stage)
+
+
+@contextmanager
+def track_stages(timings: Optional[dict[str, float]] = None) -> Iterator[dict[str, float]]:
+    timings = {} if timings is None else timings
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
@@ -1,10 +1,18 @@
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Awaitable, Callable, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
+import asyncio
 import uuid
 
 from protocol_aura.agents import BoutiqueAgent, ShopperAgent
+from protocol_aura.core.analytics import session_analytics
+from protocol_aura.core.archive import SessionArchive
+from protocol_aura.core.config import settings
+from protocol_aura.core.inventory import Reservation
+from protocol_aura.core.metrics import metrics, span, track_stages
+from protocol_aura.core.receipts import MerkleLog, append_round
 from protocol_aura.protocol import (
     AuraMessage,
     AuraQuery,
@@ -14,9 +22,13 @@ from protocol_aura.protocol import (
     AuraReject,
     MessageType,
     ConstraintCheck,
+    OfferBundle,
 )
 
 
+TranscriptCallback = Callable[["NegotiationSession", dict], Awaitable[None]]
+
+
 class NegotiationStatus(str, Enum):
     PENDING = "pending"
     QUERIED = "queried"
@@ -54,19 +66,33 @@ class NegotiationSession(BaseModel):
     final_result: Optional[AuraMessage] = None
     match_score: float = 0.0
     latency_ms: int = 0
+    reservation_id: str = ""
+    stage_timings_ms: dict[str, float] = Field(default_factory=dict)
+    transcript_root: str = ""
+    transcript_size: int = 0
     turns_used: int = 0
     max_turns: int = 3
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    _transcript_log: Optional[MerkleLog] = PrivateAttr(default=None)
     
     class Config:
         arbitrary_types_allowed = True
 
 
 class NegotiationEngine:
-    def __init__(self, max_rounds: int = 3):
+    def __init__(
+        self,
+        max_rounds: int = 3,
+        max_sessions: Optional[int] = None,
+        archive: Optional[SessionArchive] = None,
+        record_outcomes: bool = True,
+    ):
         self.max_rounds = max_rounds
-        self.sessions: dict[str, NegotiationSession] = {}
+        self.max_sessions = max_sessions if max_sessions is not None else settings.max_sessions
+        self.sessions: OrderedDict[str, NegotiationSession] = OrderedDict()
+        self.archive = archive
+        self.record_outcomes = record_outcomes
     
     async def start_negotiation(
         self,
@@ -74,6 +100,7 @@ class NegotiationEngine:
         boutique: BoutiqueAgent,
         emotional_prompt: str,
         context: str = "",
+        on_event: Optional[TranscriptCallback] = None,
     ) -> NegotiationSession:
         session_id = str(uuid.uuid4())
         
@@ -86,8 +113,24 @@ class NegotiationEngine:
             status=NegotiationStatus.QUERIED,
             max_turns=self.max_rounds,
         )
-        self.sessions[session_id] = session
+        self._register(session)
+        
+        with track_stages(session.stage_timings_ms):
+            await self._run_rounds(session, shopper, boutique, emotional_prompt, context, on_event)
+        await self._finish(session, boutique)
         
+        return session
+    
+    async def _run_rounds(
+        self,
+        session: NegotiationSession,
+        shopper: ShopperAgent,
+        boutique: BoutiqueAgent,
+        emotional_prompt: str,
+        context: str,
+        on_event: Optional[TranscriptCallback],
+    ):
+        session_id = session.session_id
         query = await shopper.create_query(emotional_prompt, context, session_id)
         
         round_1 = NegotiationRound(round_number=1)
@@ -97,36 +140,28 @@ class NegotiationEngine:
         round_1.store_message = offer
         round_1.outcome = TurnOutcome.OFFER_SENT
         
-        if isinstance(offer, AuraOffer):
-            session.match_score = max(offer.option_a.match_score, offer.option_b.match_score if offer.option_b else 0)
-            session.latency_ms = offer.latency_ms
-            round_1.notes = f"Options: A={offer.option_a.match_score:.0%}, B={offer.option_b.match_score:.0%}" if offer.option_b else f"Option A: {offer.option_a.match_score:.0%}"
-        
-        session.rounds.append(round_1)
+        self._record_offer(session, round_1, offer)
         session.status = NegotiationStatus.RESPONDED
+        if isinstance(offer, AuraReject):
+            self._record_reject(session, round_1, offer)
+        
+        append_round(session, round_1)
         session.turns_used = 1
+        await self._emit(session, round_1, on_event)
+        if isinstance(offer, AuraReject):
+            return
         
         shopper_response = await shopper.process_message(offer)
         
         round_2 = NegotiationRound(round_number=2)
         round_2.shopper_message = shopper_response
         
-        if isinstance(shopper_response, AuraAccept):
-            round_2.outcome = TurnOutcome.ACCEPTED
-            round_2.notes = f"Accepted bundle {shopper_response.accepted_bundle}: ${shopper_response.total_price:.0f}"
-            session.status = NegotiationStatus.ACCEPTED
-            session.final_result = shopper_response
-        elif isinstance(shopper_response, AuraReject):
-            round_2.outcome = TurnOutcome.REJECTED
-            round_2.notes = f"Rejected: {shopper_response.reason}"
-            if shopper_response.would_accept_if:
-                round_2.notes += f" | Would accept if: {shopper_response.would_accept_if}"
-            session.status = NegotiationStatus.REJECTED
-            session.final_result = shopper_response
-        else:
-            session.status = NegotiationStatus.ACCEPTED
-            if isinstance(offer, AuraOffer):
-                session.final_result = AuraAccept(
+        if isinstance(shopper_response, AuraReject):
+            self._record_reject(session, round_2, shopper_response)
+        elif isinstance(shopper_response, AuraAccept) or isinstance(offer, AuraOffer):
+            accept = shopper_response
+            if not isinstance(accept, AuraAccept):
+                accept = AuraAccept(
                     shopper_id=shopper.agent_id,
                     store_id=boutique.agent_id,
                     session_id=session_id,
@@ -138,97 +173,290 @@ class NegotiationEngine:
                     transformations_accepted=offer.option_a.transformations,
                     constraint_checks=offer.option_a.constraint_checks,
                 )
+            store_response = await boutique.process_message(accept)
+            self._record_accept(session, round_2, boutique, accept, store_response)
+        else:
+            session.status = NegotiationStatus.ACCEPTED
         
-        session.rounds.append(round_2)
+        append_round(session, round_2)
         session.turns_used = 2
         session.updated_at = datetime.utcnow()
-        
+        await self._emit(session, round_2, on_event)
+
+    
+    def open_session(self, shopper_id: str, boutique: BoutiqueAgent, emotional_prompt: str = "") -> NegotiationSession:
+        session = NegotiationSession(
+            session_id=str(uuid.uuid4()),
+            shopper_id=shopper_id,
+            store_id=boutique.agent_id,
+            store_name=boutique.name,
+            emotional_prompt=emotional_prompt,
+            max_turns=settings.negotiation_max_rounds,
+        )
+        self._register(session)
         return session
     
+    async def handle_turn(
+        self,
+        session: NegotiationSession,
+        boutique: BoutiqueAgent,
+        message: AuraMessage,
+        on_event: Optional[TranscriptCallback] = None,
+    ) -> Optional[AuraMessage]:
+        if isinstance(message, AuraAccept):
+            message = self.resolve_accept(session, message)
+        round_data = NegotiationRound(round_number=len(session.rounds) + 1)
+        round_data.shopper_message = message
+        response = None
+        
+        if isinstance(message, AuraQuery):
+            session.emotional_prompt = message.emotional_prompt
+            with track_stages(session.stage_timings_ms):
+                response = await boutique.process_message(message)
+            round_data.store_message = response
+            self._record_offer(session, round_data, response)
+            session.status = NegotiationStatus.NEGOTIATING if session.rounds else NegotiationStatus.RESPONDED
+            if isinstance(response, AuraReject):
+                self._record_reject(session, round_data, response)
+        elif isinstance(message, AuraAccept):
+            with track_stages(session.stage_timings_ms):
+                response = await boutique.process_message(message)
+            self._record_accept(session, round_data, boutique, message, response)
+        elif isinstance(message, AuraReject):
+            self._record_reject(session, round_data, message)
+        
+        append_round(session, round_data)
+        session.turns_used = len(session.rounds)
+        session.updated_at = datetime.utcnow()
+        await self._emit(session, round_data, on_event)
+        if session.status in (NegotiationStatus.ACCEPTED, NegotiationStatus.REJECTED):
+            await self._finish(session, boutique)
+        return response
+    
+    def _settle(self, session: NegotiationSession, boutique: BoutiqueAgent):
+        # An accepted bundle stays held for the shopper until it is confirmed, cancelled
+        # or its TTL lapses; every other outcome hands the hold straight back.
+        if session.status == NegotiationStatus.ACCEPTED and session.reservation_id:
+            if settings.commit_accepted_stock:
+                boutique.inventory.commit(boutique.agent_id, session.session_id)
+        else:
+            boutique.inventory.release(boutique.agent_id, session.session_id)
+    
+    async def confirm(self, session: NegotiationSession, boutique: BoutiqueAgent) -> Optional[Reservation]:
+        if session.status != NegotiationStatus.ACCEPTED or not session.reservation_id:
+            return None
+        return boutique.inventory.commit(session.store_id, session.session_id)
+    
+    async def cancel(self, session: NegotiationSession, boutique: BoutiqueAgent) -> Optional[Reservation]:
+        if not session.reservation_id:
+            return None
+        reservation = boutique.inventory.release(session.store_id, session.session_id)
+        if reservation is not None:
+            session.reservation_id = ""
+            session.updated_at = datetime.utcnow()
+            if self.archive is not None:
+                await asyncio.to_thread(self.archive.save, session)
+        return reservation
+    
+    async def _finish(self, session: NegotiationSession, boutique: BoutiqueAgent):
+        self._settle(session, boutique)
+        session.stage_timings_ms = {stage: round(ms, 3) for stage, ms in session.stage_timings_ms.items()}
+        if self.record_outcomes:
+            metrics.increment("aura_negotiations_total", store=session.store_id, status=session.status.value)
+            session_analytics.observe(session)
+        if self.archive is not None:
+            await asyncio.to_thread(self.archive.save, session)
+    
+    def _register(self, session: NegotiationSession):
+        self.sessions[session.session_id] = session
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+    
+    def _record_offer(self, session: NegotiationSession, round_data: NegotiationRound, offer: Optional[AuraMessage]):
+        round_data.outcome = TurnOutcome.OFFER_SENT
+        if isinstance(offer, AuraOffer):
+            session.match_score = max(offer.option_a.match_score, offer.option_b.match_score if offer.option_b else 0)
+            session.latency_ms = offer.latency_ms
+            round_data.notes = f"Options: A={offer.option_a.match_score:.0%}, B={offer.option_b.match_score:.0%}" if offer.option_b else f"Option A: {offer.option_a.match_score:.0%}"
+    
+    def _record_accept(
+        self,
+        session: NegotiationSession,
+        round_data: NegotiationRound,
+        boutique: BoutiqueAgent,
+        accept: AuraAccept,
+        store_response: Optional[AuraMessage],
+    ):
+        if isinstance(store_response, AuraReject):
+            round_data.store_message = store_response
+            round_data.outcome = TurnOutcome.REJECTED
+            round_data.notes = f"Store rejected: {store_response.reason}"
+            session.status = NegotiationStatus.REJECTED
+            session.final_result = store_response
+            return
+        
+        round_data.outcome = TurnOutcome.ACCEPTED
+        round_data.notes = f"Accepted bundle {accept.accepted_bundle}: ${accept.total_price:.0f}"
+        session.status = NegotiationStatus.ACCEPTED
+        session.final_result = accept
+        reservation = boutique.inventory.get_reservation(boutique.agent_id, session.session_id)
+        if reservation:
+            session.reservation_id = reservation.reservation_id
+    
+    def _record_reject(self, session: NegotiationSession, round_data: NegotiationRound, reject: AuraReject):
+        round_data.outcome = TurnOutcome.REJECTED
+        round_data.notes = f"Rejected: {reject.reason}"
+        if reject.would_accept_if:
+            round_data.notes += f" | Would accept if: {reject.would_accept_if}"
+        session.status = NegotiationStatus.REJECTED
+        session.final_result = reject
+    
+    async def _emit(
+        self, session: NegotiationSession, round_data: NegotiationRound, on_event: Optional[TranscriptCallback]
+    ):
+        if on_event is None:
+            return
+        for entry in self._round_entries(session, round_data):
+            await on_event(session, entry)
+    
     def get_session(self, session_id: str) -> Optional[NegotiationSession]:
-        return self.sessions.get(session_id)
+        session = self.sessions.get(session_id)
+        if session is None and self.archive is not None:
+            session = self.archive.load(session_id)
+        return session
+    
+    def _last_offer(self, session: NegotiationSession) -> Optional[AuraOffer]:
+        for round_data in reversed(session.rounds):
+            if isinstance(round_data.store_message, AuraOffer):
+                return round_data.store_message
+        return None
+    
+    def get_accepted_bundle(self, session: NegotiationSession) -> Optional[OfferBundle]:
+        if not isinstance(session.final_result, AuraAccept):
+            return None
+        offer = self._last_offer(session)
+        if offer is None:
+            return None
+        return offer.option_a if session.final_result.accepted_bundle == "A" else offer.option_b
+    
+    def resolve_accept(self, session: NegotiationSession, accept: AuraAccept) -> AuraAccept:
+        # Products and price come from what the store offered, never from the accept itself.
+        offer = self._last_offer(session)
+        if offer is None:
+            raise ValueError("There is no offer to accept")
+        bundle = {"A": offer.option_a, "B": offer.option_b}.get(accept.accepted_bundle)
+        if bundle is None:
+            raise ValueError(f"The last offer has no bundle {accept.accepted_bundle!r}")
+        return accept.model_copy(update={
+            "session_id": session.session_id,
+            "in_reply_to": offer.message_id,
+            "accepted_products": bundle.products,
+            "final_vibe": bundle.achievable_vibe or accept.final_vibe,
+            "total_price": bundle.total_price,
+            "transformations_accepted": bundle.transformations,
+            "constraint_checks": bundle.constraint_checks,
+        })
     
     def get_transcript(self, session: NegotiationSession) -> list[dict]:
         transcript = []
+        with span("transcript"):
+            for round_data in session.rounds:
+                transcript.extend(self._round_entries(session, round_data))
+        return transcript
+    
+    def _round_entries(self, session: NegotiationSession, round_data: NegotiationRound) -> list[dict]:
+        transcript = []
         
-        for round_data in session.rounds:
-            if round_data.shopper_message:
-                msg = round_data.shopper_message
-                if isinstance(msg, AuraQuery):
-                    transcript.append({
-                        "speaker": "Shopper",
-                        "type": "QUERY",
-                        "turn": round_data.round_number,
-                        "content": f"Looking for: \"{msg.emotional_prompt}\"",
-                        "details": {
-                            "budget": f"${msg.constraints.max_budget:.0f}",
-                            "vibe": msg.target_vibe.description if msg.target_vibe else "",
-                        }
-                    })
-                elif isinstance(msg, AuraAccept):
-                    transcript.append({
-                        "speaker": "Shopper",
-                        "type": "ACCEPT",
-                        "turn": round_data.round_number,
-                        "content": f"✓ Accepted Option {msg.accepted_bundle}: {len(msg.accepted_products)} items for ${msg.total_price:.0f}",
-                        "details": {
-                            "products": [p.name for p in msg.accepted_products],
-                            "transformations": [t.reason for t in msg.transformations_accepted],
-                        }
-                    })
-                elif isinstance(msg, AuraReject):
-                    transcript.append({
-                        "speaker": "Shopper",
-                        "type": "REJECT",
-                        "turn": round_data.round_number,
-                        "content": f"✗ {msg.reason}",
-                        "details": {
-                            "would_accept_if": msg.would_accept_if,
-                            "violations": [c.message for c in msg.constraint_violations],
-                        }
-                    })
-            
-            if round_data.store_message:
-                msg = round_data.store_message
-                if isinstance(msg, AuraOffer):
-                    opt_a = msg.option_a
-                    opt_b = msg.option_b
-                    
-                    options_text = f"**Option A** ({opt_a.bundle_type}): {opt_a.match_score:.0%} match, ${opt_a.total_price:.0f}, distance {opt_a.vibe_distance:.0%}"
-                    if opt_b:
-                        options_text += f"\n**Option B** ({opt_b.bundle_type}): {opt_b.match_score:.0%} match, ${opt_b.total_price:.0f}, distance {opt_b.vibe_distance:.0%}"
-                    
-                    transcript.append({
-                        "speaker": session.store_name,
-                        "type": "OFFER",
-                        "turn": round_data.round_number,
-                        "content": msg.message,
-                        "details": {
-                            "options": options_text,
-                            "recommended": msg.recommended,
-                            "option_a": {
-                                "products": [p.name for p in opt_a.products],
-                                "match": f"{opt_a.match_score:.0%}",
-                                "price": f"${opt_a.total_price:.0f}",
-                                "distance": f"{opt_a.vibe_distance:.0%}",
-                                "budget_ok": all(c.satisfied for c in opt_a.constraint_checks),
-                            },
-                            "option_b": {
-                                "products": [p.name for p in opt_b.products] if opt_b else [],
-                                "match": f"{opt_b.match_score:.0%}" if opt_b else "N/A",
-                                "price": f"${opt_b.total_price:.0f}" if opt_b else "N/A",
-                                "distance": f"{opt_b.vibe_distance:.0%}" if opt_b else "N/A",
-                                "budget_ok": all(c.satisfied for c in opt_b.constraint_checks) if opt_b else False,
-                            } if opt_b else None,
-                            "transformations": [
-                                f"{t.axis}: {t.from_value:.0%}→{t.to_value:.0%} ({t.direction}{abs(t.delta):.0%}) — {t.item_change}"
-                                for t in opt_a.transformations
-                            ],
-                            "latency_ms": msg.latency_ms,
-                        }
-                    })
+        if round_data.shopper_message:
+            msg = round_data.shopper_message
+            if isinstance(msg, AuraQuery):
+                transcript.append({
+                    "speaker": "Shopper",
+                    "type": "QUERY",
+                    "turn": round_data.round_number,
+                    "content": f"Looking for: \"{msg.emotional_prompt}\"",
+                    "details": {
+                        "budget": f"${msg.constraints.max_budget:.0f}",
+                        "vibe": msg.target_vibe.description if msg.target_vibe else "",
+                    }
+                })
+            elif isinstance(msg, AuraAccept):
+                transcript.append({
+                    "speaker": "Shopper",
+                    "type": "ACCEPT",
+                    "turn": round_data.round_number,
+                    "content": f"✓ Accepted Option {msg.accepted_bundle}: {len(msg.accepted_products)} items for ${msg.total_price:.0f}",
+                    "details": {
+                        "products": [p.name for p in msg.accepted_products],
+                        "transformations": [t.reason for t in msg.transformations_accepted],
+                    }
+                })
+            elif isinstance(msg, AuraReject):
+                transcript.append({
+                    "speaker": "Shopper",
+                    "type": "REJECT",
+                    "turn": round_data.round_number,
+                    "content": f"✗ {msg.reason}",
+                    "details": {
+                        "would_accept_if": msg.would_accept_if,
+                        "violations": [c.message for c in msg.constraint_violations],
+                    }
+                })
         
+        if round_data.store_message:
+            msg = round_data.store_message
+            if isinstance(msg, AuraReject):
+                transcript.append({
+                    "speaker": session.store_name,
+                    "type": "REJECT",
+                    "turn": round_data.round_number,
+                    "content": f"✗ {msg.reason}",
+                    "details": {
+                        "would_accept_if": msg.would_accept_if,
+                        "violations": [c.message for c in msg.constraint_violations],
+                    }
+                })
+            elif isinstance(msg, AuraOffer):
+                opt_a = msg.option_a
+                opt_b = msg.option_b
+                
+                options_text = f"**Option A** ({opt_a.bundle_type}): {opt_a.match_score:.0%} match, ${opt_a.total_price:.0f}, distance {opt_a.vibe_distance:.0%}"
+                if opt_b:
+                    options_text += f"\n**Option B** ({opt_b.bundle_type}): {opt_b.match_score:.0%} match, ${opt_b.total_price:.0f}, distance {opt_b.vibe_distance:.0%}"
+                
+                transcript.append({
+                    "speaker": session.store_name,
+                    "type": "OFFER",
+                    "turn": round_data.round_number,
+                    "content": msg.message,
+                    "details": {
+                        "options": options_text,
+                        "recommended": msg.recommended,
+                        "option_a": {
+                            "products": [p.name for p in opt_a.products],
+                            "match": f"{opt_a.match_score:.0%}",
+                            "price": f"${opt_a.total_price:.0f}",
+                            "distance": f"{opt_a.vibe_distance:.0%}",
+                            "budget_ok": all(c.satisfied for c in opt_a.constraint_checks),
+                        },
+                        "option_b": {
+                            "products": [p.name for p in opt_b.products] if opt_b else [],
+                            "match": f"{opt_b.match_score:.0%}" if opt_b else "N/A",
+                            "price": f"${opt_b.total_price:.0f}" if opt_b else "N/A",
+                            "distance": f"{opt_b.vibe_distance:.0%}" if opt_b else "N/A",
+                            "budget_ok": all(c.satisfied for c in opt_b.constraint_checks) if opt_b else False,
+                        } if opt_b else None,
+                        "transformations": [
+                            f"{t.axis}: {t.from_value:.0%}→{t.to_value:.0%} ({t.direction}{abs(t.delta):.0%}) — {t.item_change}"
+                            for t in opt_a.transformations
+                        ],
+                        "latency_ms": msg.latency_ms,
+                    }
+                })
+    
         return transcript
 
 
-negotiation_engine = NegotiationEngine()
+negotiation_engine = NegotiationEngine(
+    archive=SessionArchive(settings.archive_dir, NegotiationSession) if settings.archive_dir else None,
+)
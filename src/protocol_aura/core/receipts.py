@@ -0,0 +1,223 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Mapping, Optional
+import hashlib
+
+from pydantic import BaseModel, Field
+
+from protocol_aura.protocol import AuraMessage
+
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+HASH_ALGORITHM = "RFC6962-SHA256"
+VERIFY_CHUNK = 256
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def canonical_message(message: AuraMessage) -> bytes:
+    return message.model_dump_json().encode("utf-8")
+
+
+def _split(size: int) -> int:
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+def _subtree_root(leaves: list[bytes]) -> bytes:
+    if not leaves:
+        return EMPTY_ROOT
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return node_hash(_subtree_root(leaves[:k]), _subtree_root(leaves[k:]))
+
+
+def _audit_path(index: int, leaves: list[bytes]) -> list[bytes]:
+    if len(leaves) <= 1:
+        return []
+    k = _split(len(leaves))
+    if index < k:
+        return _audit_path(index, leaves[:k]) + [_subtree_root(leaves[k:])]
+    return _audit_path(index - k, leaves[k:]) + [_subtree_root(leaves[:k])]
+
+
+class MerkleLog:
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        self.leaves: list[bytes] = []
+        self._frontier: list[tuple[int, bytes]] = []
+        for leaf in leaves:
+            self.append_leaf(leaf)
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def append(self, data: bytes) -> int:
+        return self.append_leaf(leaf_hash(data))
+
+    def append_leaf(self, leaf: bytes) -> int:
+        index = len(self.leaves)
+        self.leaves.append(leaf)
+        node, height = leaf, 0
+        while self._frontier and self._frontier[-1][0] == height:
+            node = node_hash(self._frontier.pop()[1], node)
+            height += 1
+        self._frontier.append((height, node))
+        return index
+
+    def root(self) -> bytes:
+        if not self._frontier:
+            return EMPTY_ROOT
+        node = self._frontier[-1][1]
+        for _, left in reversed(self._frontier[:-1]):
+            node = node_hash(left, node)
+        return node
+
+    def proof(self, index: int) -> list[bytes]:
+        if not 0 <= index < len(self.leaves):
+            raise IndexError(f"Leaf {index} is outside a log of size {len(self.leaves)}")
+        return _audit_path(index, self.leaves)
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, path: list[bytes], root: bytes) -> bool:
+    if not 0 <= index < size:
+        return False
+    fn, sn, node = index, size - 1, leaf
+    for sibling in path:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            node = node_hash(sibling, node)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            node = node_hash(node, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and node == root
+
+
+def iter_transcript_messages(session) -> Iterator[tuple[int, str, AuraMessage]]:
+    for round_data in session.rounds:
+        if round_data.shopper_message is not None:
+            yield round_data.round_number, "shopper", round_data.shopper_message
+        if round_data.store_message is not None:
+            yield round_data.round_number, "store", round_data.store_message
+
+
+def transcript_log(session) -> MerkleLog:
+    log = session._transcript_log
+    if log is None or len(log) != session.transcript_size:
+        log = MerkleLog(leaf_hash(canonical_message(message)) for _, _, message in iter_transcript_messages(session))
+        session._transcript_log = log
+    return log
+
+
+def append_round(session, round_data):
+    log = transcript_log(session)
+    session.rounds.append(round_data)
+    for message in (round_data.shopper_message, round_data.store_message):
+        if message is not None:
+            log.append(canonical_message(message))
+    session.transcript_root = log.root().hex()
+    session.transcript_size = len(log)
+
+
+class TranscriptReceipt(BaseModel):
+    session_id: str
+    store_id: str
+    algorithm: str = HASH_ALGORITHM
+    tree_size: int
+    root: str
+    leaf_hashes: list[str] = Field(default_factory=list)
+
+
+class InclusionProof(BaseModel):
+    session_id: str
+    leaf_index: int
+    tree_size: int
+    round_number: int
+    speaker: str
+    message: str = Field(description="Canonical JSON of the proven message (the leaf preimage)")
+    audit_path: list[str]
+    root: str
+
+
+def build_receipt(session) -> TranscriptReceipt:
+    log = transcript_log(session)
+    return TranscriptReceipt(
+        session_id=session.session_id,
+        store_id=session.store_id,
+        tree_size=len(log),
+        root=log.root().hex(),
+        leaf_hashes=[leaf.hex() for leaf in log.leaves],
+    )
+
+
+def prove_message(session, index: int) -> InclusionProof:
+    log = transcript_log(session)
+    path = log.proof(index)
+    for position, (round_number, speaker, message) in enumerate(iter_transcript_messages(session)):
+        if position == index:
+            return InclusionProof(
+                session_id=session.session_id,
+                leaf_index=index,
+                tree_size=len(log),
+                round_number=round_number,
+                speaker=speaker,
+                message=canonical_message(message).decode("utf-8"),
+                audit_path=[node.hex() for node in path],
+                root=log.root().hex(),
+            )
+    raise IndexError(f"Leaf {index} is outside a log of size {len(log)}")
+
+
+def verify_proof(proof: InclusionProof) -> bool:
+    return verify_inclusion(
+        leaf_hash(proof.message.encode("utf-8")),
+        proof.leaf_index,
+        proof.tree_size,
+        [bytes.fromhex(node) for node in proof.audit_path],
+        bytes.fromhex(proof.root),
+    )
+
+
+def verify_receipt(receipt: TranscriptReceipt, session=None) -> bool:
+    if receipt.algorithm != HASH_ALGORITHM or len(receipt.leaf_hashes) != receipt.tree_size:
+        return False
+    leaves = [bytes.fromhex(leaf) for leaf in receipt.leaf_hashes]
+    if session is not None:
+        recomputed = [leaf_hash(canonical_message(message)) for _, _, message in iter_transcript_messages(session)]
+        if recomputed != leaves:
+            return False
+    return MerkleLog(leaves).root().hex() == receipt.root
+
+
+_MISSING = object()
+
+
+def _verify_chunk(chunk: list[tuple[TranscriptReceipt, object]]) -> list[bool]:
+    return [session is not _MISSING and verify_receipt(receipt, session) for receipt, session in chunk]
+
+
+def verify_receipts(
+    receipts: Iterable[TranscriptReceipt],
+    sessions: Optional[Mapping[str, object]] = None,
+    max_workers: Optional[int] = None,
+) -> list[bool]:
+    pairs = [
+        (receipt, None if sessions is None else sessions.get(receipt.session_id, _MISSING))
+        for receipt in receipts
+    ]
+    chunks = [pairs[i:i + VERIFY_CHUNK] for i in range(0, len(pairs), VERIFY_CHUNK)]
+    if len(chunks) <= 1:
+        return _verify_chunk(pairs)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return [ok for results in pool.map(_verify_chunk, chunks) for ok in results]
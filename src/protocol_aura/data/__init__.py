@@ -1,14 +1,22 @@
 from protocol_aura.data.sample_boutiques import (
     SAMPLE_BOUTIQUES,
-    get_all_boutiques,
-    get_boutique,
     create_cyber_noir_boutique,
     create_vintage_romantic_boutique,
     create_chaotic_maximalist_boutique,
 )
+from protocol_aura.data.registry import (
+    CatalogEntry,
+    CatalogRegistry,
+    catalog_registry,
+    get_all_boutiques,
+    get_boutique,
+)
 
 __all__ = [
     "SAMPLE_BOUTIQUES",
+    "CatalogEntry",
+    "CatalogRegistry",
+    "catalog_registry",
     "get_all_boutiques",
     "get_boutique",
     "create_cyber_noir_boutique",
@@ -0,0 +1,223 @@
+from pathlib import Path
+from typing import Optional, Union
+import argparse
+import json
+import time
+
+import numpy as np
+
+
+DEFAULT_NPROBE = 8
+KMEANS_SAMPLE_PER_LIST = 40
+KMEANS_BATCH_ROWS = 4096
+ASSIGN_CHUNK_ROWS = 65536
+EXACT_CHUNK_ROWS = 65536
+
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _top(rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+def exact_search(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    allowed: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    query = normalized(query)
+    best_rows = np.zeros(0, dtype=np.int64)
+    best_scores = np.zeros(0, dtype=np.float32)
+    for start in range(0, len(matrix), EXACT_CHUNK_ROWS):
+        rows = np.arange(start, min(start + EXACT_CHUNK_ROWS, len(matrix)))
+        if allowed is not None:
+            rows = rows[allowed[rows]]
+            if not len(rows):
+                continue
+            block = matrix[rows]
+        else:
+            block = matrix[start:start + EXACT_CHUNK_ROWS]
+        scores = normalized(block) @ query
+        best_rows, best_scores = _top(np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), k)
+    return best_rows, best_scores
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray, space: str = "full"):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.space = space
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def dims(self) -> int:
+        return self.centroids.shape[1]
+
+    def _candidates(self, lists: np.ndarray) -> np.ndarray:
+        return np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        nprobe: int = DEFAULT_NPROBE,
+        allowed: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        query = normalized(query)
+        closeness = self.centroids @ query
+        ranked = np.argsort(-closeness)
+        probed = 0
+        nprobe = max(1, min(nprobe, self.n_lists))
+        candidates = np.zeros(0, dtype=np.int64)
+        # Widen the probe when filtering leaves too few rows in the nearest lists.
+        while probed < self.n_lists:
+            more = self._candidates(ranked[probed:nprobe])
+            probed = nprobe
+            if allowed is not None:
+                more = more[allowed[more]]
+            candidates = np.concatenate([candidates, more])
+            if len(candidates) >= k:
+                break
+            nprobe = min(nprobe * 4, self.n_lists)
+        if not len(candidates):
+            return candidates, np.zeros(0, dtype=np.float32)
+        candidates.sort()
+        return _top(candidates, normalized(matrix[candidates]) @ query, k)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, offsets=self.offsets, rows=self.rows, space=np.array(self.space))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IVFIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["centroids"], data["offsets"], data["rows"], str(data["space"]))
+
+
+def default_lists(rows: int) -> int:
+    return max(1, int(round(np.sqrt(rows))))
+
+
+def build_ivf(
+    matrix: np.ndarray,
+    n_lists: int = 0,
+    iterations: int = 20,
+    seed: int = 7,
+    space: str = "full",
+) -> IVFIndex:
+    from sklearn.cluster import MiniBatchKMeans
+
+    rows = len(matrix)
+    n_lists = min(n_lists or default_lists(rows), rows)
+    rng = np.random.default_rng(seed)
+    sample_rows = min(rows, n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = normalized(matrix[np.sort(rng.choice(rows, sample_rows, replace=False))])
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_lists,
+        batch_size=KMEANS_BATCH_ROWS,
+        max_iter=iterations,
+        n_init=1,
+        random_state=seed,
+    ).fit(sample)
+    centroids = normalized(kmeans.cluster_centers_)
+
+    assignment = np.empty(rows, dtype=np.int64)
+    for start in range(0, rows, ASSIGN_CHUNK_ROWS):
+        block = normalized(matrix[start:start + ASSIGN_CHUNK_ROWS])
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+    return IVFIndex(centroids, offsets, order, space)
+
+
+def index_recall(
+    index: IVFIndex,
+    matrix: np.ndarray,
+    queries: int = 200,
+    k: int = 10,
+    nprobes: tuple[int, ...] = (1, 4, 8, 16, 32),
+    seed: int = 7,
+) -> list[dict]:
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.choice(len(matrix), min(queries, len(matrix)), replace=False)
+    # Perturbed catalog rows stand in for prompts that land near, not on, a product.
+    noise = rng.standard_normal((len(rows), matrix.shape[1])).astype(np.float32)
+    targets = normalized(matrix[np.sort(rows)]) + 0.1 * normalized(noise)
+    exact = [set(exact_search(matrix, target, k)[0].tolist()) for target in targets]
+
+    report = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [index.search(matrix, target, k, nprobe)[0] for target in targets]
+        elapsed = time.perf_counter() - start
+        hits = [len(truth.intersection(result.tolist())) for truth, result in zip(exact, found)]
+        report.append({
+            "nprobe": nprobe,
+            f"recall@{k}": round(float(np.mean(hits)) / k, 4),
+            "query_ms": round(elapsed / len(targets) * 1000, 3),
+        })
+    return report
+
+
+def main():
+    from protocol_aura.data.loader import EMBEDDINGS_FILE, read_projection, write_ann_index
+
+    parser = argparse.ArgumentParser(description="Build an IVF index over a catalog's embeddings")
+    parser.add_argument("directory", type=str, help="Catalog directory with embeddings.npy")
+    parser.add_argument("--lists", type=int, default=0, help="Inverted lists (default: sqrt(rows))")
+    parser.add_argument("--iterations", type=int, default=20, help="k-means iterations")
+    parser.add_argument("--queries", type=int, default=200, help="Recall queries (0 = skip)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    projection, reduced = read_projection(directory)
+    if projection is not None:
+        matrix, space = reduced, projection.version
+    elif (directory / EMBEDDINGS_FILE).exists():
+        matrix, space = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r"), "full"
+    else:
+        parser.error(f"{directory} has no embeddings")
+
+    start = time.perf_counter()
+    index = build_ivf(matrix, args.lists, args.iterations, args.seed, space)
+    build_s = time.perf_counter() - start
+    write_ann_index(directory, index)
+
+    sizes = np.diff(index.offsets)
+    report = {
+        "directory": str(directory),
+        "space": space,
+        "rows": len(matrix),
+        "dims": index.dims,
+        "lists": index.n_lists,
+        "largest_list": int(sizes.max()),
+        "build_s": round(build_s, 2),
+    }
+    if args.queries > 0:
+        report["recall"] = index_recall(index, matrix, args.queries, args.k, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
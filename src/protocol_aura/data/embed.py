@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Iterable, Iterator
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from protocol_aura.core.config import settings
+from protocol_aura.data.loader import (
+    ANN_FILE,
+    EMBEDDINGS_FILE,
+    PROJECTION_FILE,
+    _find_products_file,
+    iter_product_records,
+)
+from protocol_aura.protocol.embeddings import HASH_BATCH_ROWS, HASH_SEED, HashingEmbedder
+
+
+def product_text(record: dict) -> str:
+    vibe = record.get("vibe_vector") or {}
+    parts = (record.get("name"), record.get("category"), record.get("description"), vibe.get("description"))
+    return " ".join(part for part in parts if part)
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[list[str]]:
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def embed_catalog(directory: Path, embedder: HashingEmbedder) -> int:
+    products = _find_products_file(directory)
+    rows = sum(1 for _ in iter_product_records(products))
+    tmp = directory / f"{EMBEDDINGS_FILE}.tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(rows, embedder.dims))
+    start = 0
+    for chunk in _chunks((product_text(record) for record in iter_product_records(products)), HASH_BATCH_ROWS):
+        out[start:start + len(chunk)] = embedder.embed(chunk)
+        start += len(chunk)
+    out.flush()
+    del out
+    os.replace(tmp, directory / EMBEDDINGS_FILE)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed a catalog offline with the deterministic hashing embedder")
+    parser.add_argument("directory", type=str, help="Catalog directory with a products file")
+    parser.add_argument("--dims", type=int, default=settings.vibe_dimensions)
+    parser.add_argument("--seed", type=int, default=HASH_SEED)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    start = time.perf_counter()
+    rows = embed_catalog(directory, HashingEmbedder(args.dims, args.seed))
+    elapsed = time.perf_counter() - start
+
+    # A projection or index fitted to the old vectors no longer describes these.
+    stale = [name for name in (PROJECTION_FILE, ANN_FILE) if (directory / name).exists()]
+    for name in stale:
+        (directory / name).unlink()
+    print(json.dumps({
+        "directory": str(directory),
+        "rows": rows,
+        "dims": args.dims,
+        "seconds": round(elapsed, 2),
+        "rows_per_minute": int(rows / elapsed * 60) if elapsed else rows,
+        "dropped": stale,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from collections.abc import Sequence
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from protocol_aura.protocol import Constraints, Product
+
+
+MATERIAL_KEYS = ("material", "fabric")
+RATING_KEY = "rating"
+DELIVERY_DAYS_KEY = "delivery_days"
+
+
+class AttributeIndex:
+    def __init__(self, values: list[str], codes: np.ndarray):
+        self.values = values
+        self.codes = codes
+        self.codes.setflags(write=False)
+        self._lookup = {value: code for code, value in enumerate(values)}
+        self._bitmaps: dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_column(cls, column: Sequence) -> "AttributeIndex":
+        lookup: dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in column),
+            dtype=np.int32,
+            count=len(column),
+        )
+        return cls(list(lookup), codes)
+
+    def bitmap(self, value: str) -> np.ndarray:
+        code = self._lookup.get(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        bitmap = self._bitmaps.get(code)
+        if bitmap is None:
+            bitmap = self.codes == code
+            bitmap.setflags(write=False)
+            self._bitmaps[code] = bitmap
+        return bitmap
+
+    def matching(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        result = np.zeros(len(self.codes), dtype=bool)
+        for value in self.values:
+            if predicate(value):
+                result |= self.bitmap(value)
+        return result
+
+    def any_of(self, values: Iterable[str]) -> np.ndarray:
+        wanted = {v.lower() for v in values}
+        return self.matching(lambda value: value.lower() in wanted)
+
+    def patched(self, rows: list[int], values: list[Optional[str]], grow: int) -> "AttributeIndex":
+        vocabulary = list(self.values)
+        lookup = dict(self._lookup)
+        codes = np.concatenate([self.codes, np.full(grow, -1, dtype=np.int32)])
+        for row, value in zip(rows, values):
+            if value is None:
+                codes[row] = -1
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(vocabulary)
+                vocabulary.append(value)
+            codes[row] = code
+        return AttributeIndex(vocabulary, codes)
+
+
+def _number(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
+
+
+def product_columns(products: Sequence[Product]) -> tuple[list[str], dict[str, list[Optional[str]]]]:
+    categories = [p.category for p in products]
+    attributes: dict[str, list[Optional[str]]] = {}
+    for row, p in enumerate(products):
+        for key, value in p.attributes.items():
+            if key not in attributes:
+                attributes[key] = [None] * len(products)
+            attributes[key][row] = value
+    return categories, attributes
+
+
+def constraint_mask(entry, constraints: Constraints) -> np.ndarray:
+    mask = entry.active.copy()
+
+    if constraints.categories:
+        mask &= entry.category_index.any_of(constraints.categories)
+
+    if constraints.materials_exclude:
+        excluded = [term.lower() for term in constraints.materials_exclude]
+        for key in MATERIAL_KEYS:
+            index = entry.attribute_index.get(key)
+            if index is not None:
+                mask &= ~index.matching(lambda value: any(term in value.lower() for term in excluded))
+
+    rating = entry.attribute_index.get(RATING_KEY)
+    if rating is not None and constraints.min_rating > 0:
+        mask &= ~rating.matching(lambda value: _number(value) < constraints.min_rating)
+
+    delivery = entry.attribute_index.get(DELIVERY_DAYS_KEY)
+    if delivery is not None:
+        mask &= ~delivery.matching(lambda value: _number(value) > constraints.delivery_days_max)
+
+    return mask
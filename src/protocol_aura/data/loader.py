@@ -0,0 +1,414 @@
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+import json
+import os
+
+import numpy as np
+
+from protocol_aura.protocol import BrandManifold, Product, VibeAxis, VibeVector
+
+if TYPE_CHECKING:
+    from protocol_aura.data.ann import IVFIndex
+    from protocol_aura.data.projection import EmbeddingProjection
+
+
+AXIS_ORDER = [axis.value for axis in VibeAxis]
+
+MANIFOLD_FILE = "manifold.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+PROJECTION_FILE = "projection.json"
+ANN_FILE = "ann.json"
+PRODUCT_FILES = ("products.jsonl", "products.parquet")
+
+PARQUET_BATCH_ROWS = 65536
+
+
+class ProductTable(Sequence):
+    def __init__(
+        self,
+        ids: list[str],
+        names: list[str],
+        categories: list[str],
+        descriptions: list[str],
+        prices: np.ndarray,
+        stock: np.ndarray,
+        axis_matrix: np.ndarray,
+        vibe_descriptions: list[str],
+        image_urls: list[Optional[str]],
+        attributes: dict[str, list[Optional[str]]],
+        embeddings: Optional[np.ndarray] = None,
+        reduced_embeddings: Optional[np.ndarray] = None,
+        projection: Optional["EmbeddingProjection"] = None,
+        ann_index: Optional["IVFIndex"] = None,
+    ):
+        self.ids = ids
+        self.names = names
+        self.categories = categories
+        self.descriptions = descriptions
+        self.prices = prices
+        self.stock = stock
+        self.axis_matrix = axis_matrix
+        self.vibe_descriptions = vibe_descriptions
+        self.image_urls = image_urls
+        self.attributes = attributes
+        self.embeddings = embeddings
+        self.reduced_embeddings = reduced_embeddings
+        self.projection = projection
+        self.ann_index = ann_index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("product index out of range")
+        return self._materialize(index)
+
+    def compacted(
+        self,
+        rows: np.ndarray,
+        overrides: dict[int, Product],
+        prices: np.ndarray,
+        stock: np.ndarray,
+        axis_matrix: np.ndarray,
+    ) -> "ProductTable":
+        rows = rows.tolist()
+
+        def column(values: list, field: str) -> list:
+            return [getattr(overrides[r], field) if r in overrides else values[r] for r in rows]
+
+        def vibe_description(r: int) -> str:
+            vibe = overrides[r].vibe_vector
+            return vibe.description if vibe else ""
+
+        keys = set(self.attributes)
+        for product in overrides.values():
+            keys.update(product.attributes)
+        empty = [None] * len(self)
+        attributes = {
+            key: [
+                overrides[r].attributes.get(key) if r in overrides
+                else self.attributes.get(key, empty)[r]
+                for r in rows
+            ]
+            for key in keys
+        }
+
+        return ProductTable(
+            ids=column(self.ids, "id"),
+            names=column(self.names, "name"),
+            categories=column(self.categories, "category"),
+            descriptions=column(self.descriptions, "description"),
+            prices=np.ascontiguousarray(prices),
+            stock=np.ascontiguousarray(stock),
+            axis_matrix=np.ascontiguousarray(axis_matrix),
+            vibe_descriptions=[
+                vibe_description(r) if r in overrides else self.vibe_descriptions[r] for r in rows
+            ],
+            image_urls=column(self.image_urls, "image_url"),
+            attributes=attributes,
+        )
+
+    def _materialize(self, row: int) -> Product:
+        axes = {
+            axis: round(float(value), 4)
+            for axis, value in zip(AXIS_ORDER, self.axis_matrix[row])
+            if not np.isnan(value)
+        }
+        return Product(
+            id=self.ids[row],
+            name=self.names[row],
+            price=float(self.prices[row]),
+            category=self.categories[row],
+            description=self.descriptions[row],
+            vibe_vector=VibeVector(
+                embedding=[],
+                axes=axes,
+                description=self.vibe_descriptions[row],
+            ) if axes else None,
+            image_url=self.image_urls[row],
+            stock=int(self.stock[row]),
+            attributes={
+                key: column[row] for key, column in self.attributes.items()
+                if column[row] is not None
+            },
+        )
+
+
+class _TableBuilder:
+    def __init__(self):
+        self.ids: list[str] = []
+        self.names: list[str] = []
+        self.categories: list[str] = []
+        self.descriptions: list[str] = []
+        self.prices = array("d")
+        self.stock = array("q")
+        self.axes = array("f")
+        self.vibe_descriptions: list[str] = []
+        self.image_urls: list[Optional[str]] = []
+        self.attributes: dict[str, list[Optional[str]]] = {}
+
+    def add(self, record: dict):
+        row = len(self.ids)
+        self.ids.append(str(record["id"]))
+        self.names.append(record.get("name", ""))
+        self.categories.append(record.get("category", ""))
+        self.descriptions.append(record.get("description", ""))
+        self.prices.append(float(record.get("price", 0.0)))
+        self.stock.append(int(record.get("stock", 0) or 0))
+        self.image_urls.append(record.get("image_url"))
+
+        vibe = record.get("vibe_vector") or {}
+        axes = vibe.get("axes") or record.get("vibe_axes") or {}
+        self.axes.extend(float(axes.get(axis, "nan")) for axis in AXIS_ORDER)
+        self.vibe_descriptions.append(vibe.get("description", ""))
+
+        attributes = record.get("attributes") or {}
+        if isinstance(attributes, str):
+            attributes = json.loads(attributes)
+        elif isinstance(attributes, list):
+            attributes = dict(attributes)
+        for key in attributes:
+            if key not in self.attributes:
+                self.attributes[key] = [None] * row
+        for key, column in self.attributes.items():
+            value = attributes.get(key)
+            column.append(None if value is None else str(value))
+
+    def build(
+        self,
+        embeddings: Optional[np.ndarray],
+        reduced_embeddings: Optional[np.ndarray] = None,
+        projection: Optional["EmbeddingProjection"] = None,
+        ann_index: Optional["IVFIndex"] = None,
+    ) -> ProductTable:
+        return ProductTable(
+            ids=self.ids,
+            names=self.names,
+            categories=self.categories,
+            descriptions=self.descriptions,
+            prices=np.frombuffer(self.prices, dtype=np.float64),
+            stock=np.frombuffer(self.stock, dtype=np.int64),
+            axis_matrix=np.frombuffer(self.axes, dtype=np.float32).reshape(-1, len(AXIS_ORDER)),
+            vibe_descriptions=self.vibe_descriptions,
+            image_urls=self.image_urls,
+            attributes=self.attributes,
+            embeddings=embeddings,
+            reduced_embeddings=reduced_embeddings,
+            projection=projection,
+            ann_index=ann_index,
+        )
+
+
+def iter_product_records(path: Union[str, Path]) -> Iterator[dict]:
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Loading Parquet catalogs requires pyarrow") from e
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_ROWS):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported product file: {path.name}")
+
+
+def _find_products_file(directory: Path) -> Path:
+    for name in PRODUCT_FILES:
+        candidate = directory / name
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No products file in {directory} (expected one of {PRODUCT_FILES})")
+
+
+def load_catalog(directory: Union[str, Path]) -> BrandManifold:
+    directory = Path(directory)
+    header = json.loads((directory / MANIFOLD_FILE).read_text(encoding="utf-8"))
+
+    builder = _TableBuilder()
+    for record in iter_product_records(_find_products_file(directory)):
+        builder.add(record)
+
+    embeddings = None
+    embeddings_path = directory / EMBEDDINGS_FILE
+    if embeddings_path.exists():
+        embeddings = np.load(embeddings_path, mmap_mode="r")
+        if embeddings.shape[0] != len(builder.ids):
+            raise ValueError(
+                f"{embeddings_path} has {embeddings.shape[0]} rows for {len(builder.ids)} products"
+            )
+
+    projection, reduced = read_projection(directory)
+    if projection is not None:
+        if embeddings is not None and embeddings.shape[1] != projection.source_dims:
+            raise ValueError(
+                f"Projection {projection.version} expects {projection.source_dims}-d embeddings, "
+                f"catalog has {embeddings.shape[1]}-d"
+            )
+        if reduced.shape[0] != len(builder.ids):
+            raise ValueError(f"Projection {projection.version} has {reduced.shape[0]} rows for {len(builder.ids)} products")
+
+    ann_index = read_ann_index(directory)
+    if ann_index is not None:
+        space = projection.version if projection is not None else "full"
+        if ann_index.space != space or len(ann_index) != len(builder.ids):
+            raise ValueError(
+                f"{directory / ANN_FILE} indexes {len(ann_index)} {ann_index.space} vectors, "
+                f"catalog has {len(builder.ids)} {space} vectors; rebuild it"
+            )
+
+    header.pop("products", None)
+    manifold = BrandManifold.model_validate({**header, "products": []})
+    return manifold.model_copy(update={"products": builder.build(embeddings, reduced, projection, ann_index)})
+
+
+def read_projection(directory: Union[str, Path]) -> tuple[Optional["EmbeddingProjection"], Optional[np.ndarray]]:
+    from protocol_aura.data.projection import EmbeddingProjection
+
+    pointer = Path(directory) / PROJECTION_FILE
+    if not pointer.exists():
+        return None, None
+    meta = json.loads(pointer.read_text(encoding="utf-8"))
+    projection = EmbeddingProjection.load(pointer.parent / meta["model"])
+    if projection.version != meta["version"]:
+        raise ValueError(f"{pointer} points at {meta['version']} but {meta['model']} is {projection.version}")
+    return projection, np.load(pointer.parent / meta["embeddings"], mmap_mode="r")
+
+
+def read_ann_index(directory: Union[str, Path]) -> Optional["IVFIndex"]:
+    from protocol_aura.data.ann import IVFIndex
+
+    pointer = Path(directory) / ANN_FILE
+    if not pointer.exists():
+        return None
+    meta = json.loads(pointer.read_text(encoding="utf-8"))
+    return IVFIndex.load(pointer.parent / meta["index"])
+
+
+def write_ann_index(directory: Union[str, Path], index: "IVFIndex") -> Path:
+    directory = Path(directory)
+    index_name = f"ivf-{index.space}.npz"
+    index.save(directory / index_name)
+    meta = {"index": index_name, "space": index.space, "lists": index.n_lists, "rows": len(index)}
+    tmp = directory / f"{ANN_FILE}.tmp"
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, directory / ANN_FILE)
+    return directory / index_name
+
+
+def write_projection(
+    directory: Union[str, Path],
+    projection: "EmbeddingProjection",
+    embeddings: np.ndarray,
+) -> np.ndarray:
+    directory = Path(directory)
+    model_name = f"projection-{projection.version}.npz"
+    embeddings_name = f"embeddings-{projection.version}.npy"
+    projection.save(directory / model_name)
+    reduced = np.lib.format.open_memmap(
+        directory / embeddings_name, mode="w+", dtype=np.float32, shape=(len(embeddings), projection.dims)
+    )
+    projection.transform_into(embeddings, reduced)
+    reduced.flush()
+    del reduced
+
+    meta = {
+        "version": projection.version,
+        "method": projection.method,
+        "source_dims": projection.source_dims,
+        "dims": projection.dims,
+        "fitted_rows": projection.fitted_rows,
+        "model": model_name,
+        "embeddings": embeddings_name,
+    }
+    tmp = directory / f"{PROJECTION_FILE}.tmp"
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, directory / PROJECTION_FILE)
+    ann_pointer = directory / ANN_FILE
+    if ann_pointer.exists() and json.loads(ann_pointer.read_text(encoding="utf-8"))["space"] != projection.version:
+        ann_pointer.unlink()
+    return np.load(directory / embeddings_name, mmap_mode="r")
+
+
+def write_catalog(
+    manifold: BrandManifold,
+    directory: Union[str, Path],
+    embeddings: Optional[np.ndarray] = None,
+) -> Path:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    header = manifold.model_dump(mode="json", exclude={"products"})
+    (directory / MANIFOLD_FILE).write_text(json.dumps(header), encoding="utf-8")
+
+    products = manifold.products
+    with (directory / PRODUCT_FILES[0]).open("w", encoding="utf-8") as f:
+        for record in _iter_export_records(products):
+            f.write(json.dumps(record))
+            f.write("\n")
+
+    if embeddings is None:
+        embeddings = getattr(products, "embeddings", None)
+    if embeddings is None:
+        embeddings = _collect_embeddings(products)
+    if embeddings is not None:
+        np.save(directory / EMBEDDINGS_FILE, np.asarray(embeddings, dtype=np.float32))
+        projection = getattr(products, "projection", None)
+        if projection is not None:
+            write_projection(directory, projection, embeddings)
+    return directory
+
+
+def _iter_export_records(products: Iterable[Product]) -> Iterator[dict]:
+    if isinstance(products, ProductTable):
+        yield from _iter_table_records(products)
+        return
+    for p in products:
+        yield p.model_dump(mode="json", exclude={"vibe_vector": {"embedding"}})
+
+
+def _iter_table_records(table: ProductTable) -> Iterator[dict]:
+    prices = table.prices.tolist()
+    stock = table.stock.tolist()
+    axis_rows = table.axis_matrix.tolist()
+    attributes = list(table.attributes.items())
+    for row in range(len(table)):
+        axes = {axis: round(value, 4) for axis, value in zip(AXIS_ORDER, axis_rows[row]) if value == value}
+        yield {
+            "id": table.ids[row],
+            "name": table.names[row],
+            "price": prices[row],
+            "category": table.categories[row],
+            "description": table.descriptions[row],
+            "vibe_vector": {"axes": axes, "description": table.vibe_descriptions[row]} if axes else None,
+            "image_url": table.image_urls[row],
+            "stock": stock[row],
+            "attributes": {key: column[row] for key, column in attributes if column[row] is not None},
+        }
+
+
+def _collect_embeddings(products: Sequence) -> Optional[np.ndarray]:
+    if isinstance(products, ProductTable) or not products:
+        return None
+    vectors = [p.vibe_vector.embedding if p.vibe_vector else [] for p in products]
+    dims = max(len(v) for v in vectors)
+    if dims == 0:
+        return None
+
+    matrix = np.zeros((len(vectors), dims), dtype=np.float32)
+    for row, vector in enumerate(vectors):
+        matrix[row, :len(vector)] = vector
+    return matrix
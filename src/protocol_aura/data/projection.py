@@ -0,0 +1,176 @@
+from pathlib import Path
+from typing import Optional, Union
+import argparse
+import hashlib
+import json
+
+import numpy as np
+
+
+PROJECTION_METHODS = ("pca", "random")
+DEFAULT_DIMS = 64
+FIT_SAMPLE_ROWS = 50_000
+TRANSFORM_CHUNK_ROWS = 65536
+RECALL_QUERIES = 200
+RECALL_KS = (1, 10, 100)
+
+
+class EmbeddingProjection:
+    def __init__(self, method: str, mean: np.ndarray, components: np.ndarray, fitted_rows: int = 0):
+        self.method = method
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.fitted_rows = fitted_rows
+        digest = hashlib.sha256(self.mean.tobytes() + self.components.tobytes()).hexdigest()
+        self.version = f"{method}{self.dims}-{digest[:12]}"
+
+    @property
+    def dims(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def source_dims(self) -> int:
+        return self.components.shape[1]
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] != self.source_dims:
+            raise ValueError(f"Projection {self.version} expects {self.source_dims}-d input, got {vectors.shape[-1]}-d")
+        return (vectors - self.mean) @ self.components.T
+
+    def transform_into(self, vectors: np.ndarray, out: np.ndarray) -> np.ndarray:
+        for start in range(0, len(vectors), TRANSFORM_CHUNK_ROWS):
+            out[start:start + TRANSFORM_CHUNK_ROWS] = self.transform(vectors[start:start + TRANSFORM_CHUNK_ROWS])
+        return out
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                method=np.array(self.method),
+                version=np.array(self.version),
+                mean=self.mean,
+                components=self.components,
+                fitted_rows=np.array(self.fitted_rows, dtype=np.int64),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "EmbeddingProjection":
+        with np.load(path, allow_pickle=False) as data:
+            projection = cls(str(data["method"]), data["mean"], data["components"], int(data["fitted_rows"]))
+            if projection.version != str(data["version"]):
+                raise ValueError(f"{path} does not match its recorded version {data['version']}")
+        return projection
+
+
+def fit_projection(
+    embeddings: np.ndarray,
+    dims: int = DEFAULT_DIMS,
+    method: str = "pca",
+    sample_rows: int = FIT_SAMPLE_ROWS,
+    seed: int = 7,
+) -> EmbeddingProjection:
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method!r} (expected one of {PROJECTION_METHODS})")
+    rng = np.random.default_rng(seed)
+    rows = len(embeddings)
+    if rows > sample_rows:
+        sample = np.asarray(embeddings[np.sort(rng.choice(rows, sample_rows, replace=False))], dtype=np.float32)
+    else:
+        sample = np.asarray(embeddings, dtype=np.float32)
+
+    if method == "pca":
+        from sklearn.decomposition import PCA
+
+        model = PCA(n_components=dims, svd_solver="randomized", random_state=seed).fit(sample)
+        return EmbeddingProjection(method, model.mean_, model.components_, len(sample))
+
+    from sklearn.random_projection import GaussianRandomProjection
+
+    model = GaussianRandomProjection(n_components=dims, random_state=seed).fit(sample)
+    return EmbeddingProjection(method, np.zeros(sample.shape[1], dtype=np.float32), model.components_, len(sample))
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def top_k(queries: np.ndarray, matrix: np.ndarray, k: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    queries = _normalized(queries)
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(matrix), TRANSFORM_CHUNK_ROWS):
+        scores = queries @ _normalized(matrix[start:start + TRANSFORM_CHUNK_ROWS]).T
+        if exclude is not None:
+            local = exclude - start
+            hit = (local >= 0) & (local < scores.shape[1])
+            scores[np.flatnonzero(hit), local[hit]] = -np.inf
+        rows = np.arange(start, start + scores.shape[1])
+        scores = np.concatenate([best_scores, scores], axis=1)
+        candidates = np.concatenate([best_rows, np.broadcast_to(rows, (len(queries), len(rows)))], axis=1)
+        keep = min(k, scores.shape[1])
+        picked = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(scores, picked, axis=1)
+        best_rows = np.take_along_axis(candidates, picked, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_rows, order, axis=1)
+
+
+def neighbour_recall(
+    embeddings: np.ndarray,
+    reduced: np.ndarray,
+    queries: int = RECALL_QUERIES,
+    ks: tuple[int, ...] = RECALL_KS,
+    seed: int = 7,
+) -> dict:
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(embeddings), min(queries, len(embeddings)), replace=False))
+    k = min(max(ks), len(embeddings) - 1)
+    exact = top_k(np.asarray(embeddings[rows]), embeddings, k, exclude=rows)
+    approx = top_k(np.asarray(reduced[rows]), reduced, k, exclude=rows)
+    recall = {}
+    for size in ks:
+        size = min(size, k)
+        hits = [len(np.intersect1d(e[:size], a[:size], assume_unique=True)) for e, a in zip(exact, approx)]
+        recall[f"recall@{size}"] = round(float(np.mean(hits)) / size, 4)
+    return {"queries": len(rows), **recall}
+
+
+def main():
+    from protocol_aura.data.loader import EMBEDDINGS_FILE, write_projection
+
+    parser = argparse.ArgumentParser(description="Fit a catalog embedding projection and report neighbour recall")
+    parser.add_argument("directory", type=str, help="Catalog directory with embeddings.npy")
+    parser.add_argument("--method", choices=PROJECTION_METHODS, default="pca")
+    parser.add_argument("--dims", type=int, default=DEFAULT_DIMS)
+    parser.add_argument("--sample", type=int, default=FIT_SAMPLE_ROWS, help="Rows used to fit the projection")
+    parser.add_argument("--queries", type=int, default=RECALL_QUERIES, help="Rows used as recall queries (0 = skip)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+    projection = fit_projection(embeddings, args.dims, args.method, args.sample, args.seed)
+    reduced = write_projection(directory, projection, embeddings)
+
+    report = {
+        "directory": str(directory),
+        "version": projection.version,
+        "rows": len(embeddings),
+        "source_dims": projection.source_dims,
+        "dims": projection.dims,
+        "fitted_rows": projection.fitted_rows,
+        "bytes_full": int(embeddings.nbytes),
+        "bytes_reduced": int(reduced.nbytes),
+    }
+    if args.queries > 0 and len(embeddings) > 1:
+        report.update(neighbour_recall(embeddings, reduced, args.queries, seed=args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
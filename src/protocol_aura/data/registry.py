@@ -0,0 +1,601 @@
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+import json
+import threading
+
+import numpy as np
+
+from protocol_aura.core.config import settings
+from protocol_aura.protocol import BrandManifold, Product
+from protocol_aura.data.indexes import AttributeIndex, product_columns
+from protocol_aura.data.loader import AXIS_ORDER, MANIFOLD_FILE, ProductTable, load_catalog
+from protocol_aura.data.sample_boutiques import SAMPLE_BOUTIQUES
+
+
+COMPACT_MIN_CHANGES = 1024
+COMPACT_RATIO = 0.1
+INCREMENTAL_REORDER_MAX = 32
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+def _axis_row(product: Product) -> np.ndarray:
+    axes = product.vibe_vector.axes if product.vibe_vector else {}
+    return np.array([axes.get(axis, np.nan) for axis in AXIS_ORDER], dtype=np.float32)
+
+
+class ProductOverlay(Sequence):
+    def __init__(self, base: Sequence, rows: dict[int, Product], length: int):
+        self.base = base
+        self.rows = rows
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("product index out of range")
+        product = self.rows.get(index)
+        return product if product is not None else self.base[index]
+
+
+class ActiveProducts(Sequence):
+    def __init__(self, products: Sequence, rows: np.ndarray):
+        self.products = products
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.products[int(row)] for row in self.rows[index]]
+        return self.products[int(self.rows[index])]
+
+
+class CatalogEntry:
+    __slots__ = (
+        "manifold",
+        "version",
+        "size",
+        "products",
+        "product_ids",
+        "row_index",
+        "active",
+        "prices",
+        "price_order",
+        "stock",
+        "axis_matrix",
+        "center",
+        "category_index",
+        "attribute_index",
+        "embeddings",
+        "embedding_rows",
+        "projection",
+        "reduced_embeddings",
+        "ann_index",
+        "search_cache",
+        "pending_changes",
+    )
+
+    def __init__(self, manifold: BrandManifold, version: int = 1):
+        products = manifold.products
+        self.manifold = manifold
+        self.version = version
+        self.size = len(products)
+        self.products = products
+        if isinstance(products, ProductTable):
+            self.product_ids = list(products.ids)
+            self.prices = _readonly(np.asarray(products.prices, dtype=np.float64))
+            self.stock = _readonly(np.asarray(products.stock, dtype=np.int64))
+            self.axis_matrix = _readonly(np.asarray(products.axis_matrix, dtype=np.float32))
+            self.embeddings = products.embeddings
+            self.projection = products.projection
+            self.reduced_embeddings = products.reduced_embeddings
+            self.ann_index = products.ann_index
+            categories, attributes = products.categories, products.attributes
+        else:
+            self.product_ids = [p.id for p in products]
+            self.prices = _readonly(np.array([p.price for p in products], dtype=np.float64))
+            self.stock = _readonly(np.array([p.stock for p in products], dtype=np.int64))
+
+            axis_matrix = np.full((len(products), len(AXIS_ORDER)), np.nan, dtype=np.float32)
+            for row, p in enumerate(products):
+                axis_matrix[row] = _axis_row(p)
+            self.axis_matrix = _readonly(axis_matrix)
+            self.embeddings = None
+            self.projection = None
+            self.reduced_embeddings = None
+            self.ann_index = None
+            categories, attributes = product_columns(products)
+
+        self.category_index = AttributeIndex.from_column(categories)
+        self.attribute_index = {
+            key: AttributeIndex.from_column(column) for key, column in attributes.items()
+        }
+        self.embedding_rows = _readonly(
+            np.arange(self.size, dtype=np.int64)
+            if self.embeddings is not None or self.reduced_embeddings is not None
+            else np.full(self.size, -1, dtype=np.int64)
+        )
+        self.row_index = {pid: row for row, pid in enumerate(self.product_ids)}
+        self.active = _readonly(np.ones(self.size, dtype=bool))
+        self.price_order = _readonly(np.argsort(self.prices, kind="stable"))
+        self.pending_changes = 0
+        self.search_cache = {}
+
+        center_axes = manifold.vibe_center.axes
+        self.center = _readonly(
+            np.array([center_axes.get(axis, np.nan) for axis in AXIS_ORDER], dtype=np.float32)
+        )
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"CatalogEntry is immutable; cannot set {name!r}")
+        super().__setattr__(name, value)
+
+    @property
+    def store_id(self) -> str:
+        return self.manifold.store_id
+
+    def __len__(self) -> int:
+        return int(self.active.sum()) if self.pending_changes else self.size
+
+    def row_of(self, product_id: str) -> Optional[int]:
+        row = self.row_index.get(product_id)
+        if row is None or row >= self.size or not self.active[row]:
+            return None
+        return row
+
+    def product(self, product_id: str) -> Optional[Product]:
+        row = self.row_of(product_id)
+        return None if row is None else self.products[row]
+
+    def embedding(self, row: int) -> Optional[np.ndarray]:
+        physical = self.embedding_rows[row]
+        if physical >= 0 and self.embeddings is not None:
+            return self.embeddings[physical]
+        product = self.products[row]
+        if product.vibe_vector and product.vibe_vector.embedding:
+            return np.asarray(product.vibe_vector.embedding, dtype=np.float32)
+        return None
+
+    def project_query(self, embedding) -> Optional[np.ndarray]:
+        if self.projection is None or embedding is None or not len(embedding):
+            return None
+        return self.projection.transform(embedding)
+
+    def reduced_embedding(self, row: int) -> Optional[np.ndarray]:
+        physical = self.embedding_rows[row]
+        if physical >= 0 and self.reduced_embeddings is not None:
+            return self.reduced_embeddings[physical]
+        return self.project_query(self.embedding(row))
+
+    def _search_space(self, embedding) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        query = np.asarray(embedding, dtype=np.float32)
+        if self.projection is not None:
+            if query.shape[-1] != self.projection.source_dims:
+                return None, None
+            return self.reduced_embeddings, self.projection.transform(query)
+        if self.embeddings is not None:
+            return (self.embeddings, query) if query.shape[-1] == self.embeddings.shape[1] else (None, None)
+        return None, query
+
+    def _loose_vectors(self, width: int) -> tuple[np.ndarray, np.ndarray]:
+        from protocol_aura.data.ann import normalized
+
+        # Rows without a physical embedding (upserts, or in-memory catalogs) are
+        # scored exactly; their vectors are gathered once per entry version.
+        cached = self.search_cache.get(("loose", width))
+        if cached is not None:
+            return cached
+        base = self.products.base if isinstance(self.products, ProductOverlay) else self.products
+        if isinstance(base, ProductTable):
+            candidates = sorted(self.products.rows) if isinstance(self.products, ProductOverlay) else []
+        else:
+            candidates = range(self.size)
+
+        rows, vectors = [], []
+        for row in candidates:
+            if self.embedding_rows[row] >= 0:
+                continue
+            product = self.products[row]
+            vector = product.vibe_vector.embedding if product.vibe_vector else None
+            if vector and len(vector) == width and any(vector):
+                rows.append(row)
+                vectors.append(vector)
+        matrix = np.array(vectors, dtype=np.float32).reshape(len(rows), width)
+        if self.projection is not None and len(rows):
+            matrix = self.projection.transform(matrix)
+        cached = (np.array(rows, dtype=np.int64), normalized(matrix))
+        self.search_cache[("loose", width)] = cached
+        return cached
+
+    def semantic_search(
+        self,
+        embedding,
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        from protocol_aura.data.ann import exact_search, normalized
+
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if embedding is None or not len(embedding) or not np.any(embedding):
+            return empty
+        matrix, query = self._search_space(embedding)
+        if query is None:
+            return empty
+        allowed = self.active if allowed is None else allowed
+
+        found_rows, found_scores = [], []
+        if matrix is not None:
+            valid = np.flatnonzero((self.embedding_rows >= 0) & allowed)
+            if len(valid):
+                physical = self.embedding_rows[valid]
+                physical_allowed = np.zeros(len(matrix), dtype=bool)
+                physical_allowed[physical] = True
+                if self.ann_index is not None:
+                    rows, scores = self.ann_index.search(
+                        matrix, query, k, nprobe or settings.ann_nprobe, physical_allowed
+                    )
+                else:
+                    rows, scores = exact_search(matrix, query, k, physical_allowed)
+                # Non-negative embedding_rows only ever increase, so the mapping inverts by search.
+                found_rows.append(valid[np.searchsorted(physical, rows)])
+                found_scores.append(scores)
+
+        loose_rows, loose_matrix = self._loose_vectors(len(embedding))
+        if len(loose_rows):
+            keep = allowed[loose_rows]
+            found_rows.append(loose_rows[keep])
+            found_scores.append(loose_matrix[keep] @ normalized(query))
+
+        if not found_rows:
+            return empty
+        rows, scores = np.concatenate(found_rows), np.concatenate(found_scores)
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def _derive(self, **changes) -> "CatalogEntry":
+        changes.setdefault("search_cache", {})
+        entry = object.__new__(CatalogEntry)
+        for name in CatalogEntry.__slots__:
+            value = changes[name] if name in changes else getattr(self, name)
+            object.__setattr__(entry, name, value)
+        return entry
+
+    def apply(
+        self,
+        prices: Optional[dict[str, float]] = None,
+        stock: Optional[dict[str, int]] = None,
+        upserts: Iterable[Product] = (),
+        deletes: Iterable[str] = (),
+        version: Optional[int] = None,
+    ) -> "CatalogEntry":
+        changed: dict[int, Product] = {}
+        axes_changed: set[int] = set()
+        embeddings_changed: set[int] = set()
+        new_ids: dict[str, int] = {}
+
+        for product in upserts:
+            row = self.row_index.get(product.id)
+            if row is None or row >= self.size:
+                row = new_ids.setdefault(product.id, self.size + len(new_ids))
+            changed[row] = product
+            axes_changed.add(row)
+            if product.vibe_vector and product.vibe_vector.embedding:
+                embeddings_changed.add(row)
+
+        for field, updates in (("price", prices or {}), ("stock", stock or {})):
+            for product_id, value in updates.items():
+                row = self.row_of(product_id)
+                if row is None:
+                    row = new_ids.get(product_id)
+                if row is None:
+                    raise ValueError(f"Unknown product: {product_id}")
+                current = changed.get(row) or self.products[row]
+                changed[row] = current.model_copy(update={field: value})
+
+        deleted_rows = []
+        for product_id in deletes:
+            row = self.row_of(product_id)
+            if row is None:
+                raise ValueError(f"Unknown product: {product_id}")
+            deleted_rows.append(row)
+            changed.pop(row, None)
+            axes_changed.discard(row)
+
+        if not changed and not deleted_rows:
+            return self
+
+        grow = len(new_ids)
+        size = self.size + grow
+        rows = np.fromiter(changed, dtype=np.int64, count=len(changed))
+
+        def patched(array: np.ndarray, values: list, fill) -> np.ndarray:
+            out = np.concatenate([array, np.full((grow,) + array.shape[1:], fill, array.dtype)])
+            if len(rows):
+                out[rows] = values
+            return _readonly(out)
+
+        new_prices = patched(self.prices, [changed[r].price for r in rows], 0.0)
+        new_stock = patched(self.stock, [changed[r].stock for r in rows], 0)
+
+        axis_matrix = self.axis_matrix
+        if axes_changed or grow:
+            axis_rows = sorted(axes_changed)
+            axis_matrix = np.concatenate(
+                [axis_matrix, np.full((grow, len(AXIS_ORDER)), np.nan, dtype=np.float32)]
+            )
+            if axis_rows:
+                axis_matrix[axis_rows] = [_axis_row(changed[r]) for r in axis_rows]
+            axis_matrix = _readonly(axis_matrix)
+
+        category_index, attribute_index = self.category_index, self.attribute_index
+        if axes_changed:
+            upserted = sorted(axes_changed)
+            category_index = category_index.patched(
+                upserted, [changed[r].category for r in upserted], grow
+            )
+            keys = set(attribute_index)
+            for r in upserted:
+                keys.update(changed[r].attributes)
+            empty = AttributeIndex([], np.full(self.size, -1, dtype=np.int32))
+            attribute_index = {
+                key: attribute_index.get(key, empty).patched(
+                    upserted, [changed[r].attributes.get(key) for r in upserted], grow
+                )
+                for key in keys
+            }
+        elif grow:
+            category_index = category_index.patched([], [], grow)
+            attribute_index = {key: index.patched([], [], grow) for key, index in attribute_index.items()}
+
+        embedding_rows = self.embedding_rows
+        if grow or embeddings_changed:
+            embedding_rows = np.concatenate([embedding_rows, np.full(grow, -1, dtype=np.int64)])
+            embedding_rows[sorted(embeddings_changed)] = -1
+            embedding_rows = _readonly(embedding_rows)
+
+        active = self.active
+        reactivated = [int(r) for r in rows if r < self.size and not active[r]]
+        if grow or deleted_rows or reactivated:
+            active = np.concatenate([active, np.ones(grow, dtype=bool)])
+            active[reactivated] = True
+            active[deleted_rows] = False
+            active = _readonly(active)
+
+        price_rows = [
+            int(r) for r in rows if r >= self.size or changed[r].price != self.prices[r]
+        ]
+        if len(price_rows) > INCREMENTAL_REORDER_MAX:
+            price_order = np.argsort(new_prices, kind="stable")
+        else:
+            price_order = self.price_order
+            moved = [r for r in price_rows if r < self.size]
+            if moved:
+                price_order = price_order[~np.isin(price_order, moved)]
+            for r in price_rows:
+                position = np.searchsorted(new_prices[price_order], new_prices[r], side="right")
+                price_order = np.insert(price_order, position, r)
+        price_order = _readonly(np.asarray(price_order, dtype=np.int64))
+
+        row_index, product_ids = self.row_index, self.product_ids
+        if new_ids:
+            # Never grow these in place: earlier snapshots are still being read.
+            row_index = {**row_index, **new_ids}
+            product_ids = [*product_ids, *new_ids]
+
+        if isinstance(self.products, ProductOverlay):
+            base, overlay_rows = self.products.base, dict(self.products.rows)
+        else:
+            base, overlay_rows = self.products, {}
+        overlay_rows.update(changed)
+        products = ProductOverlay(base, overlay_rows, size)
+
+        visible = products if active.all() else ActiveProducts(products, np.flatnonzero(active))
+        return self._derive(
+            manifold=self.manifold.model_copy(update={"products": visible}),
+            version=self.version + 1 if version is None else version,
+            size=size,
+            products=products,
+            product_ids=product_ids,
+            row_index=row_index,
+            active=active,
+            prices=new_prices,
+            price_order=price_order,
+            stock=new_stock,
+            axis_matrix=axis_matrix,
+            category_index=category_index,
+            attribute_index=attribute_index,
+            embedding_rows=embedding_rows,
+            pending_changes=self.pending_changes + len(changed) + len(deleted_rows),
+        )
+
+    def needs_compaction(self) -> bool:
+        return self.pending_changes >= max(COMPACT_MIN_CHANGES, self.size * COMPACT_RATIO)
+
+    def compact(self) -> "CatalogEntry":
+        if not self.pending_changes:
+            return self
+
+        keep = np.flatnonzero(self.active)
+        if isinstance(self.products, ProductOverlay):
+            base, overlay_rows = self.products.base, self.products.rows
+        else:
+            base, overlay_rows = self.products, {}
+
+        embedding_rows = self.embedding_rows[keep]
+        if isinstance(base, ProductTable):
+            table = base.compacted(
+                keep, overlay_rows, self.prices[keep], self.stock[keep], self.axis_matrix[keep]
+            )
+            table.embeddings = self.embeddings
+            table.reduced_embeddings = self.reduced_embeddings
+            table.projection = self.projection
+            table.ann_index = self.ann_index
+            retained = {
+                new_row: overlay_rows[old_row]
+                for new_row, old_row in enumerate(keep.tolist())
+                if old_row in overlay_rows and embedding_rows[new_row] < 0
+            }
+            compacted = table
+            products = ProductOverlay(table, retained, len(table)) if retained else table
+        else:
+            compacted = products = [self.products[int(row)] for row in keep]
+
+        entry = CatalogEntry(self.manifold.model_copy(update={"products": compacted}), self.version)
+        return entry._derive(
+            manifold=entry.manifold.model_copy(update={"products": products}),
+            products=products,
+            embeddings=self.embeddings,
+            projection=self.projection,
+            reduced_embeddings=self.reduced_embeddings,
+            ann_index=self.ann_index,
+            embedding_rows=_readonly(embedding_rows),
+        )
+
+
+class CatalogRegistry:
+    def __init__(self, loaders: Optional[dict[str, Callable[[], BrandManifold]]] = None):
+        self._loaders: dict[str, Callable[[], BrandManifold]] = dict(loaders or {})
+        self._entries: dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+        self._store_locks: dict[str, threading.Lock] = {}
+
+    def _store_lock(self, store_id: str) -> threading.Lock:
+        lock = self._store_locks.get(store_id)
+        if lock is None:
+            with self._lock:
+                lock = self._store_locks.setdefault(store_id, threading.Lock())
+        return lock
+
+    def register(self, store_id: str, loader: Callable[[], BrandManifold]):
+        with self._store_lock(store_id):
+            self._loaders[store_id] = loader
+            self._entries.pop(store_id, None)
+
+    def register_directory(self, directory: Union[str, Path]) -> list[str]:
+        directory = Path(directory)
+        if (directory / MANIFOLD_FILE).exists():
+            catalog_dirs = [directory]
+        else:
+            catalog_dirs = sorted(p.parent for p in directory.glob(f"*/{MANIFOLD_FILE}"))
+
+        store_ids = []
+        for catalog_dir in catalog_dirs:
+            header = json.loads((catalog_dir / MANIFOLD_FILE).read_text(encoding="utf-8"))
+            self.register(header["store_id"], lambda path=catalog_dir: load_catalog(path))
+            store_ids.append(header["store_id"])
+        return store_ids
+
+    def publish(self, manifold: BrandManifold) -> CatalogEntry:
+        store_id = manifold.store_id
+        with self._store_lock(store_id):
+            current = self._entries.get(store_id)
+            entry = CatalogEntry(manifold, version=current.version + 1 if current else 1)
+            self._loaders[store_id] = lambda: manifold
+            self._entries[store_id] = entry
+        return entry
+
+    def get(self, store_id: str) -> CatalogEntry:
+        entry = self._entries.get(store_id)
+        if entry is not None:
+            return entry
+
+        if store_id not in self._loaders:
+            raise ValueError(f"Unknown boutique: {store_id}")
+
+        with self._store_lock(store_id):
+            entry = self._entries.get(store_id)
+            if entry is None:
+                entry = CatalogEntry(self._loaders[store_id]())
+                self._entries[store_id] = entry
+        return entry
+
+    def reload(self, store_id: str) -> CatalogEntry:
+        loader = self._loaders.get(store_id)
+        if loader is None:
+            raise ValueError(f"Unknown boutique: {store_id}")
+
+        manifold = loader()
+        with self._store_lock(store_id):
+            current = self._entries.get(store_id)
+            entry = CatalogEntry(manifold, version=current.version + 1 if current else 1)
+            self._entries[store_id] = entry
+        return entry
+
+    def reload_all(self) -> list[CatalogEntry]:
+        return [self.reload(store_id) for store_id in self.store_ids()]
+
+    def apply(
+        self,
+        store_id: str,
+        prices: Optional[dict[str, float]] = None,
+        stock: Optional[dict[str, int]] = None,
+        upserts: Iterable[Product] = (),
+        deletes: Iterable[str] = (),
+    ) -> CatalogEntry:
+        self.get(store_id)
+        with self._store_lock(store_id):
+            current = self._entries[store_id]
+            entry = current.apply(prices=prices, stock=stock, upserts=upserts, deletes=deletes)
+            if entry.needs_compaction():
+                entry = entry.compact()
+            self._entries[store_id] = entry
+        return entry
+
+    def upsert_product(self, store_id: str, product: Product) -> CatalogEntry:
+        return self.apply(store_id, upserts=[product])
+
+    def delete_product(self, store_id: str, product_id: str) -> CatalogEntry:
+        return self.apply(store_id, deletes=[product_id])
+
+    def update_price(self, store_id: str, product_id: str, price: float) -> CatalogEntry:
+        return self.apply(store_id, prices={product_id: price})
+
+    def update_stock(self, store_id: str, product_id: str, stock: int) -> CatalogEntry:
+        return self.apply(store_id, stock={product_id: stock})
+
+    def compact(self, store_id: str) -> CatalogEntry:
+        self.get(store_id)
+        with self._store_lock(store_id):
+            entry = self._entries[store_id].compact()
+            self._entries[store_id] = entry
+        return entry
+
+    def store_ids(self) -> list[str]:
+        return list(self._loaders)
+
+    def all(self) -> list[CatalogEntry]:
+        return [self.get(store_id) for store_id in self.store_ids()]
+
+    def loaded(self) -> list[CatalogEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+
+catalog_registry = CatalogRegistry(SAMPLE_BOUTIQUES)
+if settings.catalog_dir:
+    catalog_registry.register_directory(settings.catalog_dir)
+
+
+def get_all_boutiques() -> list[BrandManifold]:
+    return [entry.manifold for entry in catalog_registry.all()]
+
+
+def get_boutique(store_id: str) -> BrandManifold:
+    return catalog_registry.get(store_id).manifold
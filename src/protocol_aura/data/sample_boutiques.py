@@ -256,12 +256,3 @@ SAMPLE_BOUTIQUES = {
     "chaotic-maximalist": create_chaotic_maximalist_boutique,
 }
 
-
-def get_all_boutiques() -> list[BrandManifold]:
-    return [factory() for factory in SAMPLE_BOUTIQUES.values()]
-
-
-def get_boutique(store_id: str) -> BrandManifold:
-    if store_id in SAMPLE_BOUTIQUES:
-        return SAMPLE_BOUTIQUES[store_id]()
-    raise ValueError(f"Unknown boutique: {store_id}")
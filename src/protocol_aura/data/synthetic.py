@@ -0,0 +1,419 @@
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import argparse
+import json
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from protocol_aura.data.loader import AXIS_ORDER, EMBEDDINGS_FILE, ProductTable, write_catalog
+from protocol_aura.protocol import BrandManifold, VibeVector
+
+
+DEFAULT_SEED = 7
+EMBEDDING_CHUNK_ROWS = 65536
+
+ARCHETYPES = {
+    "cyber": {
+        "axes": [0.75, 0.70, 0.15, 0.85, 0.25, 0.35, 0.80, 0.20],
+        "tags": ["cyberpunk", "tech-wear", "dark-futurism"],
+        "words": ["Obsidian", "Chrome", "Neural", "Midnight", "Circuit", "Vector"],
+        "personas": ["Cyber CEO", "Night-shift coder", "Sleek tech founder", "Future-facing architect"],
+        "activities": ["codes at night", "ships tech products", "lives in a modern loft"],
+    },
+    "vintage": {
+        "axes": [0.20, 0.45, 0.92, 0.40, 0.80, 0.20, 0.78, 0.35],
+        "tags": ["vintage", "romantic", "heirloom"],
+        "words": ["Heirloom", "Rose", "Pearl", "Velvet", "Gilded", "Antique"],
+        "personas": ["Retro jazz singer", "Vintage bookshop owner", "Classic film buff"],
+        "activities": ["collects antique records", "dances to 1920s jazz", "restores classic cars"],
+    },
+    "maximalist": {
+        "axes": [0.85, 0.08, 0.40, 0.55, 0.60, 0.92, 0.30, 0.88],
+        "tags": ["maximalist", "statement", "chaotic"],
+        "words": ["Neon", "Chaos", "Prism", "Riot", "Confetti", "Glitch"],
+        "personas": ["Chaos goblin", "Maximalist artist", "Wild festival regular"],
+        "activities": ["throws crazy parties", "paints wild murals", "DJs at raves"],
+    },
+    "minimal": {
+        "axes": [0.30, 0.90, 0.30, 0.55, 0.40, 0.10, 0.72, 0.25],
+        "tags": ["minimal", "essentialist", "monochrome"],
+        "words": ["Stone", "Linen", "Quiet", "Slate", "Pure", "Axis"],
+        "personas": ["Minimal designer", "Clean-living monk", "Simple-wardrobe engineer"],
+        "activities": ["keeps a sparse studio", "meditates before work", "owns ten clean pieces"],
+    },
+    "luxury": {
+        "axes": [0.20, 0.60, 0.50, 0.85, 0.45, 0.12, 0.92, 0.25],
+        "tags": ["luxury", "tailored", "refined"],
+        "words": ["Sovereign", "Ivory", "Sable", "Regent", "Crown", "Marble"],
+        "personas": ["Sophisticated executive", "Luxury hotelier", "Refined art collector"],
+        "activities": ["chairs the board", "hosts premium dinners", "attends gallery openings"],
+    },
+    "punk": {
+        "axes": [0.92, 0.35, 0.45, 0.60, 0.30, 0.70, 0.25, 0.55],
+        "tags": ["punk", "alternative", "streetwear"],
+        "words": ["Rivet", "Static", "Anarchy", "Razor", "Spike", "Feral"],
+        "personas": ["Punk bassist", "Alternative tattoo artist", "Skate-park rebel"],
+        "activities": ["plays edge-of-town gigs", "skates every night", "runs a rebel zine"],
+    },
+    "cozy": {
+        "axes": [0.15, 0.45, 0.60, 0.25, 0.90, 0.25, 0.50, 0.65],
+        "tags": ["cozy", "cottagecore", "handmade"],
+        "words": ["Hearth", "Meadow", "Honey", "Moss", "Garden", "Maple"],
+        "personas": ["Cozy baker", "Garden-loving teacher", "Friendly cafe owner"],
+        "activities": ["hosts warm dinners", "tends a cottage garden", "knits by the fire"],
+    },
+    "playful": {
+        "axes": [0.55, 0.30, 0.35, 0.35, 0.75, 0.65, 0.35, 0.92],
+        "tags": ["playful", "colorful", "pop"],
+        "words": ["Bubble", "Candy", "Sunny", "Pop", "Kite", "Jelly"],
+        "personas": ["Party planner", "Kids' show host", "Club promoter"],
+        "activities": ["plans every party", "DJs at the club", "collects cartoon toys"],
+    },
+}
+
+ARCHETYPE_WEIGHTS = {
+    "cyber": 0.16, "vintage": 0.14, "maximalist": 0.08, "minimal": 0.16,
+    "luxury": 0.12, "punk": 0.08, "cozy": 0.14, "playful": 0.12,
+}
+
+# Symmetric correlation between axes in AXIS_ORDER; products drift together along these.
+AXIS_CORRELATIONS = {
+    ("minimalism", "chaos"): -0.55,
+    ("rebellion", "chaos"): 0.45,
+    ("chaos", "playfulness"): 0.45,
+    ("elegance", "playfulness"): -0.35,
+    ("elegance", "chaos"): -0.35,
+    ("power", "elegance"): 0.45,
+    ("nostalgia", "warmth"): 0.40,
+    ("rebellion", "elegance"): -0.25,
+}
+
+CATEGORIES = {
+    "tops": {"weight": 0.24, "base_price": 70.0, "nouns": ["Tee", "Blouse", "Shirt", "Knit", "Tank"]},
+    "bottoms": {"weight": 0.16, "base_price": 95.0, "nouns": ["Trousers", "Skirt", "Cargo", "Jeans"]},
+    "dresses": {"weight": 0.10, "base_price": 160.0, "nouns": ["Dress", "Gown", "Slip", "Midi"]},
+    "outerwear": {"weight": 0.14, "base_price": 240.0, "nouns": ["Blazer", "Jacket", "Coat", "Parka"]},
+    "footwear": {"weight": 0.14, "base_price": 180.0, "nouns": ["Boots", "Loafers", "Sneakers", "Heels"]},
+    "accessories": {"weight": 0.22, "base_price": 55.0, "nouns": ["Pendant", "Ring Set", "Scarf", "Bag"]},
+}
+
+MATERIALS = {
+    "tops": ["cotton", "silk", "linen", "jersey", "merino"],
+    "bottoms": ["denim", "wool-blend", "linen", "nylon", "cotton"],
+    "dresses": ["silk", "velvet", "cotton", "satin", "lace"],
+    "outerwear": ["wool", "leather", "nylon", "tweed", "faux fur"],
+    "footwear": ["leather", "suede", "synthetic", "canvas"],
+    "accessories": ["titanium", "silver", "freshwater pearl", "leather", "mixed metals"],
+}
+
+COLORS = ["black", "ivory", "charcoal", "crimson", "sage", "cobalt", "blush", "chrome", "mustard"]
+FITS = ["relaxed", "structured", "slim", "oversized", "tailored"]
+FIT_CATEGORIES = frozenset({"tops", "bottoms", "dresses", "outerwear"})
+
+STORE_NOUNS = ["Atelier", "House", "Supply", "Studio", "Collective", "Works", "Archive", "Lab"]
+OCCASIONS = [
+    "", "", "board meeting", "gallery opening", "first date", "weekend rave",
+    "dinner hosting", "job interview", "wedding guest", "conference keynote",
+]
+
+
+class SyntheticShopper(BaseModel):
+    user_id: str
+    user_name: str
+    archetype: str
+    emotional_prompt: str
+    budget: float
+    context: str = ""
+    target_stores: list[str] = Field(default_factory=list)
+
+
+def _correlation_factor() -> np.ndarray:
+    correlation = np.eye(len(AXIS_ORDER))
+    for (a, b), value in AXIS_CORRELATIONS.items():
+        i, j = AXIS_ORDER.index(a), AXIS_ORDER.index(b)
+        correlation[i, j] = correlation[j, i] = value
+    return np.linalg.cholesky(correlation)
+
+
+_AXIS_FACTOR = _correlation_factor()
+_ARCHETYPE_NAMES = list(ARCHETYPES)
+_ARCHETYPE_AXES = np.array([ARCHETYPES[name]["axes"] for name in _ARCHETYPE_NAMES])
+_ARCHETYPE_P = np.array([ARCHETYPE_WEIGHTS[name] for name in _ARCHETYPE_NAMES])
+_CATEGORY_NAMES = list(CATEGORIES)
+_CATEGORY_P = np.array([CATEGORIES[name]["weight"] for name in _CATEGORY_NAMES])
+
+
+def _store_rng(seed: int, index: int) -> np.random.Generator:
+    return np.random.default_rng([seed, index])
+
+
+def store_id_for(index: int) -> str:
+    return f"synthetic-{index:05d}"
+
+
+def _store_profile(rng: np.random.Generator) -> dict:
+    primary, secondary = rng.choice(len(_ARCHETYPE_NAMES), size=2, replace=False, p=_ARCHETYPE_P)
+    mix = rng.beta(2.0, 6.0)
+    center = (1 - mix) * _ARCHETYPE_AXES[primary] + mix * _ARCHETYPE_AXES[secondary]
+    center = np.clip(center + rng.normal(0, 0.04, len(AXIS_ORDER)), 0.05, 0.95)
+    return {
+        "primary": _ARCHETYPE_NAMES[primary],
+        "secondary": _ARCHETYPE_NAMES[secondary],
+        "center": center,
+        "spread": rng.uniform(0.06, 0.14),
+        "price_tier": rng.lognormal(0.0, 0.35),
+        "restock": rng.uniform(4, 30),
+    }
+
+
+def _boundaries(rng: np.random.Generator, center: np.ndarray) -> dict[str, tuple[float, float]]:
+    distinct = np.argsort(-np.abs(center - 0.5))[: rng.integers(3, 6)]
+    boundaries = {}
+    for i in sorted(distinct):
+        width = rng.uniform(0.15, 0.35)
+        boundaries[AXIS_ORDER[i]] = (
+            round(max(0.0, center[i] - width), 2),
+            round(min(1.0, center[i] + width), 2),
+        )
+    return boundaries
+
+
+def _product_axes(rng: np.random.Generator, profile: dict, n_products: int) -> np.ndarray:
+    noise = rng.standard_normal((n_products, len(AXIS_ORDER))) @ _AXIS_FACTOR.T
+    axes = np.clip(profile["center"] + noise * profile["spread"], 0.0, 1.0).round(2).astype(np.float32)
+    axes[rng.random(axes.shape) < 0.15] = np.nan
+    return axes
+
+
+def _product_prices(rng: np.random.Generator, profile: dict, categories: np.ndarray, axes: np.ndarray) -> np.ndarray:
+    base = np.array([CATEGORIES[name]["base_price"] for name in _CATEGORY_NAMES])[categories]
+    filled = np.where(np.isnan(axes), 0.5, axes)
+    lift = (
+        1.0
+        + 0.8 * (filled[:, AXIS_ORDER.index("elegance")] - 0.5)
+        + 0.5 * (filled[:, AXIS_ORDER.index("power")] - 0.5)
+    )
+    prices = base * profile["price_tier"] * lift * rng.lognormal(0.0, 0.3, len(base))
+    return np.maximum(prices, 5.0).round(2)
+
+
+def _product_stock(rng: np.random.Generator, profile: dict, n_products: int) -> np.ndarray:
+    stock = rng.poisson(profile["restock"], n_products)
+    stock[rng.random(n_products) < 0.08] = 0
+    return stock.astype(np.int64)
+
+
+def _pick(rng: np.random.Generator, options: list[str], rows: np.ndarray) -> list[str]:
+    return [options[i] for i in rng.integers(0, len(options), len(rows))]
+
+
+def _product_attributes(rng: np.random.Generator, categories: np.ndarray) -> dict[str, list[Optional[str]]]:
+    materials = [""] * len(categories)
+    for code, name in enumerate(_CATEGORY_NAMES):
+        rows = np.flatnonzero(categories == code)
+        for row, material in zip(rows.tolist(), _pick(rng, MATERIALS[name], rows)):
+            materials[row] = material
+
+    fit_codes = {_CATEGORY_NAMES.index(name) for name in FIT_CATEGORIES}
+    fits = _pick(rng, FITS, categories)
+    return {
+        "material": materials,
+        "color": _pick(rng, COLORS, categories),
+        "fit": [fit if code in fit_codes else None for fit, code in zip(fits, categories.tolist())],
+        "rating": [f"{r:.1f}" for r in np.clip(rng.normal(4.2, 0.5, len(categories)), 1.0, 5.0)],
+        "delivery_days": [str(d) for d in rng.integers(1, 21, len(categories))],
+    }
+
+
+def _projection(seed: int, dims: int) -> np.ndarray:
+    return np.random.default_rng([seed, dims]).standard_normal((len(AXIS_ORDER), dims)).astype(np.float32)
+
+
+def fill_embeddings(out: np.ndarray, axis_matrix: np.ndarray, seed: int = DEFAULT_SEED, index: int = 0):
+    projection = _projection(seed, out.shape[1])
+    rng = np.random.default_rng([seed, index, out.shape[1]])
+    for start in range(0, len(out), EMBEDDING_CHUNK_ROWS):
+        axes = axis_matrix[start:start + EMBEDDING_CHUNK_ROWS]
+        centered = np.where(np.isnan(axes), 0.0, axes - 0.5)
+        noise = rng.standard_normal((len(axes), out.shape[1]), dtype=np.float32)
+        out[start:start + len(axes)] = centered @ projection + 0.25 * noise
+
+
+def generate_boutique(
+    index: int,
+    n_products: int,
+    seed: int = DEFAULT_SEED,
+    dims: int = 0,
+) -> BrandManifold:
+    rng = _store_rng(seed, index)
+    profile = _store_profile(rng)
+    store_id = store_id_for(index)
+    words = ARCHETYPES[profile["primary"]]["words"]
+    store_name = f"{words[index % len(words)]} {STORE_NOUNS[index // len(words) % len(STORE_NOUNS)]} {index}"
+
+    categories = rng.choice(len(_CATEGORY_NAMES), size=n_products, p=_CATEGORY_P)
+    axes = _product_axes(rng, profile, n_products)
+    adjectives = ARCHETYPES[profile["primary"]]["words"] + ARCHETYPES[profile["secondary"]]["words"][:2]
+    adjective_rows = rng.integers(0, len(adjectives), n_products).tolist()
+    noun_rows = rng.integers(0, 4, n_products).tolist()
+    category_rows = categories.tolist()
+
+    embeddings = None
+    if dims:
+        embeddings = np.empty((n_products, dims), dtype=np.float32)
+        fill_embeddings(embeddings, axes, seed, index)
+
+    table = ProductTable(
+        ids=[f"{store_id}-{row:07d}" for row in range(n_products)],
+        names=[
+            f"{adjectives[a]} {CATEGORIES[_CATEGORY_NAMES[c]]['nouns'][n]}"
+            for a, c, n in zip(adjective_rows, category_rows, noun_rows)
+        ],
+        categories=[_CATEGORY_NAMES[c] for c in category_rows],
+        descriptions=[f"{profile['primary'].title()} {_CATEGORY_NAMES[c]} piece" for c in category_rows],
+        prices=_product_prices(rng, profile, categories, axes),
+        stock=_product_stock(rng, profile, n_products),
+        axis_matrix=axes,
+        vibe_descriptions=[""] * n_products,
+        image_urls=[None] * n_products,
+        attributes=_product_attributes(rng, categories),
+        embeddings=embeddings,
+    )
+
+    center = profile["center"]
+    manifold = BrandManifold(
+        store_id=store_id,
+        store_name=store_name,
+        vibe_center=VibeVector(
+            embedding=[],
+            axes={axis: round(float(value), 2) for axis, value in zip(AXIS_ORDER, center)},
+            description=f"{profile['primary'].title()} with a {profile['secondary']} streak",
+        ),
+        vibe_boundaries=_boundaries(rng, center),
+        style_tags=ARCHETYPES[profile["primary"]]["tags"] + ARCHETYPES[profile["secondary"]]["tags"][:1],
+    )
+    return manifold.model_copy(update={"products": table})
+
+
+def iter_boutiques(
+    n_stores: int,
+    products_per_store: int,
+    seed: int = DEFAULT_SEED,
+    dims: int = 0,
+) -> Iterator[BrandManifold]:
+    for index in range(n_stores):
+        yield generate_boutique(index, products_per_store, seed, dims)
+
+
+def write_synthetic_catalog(
+    directory: Union[str, Path],
+    n_products: int,
+    dims: int = 0,
+    seed: int = DEFAULT_SEED,
+    index: int = 0,
+) -> Path:
+    directory = Path(directory)
+    manifold = generate_boutique(index, n_products, seed)
+    write_catalog(manifold, directory)
+    if dims:
+        embeddings = np.lib.format.open_memmap(
+            directory / EMBEDDINGS_FILE, mode="w+", dtype=np.float32, shape=(n_products, dims)
+        )
+        fill_embeddings(embeddings, manifold.products.axis_matrix, seed, index)
+        embeddings.flush()
+        del embeddings
+    return directory
+
+
+def write_synthetic_catalogs(
+    directory: Union[str, Path],
+    n_stores: int,
+    products_per_store: int,
+    dims: int = 0,
+    seed: int = DEFAULT_SEED,
+) -> list[Path]:
+    directory = Path(directory)
+    return [
+        write_synthetic_catalog(directory / store_id_for(index), products_per_store, dims, seed, index)
+        for index in range(n_stores)
+    ]
+
+
+def generate_shoppers(
+    n_shoppers: int,
+    seed: int = DEFAULT_SEED,
+    store_ids: Optional[list[str]] = None,
+    stores_per_shopper: int = 3,
+) -> list[SyntheticShopper]:
+    rng = np.random.default_rng([seed, n_shoppers])
+    primaries = rng.choice(len(_ARCHETYPE_NAMES), size=n_shoppers, p=_ARCHETYPE_P)
+    budgets = np.clip(rng.lognormal(np.log(300), 0.6, n_shoppers), 40, 5000).round(-1)
+
+    shoppers = []
+    for i, primary in enumerate(primaries.tolist()):
+        archetype = ARCHETYPES[_ARCHETYPE_NAMES[primary]]
+        persona = archetype["personas"][rng.integers(len(archetype["personas"]))]
+        activity = archetype["activities"][rng.integers(len(archetype["activities"]))]
+        prompt = f"{persona} who {activity}"
+        if rng.random() < 0.4:
+            other = ARCHETYPES[_ARCHETYPE_NAMES[rng.choice(len(_ARCHETYPE_NAMES), p=_ARCHETYPE_P)]]
+            prompt += f" and {other['activities'][rng.integers(len(other['activities']))]}"
+
+        targets: list[str] = []
+        if store_ids:
+            count = min(stores_per_shopper, len(store_ids))
+            targets = [store_ids[j] for j in rng.choice(len(store_ids), size=count, replace=False)]
+
+        shoppers.append(SyntheticShopper(
+            user_id=f"shopper-{i:07d}",
+            user_name=f"Synthetic Shopper {i}",
+            archetype=_ARCHETYPE_NAMES[primary],
+            emotional_prompt=prompt,
+            budget=float(budgets[i]),
+            context=OCCASIONS[rng.integers(len(OCCASIONS))],
+            target_stores=targets,
+        ))
+    return shoppers
+
+
+def write_shoppers(path: Union[str, Path], shoppers: list[SyntheticShopper]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for shopper in shoppers:
+            f.write(shopper.model_dump_json())
+            f.write("\n")
+    return path
+
+
+def load_shoppers(path: Union[str, Path]) -> list[SyntheticShopper]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return [SyntheticShopper.model_validate_json(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic AURA catalogs and shoppers")
+    parser.add_argument("directory", type=str, help="Output directory (usable as AURA_CATALOG_DIR)")
+    parser.add_argument("--stores", type=int, default=100)
+    parser.add_argument("--products", type=int, default=1000, help="Products per store")
+    parser.add_argument("--dims", type=int, default=0, help="Embedding width (0 = no embeddings)")
+    parser.add_argument("--shoppers", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    paths = write_synthetic_catalogs(directory, args.stores, args.products, args.dims, args.seed)
+    store_ids = [path.name for path in paths]
+    shoppers = generate_shoppers(args.shoppers, args.seed, store_ids)
+    write_shoppers(directory / "shoppers.jsonl", shoppers)
+    print(json.dumps({
+        "stores": len(paths),
+        "products": len(paths) * args.products,
+        "shoppers": len(shoppers),
+        "directory": str(directory),
+    }))
+
+
+if __name__ == "__main__":
+    main()
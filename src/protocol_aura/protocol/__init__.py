@@ -19,6 +19,18 @@ from protocol_aura.protocol.messages import (
     AuraMessage,
     VibeTransformation,
     OfferBundle,
+    aura_message_adapter,
+    parse_message,
+    dump_message,
+)
+from protocol_aura.protocol.wire import (
+    AURA_CONTENT_TYPE,
+    encode_message,
+    decode_message,
+    encode_model,
+    decode_model,
+    encode_payload,
+    decode_payload,
 )
 from protocol_aura.protocol.embeddings import vibe_service, VibeEmbeddingService
 
@@ -41,6 +53,16 @@ __all__ = [
     "AuraMessage",
     "VibeTransformation",
     "OfferBundle",
+    "aura_message_adapter",
+    "parse_message",
+    "dump_message",
+    "AURA_CONTENT_TYPE",
+    "encode_message",
+    "decode_message",
+    "encode_model",
+    "decode_model",
+    "encode_payload",
+    "decode_payload",
     "vibe_service",
     "VibeEmbeddingService",
 ]
@@ -1,23 +1,82 @@
-from typing import Optional
+from typing import Iterable, Optional
+import asyncio
 import json
 import random
-import time
+
+import numpy as np
 
 from protocol_aura.core.config import settings
+from protocol_aura.core.metrics import span
 from protocol_aura.protocol.models import VibeVector, VibeAxis
 
 
+EMBEDDING_BACKENDS = ("demo", "local", "http", "gemini")
+HASH_FEATURES = 2 ** 18
+HASH_SEED = 7
+HASH_BATCH_ROWS = 8192
+
+
+class HashingEmbedder:
+    def __init__(self, dims: int, seed: int = HASH_SEED, n_features: int = HASH_FEATURES):
+        import scipy.sparse as sp
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.random_projection import SparseRandomProjection
+        
+        self.dims = dims
+        # Word uni/bigrams carry meaning; character 4-grams keep inflections like
+        # "knit"/"knitted" close. Both hash into one space before the projection.
+        self._words = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), alternate_sign=False, norm="l2"
+        )
+        self._chars = HashingVectorizer(
+            n_features=n_features, analyzer="char_wb", ngram_range=(4, 4), alternate_sign=False, norm="l2"
+        )
+        self._projection = SparseRandomProjection(
+            n_components=dims, dense_output=True, random_state=seed
+        ).fit(sp.csr_matrix((1, n_features)))
+    
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        out = np.empty((len(texts), self.dims), dtype=np.float32)
+        for start in range(0, len(texts), HASH_BATCH_ROWS):
+            batch = texts[start:start + HASH_BATCH_ROWS]
+            features = self._words.transform(batch) + self._chars.transform(batch)
+            vectors = self._projection.transform(features)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            out[start:start + len(batch)] = vectors / np.where(norms > 0, norms, 1.0)
+        return out
+    
+    def embed_one(self, text: str) -> list[float]:
+        return self.embed([text])[0].tolist()
+
+
+def embedding_backend() -> str:
+    backend = settings.embedding_backend or ("demo" if settings.demo_mode else "gemini")
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend!r} (expected one of {EMBEDDING_BACKENDS})")
+    return backend
+
+
 class VibeEmbeddingService:
     def __init__(self):
         self._embeddings = None
         self._llm = None
+        self._local: Optional[HashingEmbedder] = None
+        self._gateway = None
         self._initialized = False
     
     def _ensure_initialized(self):
         if self._initialized:
             return
         
-        if settings.demo_mode:
+        backend = embedding_backend()
+        if backend == "local":
+            self._local = HashingEmbedder(settings.vibe_dimensions)
+        if backend == "http":
+            from protocol_aura.protocol.gateway import GatewayClient
+            
+            self._gateway = GatewayClient.from_settings()
+        if backend != "gemini":
             self._initialized = True
             return
         
@@ -41,21 +100,67 @@ class VibeEmbeddingService:
     async def generate_vibe_vector(self, text: str) -> VibeVector:
         self._ensure_initialized()
         
-        time.sleep(random.uniform(0.1, 0.3))
-        
-        if settings.demo_mode:
-            return self._generate_demo_vibe(text)
+        with span("vibe.generate"):
+            if settings.simulate_latency:
+                await asyncio.sleep(random.uniform(0.1, 0.3))
+            
+            backend = embedding_backend()
+            if backend == "demo":
+                return self._generate_demo_vibe(text)
+            if backend == "local":
+                with span("backend.embed"):
+                    return self._generate_demo_vibe(text, self._local.embed_one(text))
+            if backend == "http":
+                return await self._gateway.vibe(text)
+            
+            embedding = await self._get_embedding(text)
+            axes = await self._extract_vibe_axes(text)
+            description = await self._generate_vibe_description(text, axes)
+            return VibeVector(
+                embedding=embedding,
+                axes=axes,
+                description=description,
+            )
+    
+    async def generate_vibe_vectors(self, texts: list[str]) -> list[VibeVector]:
+        self._ensure_initialized()
+        unique = list(dict.fromkeys(texts))
         
-        embedding = await self._get_embedding(text)
-        axes = await self._extract_vibe_axes(text)
-        description = await self._generate_vibe_description(text, axes)
-        return VibeVector(
-            embedding=embedding,
-            axes=axes,
-            description=description,
-        )
+        with span("vibe.generate_batch"):
+            if settings.simulate_latency:
+                await asyncio.sleep(random.uniform(0.1, 0.3))
+            
+            backend = embedding_backend()
+            if backend == "demo":
+                vibes = {text: self._generate_demo_vibe(text) for text in unique}
+                return [vibes[text] for text in texts]
+            if backend == "local":
+                with span("backend.embed_batch"):
+                    embeddings = self._local.embed(unique).tolist()
+                vibes = {text: self._generate_demo_vibe(text, embedding) for text, embedding in zip(unique, embeddings)}
+                return [vibes[text] for text in texts]
+            if backend == "http":
+                vibes = dict(zip(unique, await self._gateway.vibes(unique)))
+                return [vibes[text] for text in texts]
+            
+            embeddings = await self._get_embeddings(unique)
+            axes_list = await asyncio.gather(*(self._extract_vibe_axes(text) for text in unique))
+            descriptions = await asyncio.gather(*(
+                self._generate_vibe_description(text, axes) for text, axes in zip(unique, axes_list)
+            ))
+            vibes = {
+                text: VibeVector(embedding=embedding, axes=axes, description=description)
+                for text, embedding, axes, description in zip(unique, embeddings, axes_list, descriptions)
+            }
+            return [vibes[text] for text in texts]
     
-    def _generate_demo_vibe(self, text: str) -> VibeVector:
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        self._ensure_initialized()
+        if self._local is None:
+            raise ValueError("embed_texts needs AURA_EMBEDDING_BACKEND=local")
+        return self._local.embed(texts)
+    
+    def score_axes(self, text: str) -> tuple[dict[str, float], str]:
         text_lower = text.lower()
         
         axes = {
@@ -132,8 +237,12 @@ class VibeEmbeddingService:
                 desc_parts.append(f"minimal {axis}")
         
         description = f"Aesthetic blend: {', '.join(desc_parts)}" if desc_parts else "Balanced aesthetic profile"
-        
-        embedding = [round(random.gauss(0, 0.1), 4) for _ in range(768)]
+        return axes, description
+    
+    def _generate_demo_vibe(self, text: str, embedding: Optional[list[float]] = None) -> VibeVector:
+        axes, description = self.score_axes(text)
+        if embedding is None:
+            embedding = np.round(np.random.normal(0, 0.1, 768), 4).astype(np.float32).tolist()
         
         return VibeVector(
             embedding=embedding,
@@ -143,9 +252,15 @@ class VibeEmbeddingService:
     
     async def _get_embedding(self, text: str) -> list[float]:
         self._ensure_initialized()
-        result = self._embeddings.embed_query(text)
+        with span("backend.embed"):
+            result = self._embeddings.embed_query(text)
         return result
     
+    async def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self._ensure_initialized()
+        with span("backend.embed_batch"):
+            return self._embeddings.embed_documents(texts)
+    
     async def _extract_vibe_axes(self, text: str) -> dict[str, float]:
         self._ensure_initialized()
         prompt = f"""Analyze this aesthetic description and score it on these vibe axes.
@@ -165,7 +280,8 @@ Description: {text}
 
 Return ONLY valid JSON like: {{"rebellion": 0.7, "minimalism": 0.3, ...}}"""
 
-        response = self._llm.generate_content(prompt)
+        with span("backend.llm"):
+            response = self._llm.generate_content(prompt)
         try:
             json_str = response.text.strip()
             if json_str.startswith("```"):
@@ -190,7 +306,8 @@ Dominant traits: {axes_str}
 
 Be evocative and concise. One sentence only."""
 
-        response = self._llm.generate_content(prompt)
+        with span("backend.llm"):
+            response = self._llm.generate_content(prompt)
         return response.text.strip()
     
     def compute_similarity(self, v1: VibeVector, v2: VibeVector) -> float:
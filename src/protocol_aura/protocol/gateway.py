@@ -0,0 +1,281 @@
+from importlib.util import find_spec
+from typing import Awaitable, Callable, NamedTuple, Optional
+from weakref import WeakKeyDictionary
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+
+from protocol_aura.core.config import settings
+from protocol_aura.core.metrics import span
+from protocol_aura.protocol.models import VibeVector
+
+
+EMBEDDINGS_PATH = "/v1/embeddings"
+VIBES_PATH = "/v1/vibes"
+HEALTH_PATH = "/health"
+DEFAULT_GATEWAY_URL = "http://127.0.0.1:8100"
+PERCENTILES = (50, 95, 99)
+
+
+def decode_embeddings(payload: dict) -> np.ndarray:
+    if "embeddings_b64" in payload:
+        raw = base64.b64decode(payload["embeddings_b64"])
+        return np.frombuffer(raw, dtype="<f4").reshape(-1, payload["dims"])
+    return np.asarray(payload["embeddings"], dtype=np.float32)
+
+
+def encode_embeddings(matrix: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(matrix, dtype="<f4").tobytes()).decode("ascii")
+
+
+class MicroBatcher:
+    def __init__(self, send: Callable[[list[str]], Awaitable[list]], window_s: float, max_batch: int):
+        self._send = send
+        self.window_s = window_s
+        self.max_batch = max(1, max_batch)
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, text: str):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(text, []).append(future)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: dict[str, list[asyncio.Future]]):
+        texts = list(batch)
+        self.batches += 1
+        self.items += len(texts)
+        try:
+            results = await self._send(texts)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for text, result in zip(texts, results):
+            for future in batch[text]:
+                if not future.done():
+                    future.set_result(result)
+
+
+class _LoopState(NamedTuple):
+    client: httpx.AsyncClient
+    embed: MicroBatcher
+    score: MicroBatcher
+
+
+class GatewayClient:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        timeout: float = 10.0,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        window_ms: float = 3.0,
+        max_batch: int = 64,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # HTTP/2 needs the optional h2 package; without it httpx stays on HTTP/1.1 keep-alive.
+        self.http2 = http2 and find_spec("h2") is not None
+        self.window_s = window_ms / 1000
+        self.max_batch = max_batch
+        self._states: WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls) -> "GatewayClient":
+        if not settings.gateway_url:
+            raise ValueError("AURA_GATEWAY_URL is required for the http embedding backend")
+        return cls(
+            settings.gateway_url,
+            api_key=settings.gateway_api_key,
+            timeout=settings.gateway_timeout_seconds,
+            max_connections=settings.gateway_max_connections,
+            max_keepalive=settings.gateway_max_keepalive,
+            keepalive_expiry=settings.gateway_keepalive_seconds,
+            http2=settings.gateway_http2,
+            window_ms=settings.gateway_batch_window_ms,
+            max_batch=settings.gateway_max_batch,
+        )
+
+    def _state(self) -> _LoopState:
+        # Pooled connections belong to the loop that opened them, so every loop (the
+        # dashboard runs one per rerun, possibly several at once) gets its own pool and
+        # batchers. Batches post through the client they were created with.
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is not None:
+            return state
+        for closed in [other for other in self._states if other.is_closed()]:
+            del self._states[closed]
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+        )
+        state = self._states[loop] = _LoopState(
+            client,
+            MicroBatcher(lambda texts: self._post_embeddings(client, texts), self.window_s, self.max_batch),
+            MicroBatcher(lambda texts: self._post_vibes(client, texts), self.window_s, self.max_batch),
+        )
+        return state
+
+    async def _post(self, client: httpx.AsyncClient, path: str, body: dict) -> dict:
+        response = await client.post(path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    async def _post_embeddings(self, client: httpx.AsyncClient, texts: list[str]) -> list[list[float]]:
+        with span("backend.embed_batch"):
+            payload = await self._post(client, EMBEDDINGS_PATH, {"texts": texts, "encoding": "base64"})
+        matrix = decode_embeddings(payload)
+        if len(matrix) != len(texts):
+            raise ValueError(f"Gateway returned {len(matrix)} embeddings for {len(texts)} texts")
+        return matrix.tolist()
+
+    async def _post_vibes(self, client: httpx.AsyncClient, texts: list[str]) -> list[dict]:
+        with span("backend.score_batch"):
+            payload = await self._post(client, VIBES_PATH, {"texts": texts})
+        vibes = payload["vibes"]
+        if len(vibes) != len(texts):
+            raise ValueError(f"Gateway returned {len(vibes)} vibes for {len(texts)} texts")
+        return vibes
+
+    async def embed(self, text: str) -> list[float]:
+        return await self._state().embed.submit(text)
+
+    async def score(self, text: str) -> dict:
+        return await self._state().score.submit(text)
+
+    async def vibe(self, text: str) -> VibeVector:
+        embedding, scored = await asyncio.gather(self.embed(text), self.score(text))
+        return VibeVector(embedding=embedding, axes=scored["axes"], description=scored.get("description", ""))
+
+    async def vibes(self, texts: list[str]) -> list[VibeVector]:
+        return await asyncio.gather(*(self.vibe(text) for text in texts))
+
+    def stats(self) -> dict:
+        report = {"http2": self.http2, "window_ms": self.window_s * 1000, "max_batch": self.max_batch}
+        states = list(self._states.values())
+        for name in ("embed", "score"):
+            batchers = [getattr(state, name) for state in states]
+            if batchers:
+                batches = sum(batcher.batches for batcher in batchers)
+                items = sum(batcher.items for batcher in batchers)
+                report[name] = {
+                    "batches": batches,
+                    "items": items,
+                    "mean_batch": round(items / batches, 2) if batches else 0.0,
+                }
+        return report
+
+    async def aclose(self):
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+
+async def drive(client: GatewayClient, texts: list[str], concurrency: int) -> dict:
+    queue = list(reversed(texts))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            text = queue.pop()
+            start = time.perf_counter()
+            try:
+                await client.vibe(text)
+            except (httpx.HTTPError, ValueError, KeyError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies_ms = np.array(latencies or [0.0]) * 1000
+    return {
+        "requests": len(texts),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(texts) / elapsed, 1) if elapsed else 0.0,
+        **{f"p{q}_ms": round(float(np.percentile(latencies_ms, q)), 2) for q in PERCENTILES},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive an inference gateway through the pooled, batching client")
+    parser.add_argument("--url", type=str, default=settings.gateway_url or DEFAULT_GATEWAY_URL)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=256, help="Vibe requests in flight")
+    parser.add_argument("--unique", type=int, default=0, help="Distinct texts (0 = all distinct)")
+    parser.add_argument("--window-ms", type=float, default=settings.gateway_batch_window_ms, help="0 disables batching")
+    parser.add_argument("--max-batch", type=int, default=settings.gateway_max_batch)
+    parser.add_argument("--connections", type=int, default=settings.gateway_max_connections)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = "cozy minimal neon vintage linen wool silk leather bold soft retro sleek warm cyber elegant punk".split()
+    pool = [" ".join(rng.choices(words, k=8)) + f" #{i}" for i in range(args.unique or args.requests)]
+    texts = [rng.choice(pool) for _ in range(args.requests)] if args.unique else pool
+
+    async def go():
+        client = GatewayClient(
+            args.url,
+            api_key=settings.gateway_api_key,
+            max_connections=args.connections,
+            max_keepalive=args.connections,
+            window_ms=args.window_ms,
+            max_batch=args.max_batch if args.window_ms > 0 else 1,
+        )
+        try:
+            report = await drive(client, texts, args.concurrency)
+            return {"url": args.url, **report, **client.stats()}
+        finally:
+            await client.aclose()
+
+    print(json.dumps(asyncio.run(go()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Union
-from pydantic import BaseModel, Field
+from typing import Annotated, Literal, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
 import uuid
 
 from protocol_aura.protocol.models import (
@@ -55,7 +55,7 @@ class OfferBundle(BaseModel):
 
 class AuraProfile(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_PROFILE
+    type: Literal[MessageType.AURA_PROFILE] = MessageType.AURA_PROFILE
     store_id: str
     session_id: str = ""
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -66,7 +66,7 @@ class AuraProfile(BaseModel):
 
 class AuraQuery(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_QUERY
+    type: Literal[MessageType.AURA_QUERY] = MessageType.AURA_QUERY
     shopper_id: str
     session_id: str = ""
     turn_id: int = 0
@@ -80,7 +80,7 @@ class AuraQuery(BaseModel):
 
 class AuraOffer(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_OFFER
+    type: Literal[MessageType.AURA_OFFER] = MessageType.AURA_OFFER
     store_id: str
     shopper_id: str
     session_id: str = ""
@@ -99,7 +99,7 @@ class AuraOffer(BaseModel):
 
 class AuraCounteroffer(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_COUNTER
+    type: Literal[MessageType.AURA_COUNTER] = MessageType.AURA_COUNTER
     store_id: str
     shopper_id: str
     session_id: str = ""
@@ -119,7 +119,7 @@ class AuraCounteroffer(BaseModel):
 
 class AuraAccept(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_ACCEPT
+    type: Literal[MessageType.AURA_ACCEPT] = MessageType.AURA_ACCEPT
     shopper_id: str
     store_id: str
     session_id: str = ""
@@ -136,7 +136,7 @@ class AuraAccept(BaseModel):
 
 class AuraReject(BaseModel):
     message_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    type: MessageType = MessageType.AURA_REJECT
+    type: Literal[MessageType.AURA_REJECT] = MessageType.AURA_REJECT
     sender_id: str
     recipient_id: str
     session_id: str = ""
@@ -148,4 +148,19 @@ class AuraReject(BaseModel):
     would_accept_if: str = ""
 
 
-AuraMessage = Union[AuraProfile, AuraQuery, AuraOffer, AuraCounteroffer, AuraAccept, AuraReject]
+AuraMessage = Annotated[
+    Union[AuraProfile, AuraQuery, AuraOffer, AuraCounteroffer, AuraAccept, AuraReject],
+    Field(discriminator="type"),
+]
+
+aura_message_adapter: TypeAdapter[AuraMessage] = TypeAdapter(AuraMessage)
+
+
+def parse_message(data: Union[str, bytes, dict]) -> AuraMessage:
+    if isinstance(data, dict):
+        return aura_message_adapter.validate_python(data)
+    return aura_message_adapter.validate_json(data)
+
+
+def dump_message(message: AuraMessage) -> bytes:
+    return aura_message_adapter.dump_json(message)
@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer, field_validator
+import math
 import numpy as np
 import uuid
 
@@ -42,6 +43,23 @@ class VibeVector(BaseModel):
         
         avg_diff = total_diff / count
         return max(0.0, min(1.0, 1.0 - avg_diff))
+    
+    def similarity_batch(self, axis_matrix: np.ndarray) -> np.ndarray:
+        if not self.axes:
+            return np.full(len(axis_matrix), 0.5)
+        
+        target = np.array([self.axes.get(axis.value, np.nan) for axis in VibeAxis], dtype=np.float32)
+        rows, width = len(axis_matrix), len(target)
+        # Flat elementwise ops and matmul row sums avoid numpy's slow path for 8-wide rows.
+        diffs = np.abs(axis_matrix.reshape(-1) - np.tile(target, rows)).reshape(rows, width)
+        ones = np.ones(width, dtype=np.float32)
+        counts = width - np.isnan(diffs).astype(np.float32) @ ones
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = 1.0 - (np.fmax(diffs, 0.0) @ ones) / counts
+        return np.where(counts > 0, np.clip(scores, 0.0, 1.0), 0.5)
+    
+    class Config:
+        frozen = True
 
 
 class Product(BaseModel):
@@ -54,6 +72,9 @@ class Product(BaseModel):
     image_url: Optional[str] = None
     stock: int = 0
     attributes: dict[str, str] = Field(default_factory=dict)
+    
+    class Config:
+        frozen = True
 
 
 class BrandManifold(BaseModel):
@@ -67,12 +88,20 @@ class BrandManifold(BaseModel):
     style_tags: list[str] = Field(default_factory=list)
     products: list[Product] = Field(default_factory=list)
     
+    # Bulk-loaded catalogs hold a lazy ProductTable here, which pydantic can't serialize as-is.
+    @field_serializer("products")
+    def _dump_products(self, products) -> list[Product]:
+        return list(products)
+    
     def contains_vibe(self, vibe: VibeVector) -> bool:
         for axis, (low, high) in self.vibe_boundaries.items():
             if axis in vibe.axes:
                 if not (low <= vibe.axes[axis] <= high):
                     return False
         return True
+    
+    class Config:
+        frozen = True
 
 
 class Constraints(BaseModel):
@@ -82,6 +111,16 @@ class Constraints(BaseModel):
     materials_exclude: list[str] = Field(default_factory=list)
     delivery_days_max: int = Field(default=14)
 
+    # JSON has no infinity: an unbounded budget goes over the wire as null.
+    @field_validator("max_budget", mode="before")
+    @classmethod
+    def _unbounded_budget(cls, value):
+        return float("inf") if value is None else value
+
+    @field_serializer("max_budget", when_used="json")
+    def _dump_budget(self, value: float) -> Optional[float]:
+        return None if math.isinf(value) else value
+
 
 class ConstraintCheck(BaseModel):
     constraint: str
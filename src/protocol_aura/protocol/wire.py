@@ -0,0 +1,163 @@
+from typing import Any, Union
+import json
+import struct
+
+import numpy as np
+from pydantic import BaseModel, TypeAdapter
+
+from protocol_aura.protocol.messages import AuraMessage, aura_message_adapter
+
+
+AURA_CONTENT_TYPE = "application/x-aura"
+
+MAGIC = b"AURA"
+VERSION = 1
+
+EMBEDDING_KEY = "embedding"
+PRODUCT_LIST_KEYS = frozenset({"products", "accepted_products", "proposed_products", "featured_products"})
+
+_HEADER = struct.Struct("<4sBI")
+_BLOB = struct.Struct("<cI")
+_DTYPES = {b"f": np.dtype("<f4"), b"d": np.dtype("<f8")}
+ZERO_BLOB = b"z"
+
+
+class _Packer:
+    def __init__(self):
+        self.blobs: list[bytes] = []
+        self._blob_rows: dict[bytes, int] = {}
+        self.products: list[Any] = []
+        self._product_rows: dict[str, int] = {}
+
+    def pack(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self._pack_field(key, item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.pack(item) for item in value]
+        return value
+
+    def _pack_field(self, key: str, value: Any) -> Any:
+        if key == EMBEDDING_KEY and isinstance(value, list) and value:
+            return self._add_blob(value)
+        if key in PRODUCT_LIST_KEYS and isinstance(value, list):
+            return [self._add_product(item) for item in value]
+        return self.pack(value)
+
+    def _add_blob(self, values: list[float]) -> int:
+        wide = np.asarray(values, dtype=np.float64)
+        narrow = wide.astype(np.float32)
+        if not wide.any() and not np.signbit(wide).any():
+            blob = _BLOB.pack(ZERO_BLOB, len(wide))
+        elif np.array_equal(narrow, wide):
+            blob = _BLOB.pack(b"f", len(wide)) + narrow.astype(_DTYPES[b"f"], copy=False).tobytes()
+        else:
+            blob = _BLOB.pack(b"d", len(wide)) + wide.astype(_DTYPES[b"d"], copy=False).tobytes()
+        
+        row = self._blob_rows.get(blob)
+        if row is None:
+            row = self._blob_rows[blob] = len(self.blobs)
+            self.blobs.append(blob)
+        return row
+
+    def _add_product(self, product: Any) -> int:
+        packed = self.pack(product)
+        key = json.dumps(packed, sort_keys=True)
+        row = self._product_rows.get(key)
+        if row is None:
+            row = self._product_rows[key] = len(self.products)
+            self.products.append(packed)
+        return row
+
+
+def _index(row: Any, rows: list) -> int:
+    if not isinstance(row, int) or isinstance(row, bool) or not 0 <= row < len(rows):
+        raise IndexError(f"reference {row!r} outside {len(rows)} entries")
+    return row
+
+
+class _Unpacker:
+    def __init__(self, blobs: list[list[float]], products: list[Any]):
+        self.blobs = blobs
+        self.products = products
+
+    def unpack(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self._unpack_field(key, item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.unpack(item) for item in value]
+        return value
+
+    def _unpack_field(self, key: str, value: Any) -> Any:
+        if key == EMBEDDING_KEY and isinstance(value, int):
+            return self.blobs[_index(value, self.blobs)]
+        if key in PRODUCT_LIST_KEYS and isinstance(value, list):
+            return [self.unpack(self.products[_index(row, self.products)]) for row in value]
+        return self.unpack(value)
+
+
+def encode_payload(payload: dict) -> bytes:
+    packer = _Packer()
+    body = packer.pack(payload)
+    header = json.dumps({"body": body, "products": packer.products}, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    return b"".join([_HEADER.pack(MAGIC, VERSION, len(header)), header, *packer.blobs])
+
+
+def decode_payload(data: Union[bytes, bytearray, memoryview]) -> dict:
+    # Frames come straight off the network, so every structural surprise surfaces
+    # as the ValueError that callers already map to a 4xx / error frame.
+    try:
+        return _decode_payload(memoryview(data))
+    except (struct.error, KeyError, IndexError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed AURA frame: {e!r}") from e
+
+
+def _decode_payload(data: memoryview) -> dict:
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated AURA payload")
+    magic, version, header_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an AURA binary payload")
+    if version != VERSION:
+        raise ValueError(f"Unsupported AURA wire version: {version}")
+
+    offset = _HEADER.size + header_size
+    if offset > len(data):
+        raise ValueError("Truncated AURA payload")
+    header = json.loads(bytes(data[_HEADER.size:offset]))
+
+    blobs = []
+    while offset < len(data):
+        code, count = _BLOB.unpack_from(data, offset)
+        offset += _BLOB.size
+        if code == ZERO_BLOB:
+            blobs.append([0.0] * count)
+            continue
+        dtype = _DTYPES.get(code)
+        if dtype is None:
+            raise ValueError(f"Unknown AURA blob type: {code!r}")
+        end = offset + count * dtype.itemsize
+        if end > len(data):
+            raise ValueError("Truncated AURA payload")
+        blobs.append(np.frombuffer(data[offset:end], dtype=dtype).astype(np.float64).tolist())
+        offset = end
+
+    return _Unpacker(blobs, header["products"]).unpack(header["body"])
+
+
+def encode_model(model: BaseModel) -> bytes:
+    return encode_payload(model.model_dump(mode="json"))
+
+
+def decode_model(data: Union[bytes, bytearray, memoryview], model: Union[type[BaseModel], TypeAdapter]) -> Any:
+    payload = decode_payload(data)
+    if isinstance(model, TypeAdapter):
+        return model.validate_python(payload)
+    return model.model_validate(payload)
+
+
+def encode_message(message: AuraMessage) -> bytes:
+    return encode_model(message)
+
+
+def decode_message(data: Union[bytes, bytearray, memoryview]) -> AuraMessage:
+    return decode_model(data, aura_message_adapter)
@@ -2,13 +2,18 @@ import streamlit as st
 import plotly.graph_objects as go
 import asyncio
 import json
-import hashlib
+import threading
 from datetime import datetime
 
+import numpy as np
+
 from protocol_aura.agents import BoutiqueAgent, ShopperAgent
 from protocol_aura.protocol import Mandate
+from protocol_aura.core.analytics import SNAPSHOT_NAME, SessionAnalytics, axis_directions, histogram_percentile, project_axes, session_analytics
+from protocol_aura.core.metrics import span
 from protocol_aura.core.negotiation import negotiation_engine
-from protocol_aura.data import get_all_boutiques
+from protocol_aura.core.receipts import build_receipt
+from protocol_aura.data import catalog_registry
 
 st.set_page_config(page_title="Protocol: Aura", page_icon="✨", layout="wide", initial_sidebar_state="expanded")
 
@@ -38,6 +43,26 @@ h1,h2,h3{font-family:'Space Grotesk',sans-serif!important;background:linear-grad
 st.markdown(CSS, unsafe_allow_html=True)
 
 
+@st.cache_resource(max_entries=4)
+def load_boutique_agents(catalog_versions: tuple[tuple[str, int], ...]) -> dict[str, BoutiqueAgent]:
+    agents = {}
+    for store_id, _ in catalog_versions:
+        manifold = catalog_registry.get(store_id).manifold
+        agents[store_id] = BoutiqueAgent(
+            store_id=manifold.store_id,
+            store_name=manifold.store_name,
+            manifold=manifold,
+            flexibility=0.55,
+            history_limit=0,
+        )
+    return agents
+
+
+def boutique_agents() -> dict[str, BoutiqueAgent]:
+    return load_boutique_agents(tuple((entry.store_id, entry.version) for entry in catalog_registry.all()))
+
+
+@st.cache_data(max_entries=64)
 def create_radar(axes: dict) -> go.Figure:
     cats = list(axes.keys())
     vals = [max(0, min(1, v)) for v in axes.values()]
@@ -167,57 +192,260 @@ def get_both_offers_info(session):
 
 
 def vibe_receipt(session, boutique, prompt, budget) -> dict:
-    transcript = negotiation_engine.get_transcript(session)
-    accepted_info = get_accepted_offer_info(session)
-    both_offers = get_both_offers_info(session)
+    with span("receipt"):
+        transcript_receipt = build_receipt(session)
+        accepted_info = get_accepted_offer_info(session)
+        both_offers = get_both_offers_info(session)
     
-    receipt = {
-        "protocol": "AURA v0.1",
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-        "session": {
-            "id": session.session_id,
-            "store_id": session.store_id,
-            "store_name": session.store_name,
-            "turns": f"{session.turns_used}/{session.max_turns}",
-            "latency_ms": session.latency_ms,
-            "status": str(session.status.value),
-        },
-        "query": {"emotional_prompt": prompt},
-        "mandate": {
-            "budget_cap": budget,
-            "budget_type": "hard_constraint",
-            "auto_accept_rule": "highest match among valid offers",
-        },
-        "offers": both_offers,
-        "chosen_offer": accepted_info,
-        "selected_items": [],
-        "axis_deltas": [],
-        "transcript_hash": hashlib.sha256(json.dumps(transcript, sort_keys=True).encode()).hexdigest(),
-    }
+        receipt = {
+            "protocol": "AURA v0.1",
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "session": {
+                "id": session.session_id,
+                "store_id": session.store_id,
+                "store_name": session.store_name,
+                "turns": f"{session.turns_used}/{session.max_turns}",
+                "latency_ms": session.latency_ms,
+                "status": str(session.status.value),
+            },
+            "query": {"emotional_prompt": prompt},
+            "mandate": {
+                "budget_cap": budget,
+                "budget_type": "hard_constraint",
+                "auto_accept_rule": "highest match among valid offers",
+            },
+            "offers": both_offers,
+            "chosen_offer": accepted_info,
+            "selected_items": [],
+            "axis_deltas": [],
+            "transcript": {
+                "algorithm": transcript_receipt.algorithm,
+                "root": transcript_receipt.root,
+                "messages": transcript_receipt.tree_size,
+                "leaf_hashes": transcript_receipt.leaf_hashes,
+            },
+        }
     
-    if session.final_result and hasattr(session.final_result, 'accepted_products'):
-        receipt["selected_items"] = [
-            {"name": p.name, "price": p.price, "category": p.category}
-            for p in session.final_result.accepted_products
-        ]
-        receipt["axis_deltas"] = [
-            {"axis": t.axis, "from": t.from_value, "to": t.to_value, "delta": t.delta, "item_change": t.item_change}
-            for t in session.final_result.transformations_accepted
-        ]
+        if session.final_result and hasattr(session.final_result, 'accepted_products'):
+            receipt["selected_items"] = [
+                {"name": p.name, "price": p.price, "category": p.category}
+                for p in session.final_result.accepted_products
+            ]
+            receipt["axis_deltas"] = [
+                {"axis": t.axis, "from": t.from_value, "to": t.to_value, "delta": t.delta, "item_change": t.item_change}
+                for t in session.final_result.transformations_accepted
+            ]
     
-    return receipt
+        return receipt
 
 
-async def run_negotiation(prompt: str, budget: float, context: str):
+async def run_negotiation(prompt: str, budget: float, context: str, on_session=None):
     mandate = Mandate(user_id="shopper", budget_cap=budget, auto_purchase_enabled=False)
     shopper = ShopperAgent(user_id="shopper", user_name="Shopper Agent", mandate=mandate, style_goal=prompt)
+    await shopper.initialize_vibe(prompt)
+    agents = boutique_agents()
     
-    sessions = []
-    for b in get_all_boutiques():
-        boutique = BoutiqueAgent(store_id=b.store_id, store_name=b.store_name, manifold=b, flexibility=0.55)
+    async def negotiate(boutique: BoutiqueAgent):
         s = await negotiation_engine.start_negotiation(shopper=shopper, boutique=boutique, emotional_prompt=prompt, context=context)
-        sessions.append((b, s))
-    return sessions
+        return boutique.manifold, s
+    
+    results = {}
+    for done in asyncio.as_completed([negotiate(agent) for agent in agents.values()]):
+        b, s = await done
+        results[b.store_id] = (b, s)
+        if on_session:
+            on_session(b, s)
+    return [results[store_id] for store_id in agents if store_id in results]
+
+
+def render_best_offer(nego):
+    accepted_sessions = []
+    for b, s in nego:
+        if str(s.status.value) == 'accepted':
+            info = get_accepted_offer_info(s)
+            if info:
+                accepted_sessions.append((b, s, info))
+    
+    if accepted_sessions:
+        best = max(accepted_sessions, key=lambda x: x[2]['match'])
+        boutique, session, info = best
+        match_cls = "match-high" if info['match'] >= 0.85 else ("match-medium" if info['match'] >= 0.70 else "match-low")
+        
+        st.markdown(f'''<div class="best-header">
+            <strong>Best Valid Offer: {boutique.store_name} (Option {info['bundle']})</strong><br/>
+            <span class="match-score {match_cls}">{info['match']:.0%}</span> match · {info['distance']:.0%} distance · ${info['price']:.0f} ✓<br/>
+            <small>Responded in {getattr(session, 'latency_ms', 0)}ms</small>
+        </div>''', unsafe_allow_html=True)
+    else:
+        st.warning("No valid offers within budget constraint")
+
+
+def render_session(boutique, session):
+    l, r = st.columns([1, 2])
+    
+    accepted_info = get_accepted_offer_info(session)
+    
+    with l:
+        st.plotly_chart(create_radar(boutique.vibe_center.axes), use_container_width=True, key=f"radar-{session.session_id}")
+        
+        if accepted_info:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Match", f"{accepted_info['match']:.0%}")
+            m2.metric("Turns", f"{getattr(session, 'turns_used', 1)}/{session.max_turns}")
+            m3.metric("Latency", f"{getattr(session, 'latency_ms', 0)}ms")
+            st.caption(f"Distance: {accepted_info['distance']:.0%} · Bundle: {accepted_info['bundle']}")
+        else:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Match", "—")
+            m2.metric("Turns", f"{getattr(session, 'turns_used', 1)}/{session.max_turns}")
+            m3.metric("Latency", f"{getattr(session, 'latency_ms', 0)}ms")
+        
+        st.markdown(f"**Status:** {status_display(session.status)}", unsafe_allow_html=True)
+    
+    with r:
+        st.markdown("### 💬 Transcript")
+        render_transcript(negotiation_engine.get_transcript(session), session.store_name)
+    
+    if session.final_result and hasattr(session.final_result, 'accepted_products'):
+        st.markdown("### 🛍️ Selected Items")
+        cols = st.columns(min(3, len(session.final_result.accepted_products)))
+        for j, p in enumerate(session.final_result.accepted_products):
+            with cols[j % 3]:
+                st.markdown(f'<div class="product-card"><strong>{p.name}</strong><br/><small>{p.category}</small><br/><div class="product-price">${p.price:.0f}</div></div>', unsafe_allow_html=True)
+        
+        st.markdown("---")
+        receipt = vibe_receipt(session, boutique, st.session_state['p'], st.session_state['b'])
+        st.download_button("📜 Export Vibe Receipt", json.dumps(receipt, indent=2), f"vibe_receipt_{session.store_id}.json", "application/json", key=f"receipt-{session.session_id}")
+
+
+OPS_TOP_STORES = 25
+OPS_FOLD_BATCH = 5000
+
+
+@st.cache_resource
+def archive_analytics() -> tuple[SessionAnalytics, threading.Lock]:
+    return SessionAnalytics.for_archive(negotiation_engine.archive), threading.Lock()
+
+
+def load_analytics() -> SessionAnalytics:
+    archive = negotiation_engine.archive
+    if archive is None:
+        return session_analytics
+    
+    analytics, lock = archive_analytics()
+    with lock:
+        pending = analytics.pending_paths(archive)
+        if not pending:
+            return analytics
+        progress = st.progress(0.0) if len(pending) > OPS_FOLD_BATCH else None
+        for i in range(0, len(pending), OPS_FOLD_BATCH):
+            analytics.fold(archive, pending[i:i + OPS_FOLD_BATCH])
+            analytics.save(archive.directory / SNAPSHOT_NAME)
+            if progress:
+                done = min(i + OPS_FOLD_BATCH, len(pending))
+                progress.progress(done / len(pending), text=f"Indexing archived sessions · {done:,}/{len(pending):,}")
+        if progress:
+            progress.empty()
+    return analytics
+
+
+def ops_layout(fig: go.Figure, height: int = 300, **kwargs) -> go.Figure:
+    fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='rgba(255,255,255,0.7)', size=11), margin=dict(l=40, r=20, t=40, b=40), height=height, showlegend=False, **kwargs)
+    fig.update_xaxes(gridcolor='rgba(255,255,255,0.1)')
+    fig.update_yaxes(gridcolor='rgba(255,255,255,0.1)')
+    return fig
+
+
+def histogram_figure(edges, counts, title: str, log_x: bool = False) -> go.Figure:
+    centers = np.sqrt(np.maximum(edges[:-1], edges[1] / 2) * edges[1:]) if log_x else (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=np.diff(edges) if not log_x else None, marker_color='#667eea'))
+    fig = ops_layout(fig, title=title, bargap=0.05)
+    if log_x:
+        fig.update_xaxes(type='log')
+    return fig
+
+
+def vibe_density_figure(analytics: SessionAnalytics, centers: dict[str, tuple[str, np.ndarray]]) -> go.Figure:
+    counts, extent = analytics.vibe_density()
+    ticks = np.linspace(-extent, extent, len(counts) + 1)
+    mids = (ticks[:-1] + ticks[1:]) / 2
+    z = np.where(counts > 0, np.log1p(counts), np.nan)
+    fig = go.Figure(go.Heatmap(x=mids, y=mids, z=z, colorscale='Purples', showscale=False, customdata=counts, hovertemplate='%{customdata} shoppers<extra></extra>'))
+    for axis, (x, y) in axis_directions().items():
+        fig.add_annotation(x=x, y=y, ax=0, ay=0, xref='x', yref='y', axref='x', ayref='y', text=axis, showarrow=True, arrowcolor='rgba(255,255,255,0.25)', font=dict(size=10, color='rgba(255,255,255,0.6)'))
+    if centers:
+        names, points = zip(*centers.values())
+        points = np.array(points)
+        mode = 'markers+text' if len(points) <= OPS_TOP_STORES else 'markers'
+        fig.add_trace(go.Scatter(x=points[:, 0], y=points[:, 1], mode=mode, text=names, textposition='top center', marker=dict(symbol='diamond', size=9, color='#f093fb', line=dict(color='white', width=1)), hovertemplate='%{text}<extra></extra>'))
+    fig = ops_layout(fig, height=460, title="Shopper vibes vs store centers")
+    fig.update_xaxes(range=[-extent, extent], showticklabels=False, zeroline=False)
+    fig.update_yaxes(range=[-extent, extent], showticklabels=False, zeroline=False, scaleanchor='x')
+    return fig
+
+
+def render_operations():
+    analytics = load_analytics()
+    rows = analytics.summary()
+    if not rows:
+        st.info("No completed sessions yet. Run a negotiation, or set AURA_ARCHIVE_DIR to analyse archived sessions.")
+        return
+    
+    names = {entry.store_id: entry.manifold.store_name for entry in catalog_registry.all()}
+    rows.sort(key=lambda r: r['sessions'], reverse=True)
+    selected = st.multiselect("Stores", [r['store_id'] for r in rows], format_func=lambda s: names.get(s, s), placeholder="All stores")
+    scope = selected or None
+    shown = [r for r in rows if r['store_id'] in selected] if selected else rows
+    
+    sessions = sum(r['sessions'] for r in shown)
+    accepted = sum(r['accepted'] for r in shown)
+    match_edges, match_counts = analytics.match_histogram(scope)
+    latency_edges, latency_counts = analytics.latency_histogram(scope)
+    offers = match_counts.sum()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Sessions", f"{sessions:,}")
+    m2.metric("Acceptance", f"{accepted / sessions:.0%}" if sessions else "—")
+    m3.metric("Median match", f"{histogram_percentile(match_counts, match_edges, 50):.0%}" if offers else "—")
+    m4.metric("p95 latency", f"{histogram_percentile(latency_counts, latency_edges, 95):.0f}ms" if offers else "—")
+    
+    c1, c2 = st.columns(2)
+    with c1:
+        top = shown[:OPS_TOP_STORES]
+        fig = go.Figure(go.Bar(x=[names.get(r['store_id'], r['store_id']) for r in top], y=[r['acceptance_rate'] for r in top], marker_color='#00f5a0', customdata=[r['sessions'] for r in top], hovertemplate='%{x}: %{y:.0%} of %{customdata} sessions<extra></extra>'))
+        fig = ops_layout(fig, title=f"Acceptance rate · top {len(top)} stores by volume")
+        fig.update_yaxes(range=[0, 1], tickformat='.0%')
+        st.plotly_chart(fig, use_container_width=True)
+    with c2:
+        fig = histogram_figure(match_edges, match_counts, "Match score distribution")
+        fig.update_xaxes(tickformat='.0%')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    c3, c4 = st.columns(2)
+    with c3:
+        st.plotly_chart(histogram_figure(latency_edges, latency_counts, "Offer latency (ms)", log_x=True), use_container_width=True)
+        st.dataframe(
+            [{"store": names.get(r['store_id'], r['store_id']), **r} for r in shown],
+            column_config={"acceptance_rate": st.column_config.NumberColumn(format="percent"), "mean_match": st.column_config.NumberColumn(format="percent")},
+            hide_index=True,
+            height=220,
+        )
+    with c4:
+        centers = {
+            entry.store_id: (entry.manifold.store_name, project_axes(entry.manifold.vibe_center.axes))
+            for entry in catalog_registry.all()
+            if not selected or entry.store_id in selected
+        }
+        st.plotly_chart(vibe_density_figure(analytics, centers), use_container_width=True)
+
+
+def render_footer():
+    st.markdown("---")
+    st.markdown("""
+    <div style="text-align:center;color:rgba(255,255,255,0.5);font-size:12px">
+        <strong>Protocol: Aura v0.1</strong><br/>
+        <em>"AURA turns aesthetics into a negotiable contract between agents."</em>
+    </div>
+    """, unsafe_allow_html=True)
 
 
 def main():
@@ -225,6 +453,14 @@ def main():
     st.caption("Agent-to-Agent Negotiation · Aesthetic Commerce Protocol")
     st.markdown("---")
     
+    with st.sidebar:
+        view = st.radio("View", ["🤝 Negotiate", "📊 Operations"], horizontal=True, label_visibility="collapsed")
+    
+    if view == "📊 Operations":
+        render_operations()
+        render_footer()
+        return
+    
     with st.sidebar:
         st.markdown("### ⚙️ Shopper Mandate")
         budget = st.slider("Budget Cap ($)", 50, 1000, 400, 50)
@@ -240,7 +476,8 @@ def main():
         
         st.markdown("---")
         st.markdown("### 🏪 Boutiques")
-        for b in get_all_boutiques():
+        for agent in boutique_agents().values():
+            b = agent.manifold
             with st.expander(b.store_name):
                 st.caption(b.vibe_center.description[:80])
     
@@ -248,85 +485,46 @@ def main():
     with c1:
         prompt = st.text_input("Your aesthetic goal", placeholder="CEO who codes at night and DJs on weekends")
         context = st.text_input("Context (optional)", placeholder="Tech conference in Berlin")
-        if st.button("🚀 Negotiate", type="primary", use_container_width=True):
-            if prompt:
-                with st.spinner("Agents negotiating..."):
-                    st.session_state['nego'] = asyncio.run(run_negotiation(prompt, budget, context))
-                    st.session_state['p'] = prompt
-                    st.session_state['b'] = budget
+        run = st.button("🚀 Negotiate", type="primary", use_container_width=True) and bool(prompt)
     
     with c2:
-        if 'nego' in st.session_state and st.session_state['nego']:
-            accepted_sessions = []
-            for b, s in st.session_state['nego']:
-                if str(s.status.value) == 'accepted':
-                    info = get_accepted_offer_info(s)
-                    if info:
-                        accepted_sessions.append((b, s, info))
-            
-            if accepted_sessions:
-                best = max(accepted_sessions, key=lambda x: x[2]['match'])
-                boutique, session, info = best
-                match_cls = "match-high" if info['match'] >= 0.85 else ("match-medium" if info['match'] >= 0.70 else "match-low")
-                
-                st.markdown(f'''<div class="best-header">
-                    <strong>Best Valid Offer: {boutique.store_name} (Option {info['bundle']})</strong><br/>
-                    <span class="match-score {match_cls}">{info['match']:.0%}</span> match · {info['distance']:.0%} distance · ${info['price']:.0f} ✓<br/>
-                    <small>Responded in {getattr(session, 'latency_ms', 0)}ms</small>
-                </div>''', unsafe_allow_html=True)
-            else:
-                st.warning("No valid offers within budget constraint")
+        best_slot = st.empty()
     
-    if 'nego' in st.session_state:
+    if run:
+        st.session_state['p'] = prompt
+        st.session_state['b'] = budget
+        st.session_state.pop('nego', None)
+        
         st.markdown("---")
         st.markdown("## 🤝 Negotiation Results")
-        tabs = st.tabs([s[0].store_name for s in st.session_state['nego']])
+        agents = boutique_agents()
+        tabs = dict(zip(agents, st.tabs([agent.name for agent in agents.values()])))
+        slots = {}
+        for store_id, tab in tabs.items():
+            with tab:
+                slots[store_id] = st.empty()
+                slots[store_id].info("Agents negotiating...")
         
-        for i, (boutique, session) in enumerate(st.session_state['nego']):
-            with tabs[i]:
-                l, r = st.columns([1, 2])
-                
-                accepted_info = get_accepted_offer_info(session)
-                
-                with l:
-                    st.plotly_chart(create_radar(boutique.vibe_center.axes), use_container_width=True)
-                    
-                    if accepted_info:
-                        m1, m2, m3 = st.columns(3)
-                        m1.metric("Match", f"{accepted_info['match']:.0%}")
-                        m2.metric("Turns", f"{getattr(session, 'turns_used', 1)}/{session.max_turns}")
-                        m3.metric("Latency", f"{getattr(session, 'latency_ms', 0)}ms")
-                        st.caption(f"Distance: {accepted_info['distance']:.0%} · Bundle: {accepted_info['bundle']}")
-                    else:
-                        m1, m2, m3 = st.columns(3)
-                        m1.metric("Match", "—")
-                        m2.metric("Turns", f"{getattr(session, 'turns_used', 1)}/{session.max_turns}")
-                        m3.metric("Latency", f"{getattr(session, 'latency_ms', 0)}ms")
-                    
-                    st.markdown(f"**Status:** {status_display(session.status)}", unsafe_allow_html=True)
-                
-                with r:
-                    st.markdown("### 💬 Transcript")
-                    render_transcript(negotiation_engine.get_transcript(session), session.store_name)
-                
-                if session.final_result and hasattr(session.final_result, 'accepted_products'):
-                    st.markdown("### 🛍️ Selected Items")
-                    cols = st.columns(min(3, len(session.final_result.accepted_products)))
-                    for j, p in enumerate(session.final_result.accepted_products):
-                        with cols[j % 3]:
-                            st.markdown(f'<div class="product-card"><strong>{p.name}</strong><br/><small>{p.category}</small><br/><div class="product-price">${p.price:.0f}</div></div>', unsafe_allow_html=True)
-                    
-                    st.markdown("---")
-                    receipt = vibe_receipt(session, boutique, st.session_state['p'], st.session_state['b'])
-                    st.download_button("📜 Export Vibe Receipt", json.dumps(receipt, indent=2), f"vibe_receipt_{session.store_id}.json", "application/json")
+        def on_session(boutique, session):
+            with slots[boutique.store_id].container():
+                render_session(boutique, session)
+        
+        st.session_state['nego'] = asyncio.run(run_negotiation(prompt, budget, context, on_session))
+        with best_slot.container():
+            render_best_offer(st.session_state['nego'])
     
-    st.markdown("---")
-    st.markdown("""
-    <div style="text-align:center;color:rgba(255,255,255,0.5);font-size:12px">
-        <strong>Protocol: Aura v0.1</strong><br/>
-        <em>"AURA turns aesthetics into a negotiable contract between agents."</em>
-    </div>
-    """, unsafe_allow_html=True)
+    elif st.session_state.get('nego'):
+        with best_slot.container():
+            render_best_offer(st.session_state['nego'])
+        
+        st.markdown("---")
+        st.markdown("## 🤝 Negotiation Results")
+        tabs = st.tabs([s[0].store_name for s in st.session_state['nego']])
+        for tab, (boutique, session) in zip(tabs, st.session_state['nego']):
+            with tab:
+                render_session(boutique, session)
+    
+    render_footer()
 
 
 if __name__ == "__main__":
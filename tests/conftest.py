@@ -0,0 +1,49 @@
+import os
+
+os.environ["AURA_DEMO_MODE"] = "true"
+os.environ["AURA_SIMULATE_LATENCY"] = "false"
+os.environ["AURA_EMBEDDING_BACKEND"] = ""
+os.environ["AURA_ARCHIVE_DIR"] = ""
+os.environ["AURA_CATALOG_DIR"] = ""
+
+import pytest
+
+from protocol_aura.agents import BoutiqueAgent, ShopperAgent
+from protocol_aura.core.inventory import InventoryService
+from protocol_aura.data.registry import CatalogRegistry
+from protocol_aura.data.sample_boutiques import SAMPLE_BOUTIQUES
+from protocol_aura.protocol import Mandate
+
+
+@pytest.fixture
+def registry() -> CatalogRegistry:
+    return CatalogRegistry(SAMPLE_BOUTIQUES)
+
+
+@pytest.fixture
+def inventory(registry) -> InventoryService:
+    return InventoryService(registry, ttl_seconds=60)
+
+
+@pytest.fixture
+def boutique(registry, inventory) -> BoutiqueAgent:
+    entry = registry.get("cyber-noir")
+    return BoutiqueAgent(
+        entry.store_id,
+        entry.manifold.store_name,
+        entry.manifold,
+        flexibility=0.6,
+        catalog=entry,
+        inventory=inventory,
+        history_limit=0,
+    )
+
+
+@pytest.fixture
+def shopper() -> ShopperAgent:
+    return ShopperAgent(
+        user_id="test-user",
+        user_name="Test Shopper",
+        mandate=Mandate(user_id="test-user", budget_cap=1000.0),
+        style_goal="Cyber CEO who codes at night",
+    )
@@ -0,0 +1,95 @@
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from protocol_aura.core.analytics import SessionAnalytics
+from protocol_aura.core.archive import SessionArchive
+from protocol_aura.core.negotiation import NegotiationSession
+
+
+def _session(created_at: datetime) -> NegotiationSession:
+    return NegotiationSession(
+        session_id=str(uuid.uuid4()),
+        shopper_id="test-user",
+        store_id="cyber-noir",
+        emotional_prompt="Cyber CEO who codes at night",
+        created_at=created_at,
+    )
+
+
+def _settle(archive: SessionArchive, age_s: float = 60, day: str = ""):
+    # Backdate day directories so they are past the settle window.
+    stamp = time.time() - age_s
+    for day_dir in archive.iter_days():
+        if not day or day_dir.name == day:
+            os.utime(day_dir, (stamp, stamp))
+
+
+def _scanned_days(archive: SessionArchive, monkeypatch) -> list[str]:
+    scanned = []
+    day_paths = archive.day_paths
+
+    def counting(day_dir):
+        scanned.append(day_dir.name)
+        return day_paths(day_dir)
+
+    monkeypatch.setattr(archive, "day_paths", counting)
+    return scanned
+
+
+def test_refresh_skips_unchanged_days(tmp_path, monkeypatch):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    for i in range(3):
+        archive.save(_session(datetime(2026, 10, 1) + timedelta(days=i)))
+    _settle(archive)
+
+    analytics = SessionAnalytics()
+    assert analytics.refresh(archive) == 3
+
+    scanned = _scanned_days(archive, monkeypatch)
+    assert analytics.refresh(archive) == 0
+    assert scanned == []
+
+
+def test_refresh_picks_up_new_files_in_changed_days(tmp_path, monkeypatch):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    for i in range(3):
+        archive.save(_session(datetime(2026, 10, 1) + timedelta(days=i)))
+    _settle(archive, age_s=120)
+    analytics = SessionAnalytics()
+    analytics.refresh(archive)
+
+    archive.save(_session(datetime(2026, 10, 2)))
+    _settle(archive, day="2026-10-02")
+    scanned = _scanned_days(archive, monkeypatch)
+    assert analytics.refresh(archive) == 1
+    assert scanned == ["2026-10-02"]
+    assert int(analytics.status_counts.sum()) == 4
+
+
+def test_recently_touched_days_are_rescanned(tmp_path, monkeypatch):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    archive.save(_session(datetime(2026, 10, 1)))
+    analytics = SessionAnalytics()
+    assert analytics.refresh(archive) == 1
+
+    scanned = _scanned_days(archive, monkeypatch)
+    assert analytics.refresh(archive) == 0
+    assert scanned == ["2026-10-01"]
+
+
+def test_cursors_survive_a_snapshot_round_trip(tmp_path, monkeypatch):
+    archive = SessionArchive(tmp_path / "archive", NegotiationSession)
+    for i in range(2):
+        archive.save(_session(datetime(2026, 10, 1) + timedelta(days=i)))
+    _settle(archive)
+    analytics = SessionAnalytics()
+    analytics.refresh(archive)
+    analytics.save(tmp_path / "analytics.npz")
+
+    restored = SessionAnalytics.load(tmp_path / "analytics.npz")
+    scanned = _scanned_days(archive, monkeypatch)
+    assert restored.refresh(archive) == 0
+    assert scanned == []
+    assert int(restored.status_counts.sum()) == 2
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from protocol_aura.api.main import app
+from protocol_aura.protocol import dump_message
+
+
+@pytest.mark.parametrize("constraints", [[1], "cheap", None, 3])
+def test_bad_constraints_delta_keeps_the_socket_open(shopper, constraints):
+    query = asyncio.run(shopper.create_query("Cyber CEO who codes at night"))
+    client = TestClient(app)
+    with client.websocket_connect("/ws/cyber-noir") as ws:
+        ws.send_text(dump_message(query).decode())
+        assert json.loads(ws.receive_text())["type"] == "AURA_OFFER"
+
+        ws.send_json({"type": "AURA_QUERY", "constraints": constraints})
+        reply = json.loads(ws.receive_text())
+        assert reply["type"] == "AURA_REJECT"
+        assert "constraints must be a JSON object" in reply["reason"]
+
+        ws.send_json({"type": "AURA_QUERY", "constraints": {"max_budget": 300}})
+        assert json.loads(ws.receive_text())["type"] == "AURA_OFFER"
+
+
+def _accepted_session(client: TestClient) -> str:
+    response = client.post("/negotiate", json={
+        "emotional_prompt": "Cyber CEO who codes at night",
+        "budget": 1000,
+        "target_stores": ["cyber-noir"],
+    })
+    assert response.json()["status"] == "accepted"
+    return response.json()["session_id"]
+
+
+@pytest.mark.parametrize("action,status", [("confirm", "confirmed"), ("cancel", "cancelled")])
+def test_accepted_hold_is_settled_once(action, status):
+    client = TestClient(app)
+    session_id = _accepted_session(client)
+
+    first = client.post(f"/sessions/{session_id}/{action}")
+    assert first.status_code == 200
+    assert first.json()["status"] == status
+    assert client.post(f"/sessions/{session_id}/{action}").status_code == 409
+    assert client.post("/sessions/no-such-session/cancel").status_code == 404
+
+
+def _forged_accept(offer: dict, bundle: str) -> dict:
+    return {
+        "type": "AURA_ACCEPT",
+        "shopper_id": offer["shopper_id"],
+        "store_id": offer["store_id"],
+        "accepted_bundle": bundle,
+        "accepted_products": [],
+        "final_vibe": offer["option_a"]["achievable_vibe"],
+        "total_price": 1.0,
+    }
+
+
+def test_socket_accept_takes_products_and_price_from_the_offer(shopper):
+    query = asyncio.run(shopper.create_query("Cyber CEO who codes at night"))
+    with TestClient(app).websocket_connect("/ws/cyber-noir") as ws:
+        ws.send_text(dump_message(query).decode())
+        offer = json.loads(ws.receive_text())
+
+        ws.send_json(_forged_accept(offer, "Z"))
+        reply = json.loads(ws.receive_text())
+        assert reply["type"] == "AURA_REJECT"
+        assert "no bundle 'Z'" in reply["reason"]
+
+        ws.send_json(_forged_accept(offer, "A"))
+        accepted = json.loads(ws.receive_text())
+
+    assert accepted["type"] == "AURA_ACCEPT"
+    assert accepted["total_price"] == offer["option_a"]["total_price"]
+    assert [p["id"] for p in accepted["accepted_products"]] == [p["id"] for p in offer["option_a"]["products"]]
+    assert accepted["in_reply_to"] == offer["message_id"]
+
+
+def test_engine_refuses_an_accept_without_an_offer(shopper, boutique):
+    from protocol_aura.core.negotiation import NegotiationEngine
+    from protocol_aura.protocol import AuraAccept
+
+    engine = NegotiationEngine(max_sessions=8)
+    session = engine.open_session(shopper.agent_id, boutique)
+    offer = asyncio.run(boutique.process_message(asyncio.run(shopper.create_query("Cyber CEO who codes at night"))))
+    accept = AuraAccept(
+        shopper_id=shopper.agent_id,
+        store_id=boutique.agent_id,
+        accepted_products=offer.option_a.products,
+        final_vibe=offer.option_a.achievable_vibe,
+        total_price=1.0,
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(engine.handle_turn(session, boutique, accept))
+    assert session.rounds == []
+
+
+def test_memory_growth_probe_leaves_live_state_alone(monkeypatch):
+    from protocol_aura.core.analytics import session_analytics
+    from protocol_aura.core.config import settings
+    from protocol_aura.core.inventory import inventory_service
+    from protocol_aura.core.metrics import metrics
+    from protocol_aura.core.negotiation import negotiation_engine
+
+    def negotiations_total():
+        return [line for line in metrics.render().splitlines() if line.startswith("aura_negotiations_total")]
+
+    monkeypatch.setattr(settings, "diagnostics_enabled", True)
+    sessions = list(negotiation_engine.sessions)
+    totals = negotiations_total()
+    observed = int(session_analytics.status_counts.sum())
+    held = inventory_service.held("cyber-noir")
+
+    response = TestClient(app).post("/debug/memory/growth", params={"iterations": 2, "store_id": "cyber-noir"})
+
+    assert response.status_code == 200
+    assert response.json()["iterations"] == 2
+    assert list(negotiation_engine.sessions) == sessions
+    assert negotiations_total() == totals
+    assert int(session_analytics.status_counts.sum()) == observed
+    assert inventory_service.held("cyber-noir") == held
@@ -0,0 +1,48 @@
+import shutil
+import uuid
+from datetime import datetime, timedelta
+
+from protocol_aura.core.archive import INDEX_DIR, SessionArchive
+from protocol_aura.core.negotiation import NegotiationSession
+
+
+def _session(created_at: datetime) -> NegotiationSession:
+    return NegotiationSession(
+        session_id=str(uuid.uuid4()),
+        shopper_id="test-user",
+        store_id="cyber-noir",
+        emotional_prompt="Cyber CEO who codes at night",
+        created_at=created_at,
+    )
+
+
+def test_load_finds_sessions_across_days(tmp_path):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    sessions = [_session(datetime(2026, 10, 1) + timedelta(days=i)) for i in range(3)]
+    for session in sessions:
+        archive.save(session)
+
+    for session in sessions:
+        assert archive.load(session.session_id).session_id == session.session_id
+    assert archive.load(str(uuid.uuid4())) is None
+
+
+def test_load_ignores_glob_patterns_and_non_uuid_ids(tmp_path):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    session = _session(datetime(2026, 10, 1))
+    archive.save(session)
+
+    for session_id in ("*", "[0-9a-f]*", "*/*", "../ids", session.session_id.upper(), session.session_id[:8]):
+        assert archive.load(session_id) is None
+
+
+def test_archives_without_an_index_are_reindexed_once(tmp_path):
+    archive = SessionArchive(tmp_path, NegotiationSession)
+    session = _session(datetime(2026, 10, 1))
+    path = archive.save(session)
+    shutil.rmtree(tmp_path / INDEX_DIR)
+
+    reopened = SessionArchive(tmp_path, NegotiationSession)
+    assert reopened.load(session.session_id).session_id == session.session_id
+    assert reopened.index_path(session.session_id).exists()
+    assert [p.name for p in reopened.iter_paths()] == [path.name]
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+PROMPT = "Cyber CEO who codes at night"
+
+
+def _catalog_check(boutique, shopper, **constraints):
+    query = asyncio.run(shopper.create_query(PROMPT))
+    query = query.model_copy(update={"constraints": query.constraints.model_copy(update=constraints)})
+    offer = asyncio.run(boutique.process_message(query))
+    return next((c for c in offer.option_a.constraint_checks if c.constraint == "catalog"), None)
+
+
+def test_catalog_check_leaves_out_delivery_when_not_requested(boutique, shopper):
+    check = _catalog_check(boutique, shopper, min_rating=1.0)
+    assert check.required_value == "rating ≥1"
+
+
+@pytest.mark.parametrize("constraints", [{"delivery_days_max": 5}, {"min_rating": 1.0, "delivery_days_max": 5}])
+def test_catalog_check_lists_a_requested_delivery_limit(boutique, shopper, constraints):
+    check = _catalog_check(boutique, shopper, **constraints)
+    assert check.required_value.endswith("delivery ≤5d")
+
+
+def test_no_catalog_check_without_catalog_constraints(boutique, shopper):
+    assert _catalog_check(boutique, shopper) is None
+
+
+@pytest.mark.parametrize("history_limit,kept", [(None, 3), (2, 2), (0, 0)])
+def test_conversation_history_is_a_bounded_deque(registry, history_limit, kept):
+    from collections import deque
+
+    from protocol_aura.agents import BoutiqueAgent
+
+    entry = registry.get("cyber-noir")
+    agent = BoutiqueAgent(entry.store_id, entry.manifold.store_name, entry.manifold, history_limit=history_limit)
+    for message in ("q1", "q2", "q3"):
+        agent.log_message(message)
+
+    assert isinstance(agent.conversation_history, deque)
+    assert agent.conversation_history.maxlen == history_limit
+    assert list(agent.conversation_history) == ["q1", "q2", "q3"][3 - kept:]
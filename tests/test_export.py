@@ -0,0 +1,52 @@
+import asyncio
+
+from protocol_aura.core.export import iter_export, iter_export_sessions, read_export
+from protocol_aura.core.negotiation import NegotiationEngine
+from protocol_aura.core.receipts import build_receipt
+
+PROMPT = "Cyber CEO who codes at night"
+
+
+def test_export_snapshots_sessions_before_streaming(boutique, shopper):
+    engine = NegotiationEngine(max_sessions=4)
+
+    async def negotiate():
+        return await engine.start_negotiation(shopper, boutique, PROMPT)
+
+    first = [asyncio.run(negotiate()) for _ in range(4)]
+    sessions = iter_export_sessions(engine.sessions.values())
+    # The engine keeps registering (and evicting) while the export is drained.
+    later = [asyncio.run(negotiate()) for _ in range(4)]
+
+    exported = [session.session_id for session in sessions]
+    assert exported == [session.session_id for session in first]
+    assert set(engine.sessions) == {session.session_id for session in later}
+
+
+def test_export_round_trips_through_gzip(tmp_path, boutique, shopper):
+    engine = NegotiationEngine(max_sessions=8)
+    sessions = [asyncio.run(engine.start_negotiation(shopper, boutique, PROMPT)) for _ in range(3)]
+    path = tmp_path / "sessions.jsonl.gz"
+    path.write_bytes(b"".join(iter_export(sessions, engine)))
+
+    records = list(read_export(path))
+    assert [record["session_id"] for record in records] == [session.session_id for session in sessions]
+    assert all(record["receipt"]["tree_size"] == session.transcript_size for record, session in zip(records, sessions))
+
+
+def test_open_sessions_are_left_out_unless_asked_for(boutique, shopper):
+    engine = NegotiationEngine(max_sessions=8)
+    finished = asyncio.run(engine.start_negotiation(shopper, boutique, PROMPT))
+    open_session = engine.open_session(shopper.agent_id, boutique, PROMPT)
+    asyncio.run(engine.handle_turn(open_session, boutique, asyncio.run(shopper.create_query(PROMPT))))
+
+    assert [s.session_id for s in iter_export_sessions(engine.sessions.values())] == [finished.session_id]
+
+    exported = list(iter_export_sessions(engine.sessions.values(), include_open=True))
+    snapshot = exported[1]
+    root = snapshot.transcript_root
+    # The live session moves on; the exported copy keeps the rounds it was taken with.
+    asyncio.run(engine.handle_turn(open_session, boutique, asyncio.run(shopper.create_query(PROMPT))))
+
+    assert snapshot is not open_session and len(snapshot.rounds) == 1
+    assert build_receipt(snapshot).root == root != open_session.transcript_root
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import pytest
+
+from protocol_aura.protocol.embeddings import vibe_service
+from protocol_aura.protocol.gateway import GatewayClient, MicroBatcher, drive
+
+
+def test_micro_batcher_coalesces_duplicates_into_one_batch():
+    sent = []
+
+    async def send(texts):
+        sent.append(texts)
+        return [text.upper() for text in texts]
+
+    async def go():
+        batcher = MicroBatcher(send, window_s=0.01, max_batch=64)
+        return await asyncio.gather(*(batcher.submit(text) for text in ["a", "b", "a", "c"]))
+
+    assert asyncio.run(go()) == ["A", "B", "A", "C"]
+    assert sent == [["a", "b", "c"]]
+
+
+def test_micro_batcher_fails_every_waiter_of_a_failed_batch():
+    async def send(texts):
+        raise ValueError("bad batch")
+
+    async def go():
+        batcher = MicroBatcher(send, window_s=0.01, max_batch=64)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("a"), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(go())] == [ValueError, ValueError]
+
+
+def test_drive_counts_malformed_responses_as_errors():
+    class Client:
+        async def vibe(self, text):
+            if text.startswith("bad"):
+                raise ValueError("Gateway returned 0 vibes for 1 texts")
+
+    report = asyncio.run(drive(Client(), ["ok 1", "bad 1", "ok 2", "bad 2"], concurrency=2))
+
+    assert report["requests"] == 4
+    assert report["errors"] == 2
+
+
+def test_each_loop_posts_through_its_own_pool(monkeypatch):
+    client = GatewayClient("http://127.0.0.1:9")
+    used = []
+
+    async def post(pool, path, body):
+        used.append((asyncio.get_running_loop(), pool))
+        await asyncio.sleep(0.01)
+        return {"vibes": [{"axes": {}, "description": text} for text in body["texts"]]}
+
+    monkeypatch.setattr(client, "_post", post)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def score(text):
+            return await client.score(text), client._states[asyncio.get_running_loop()].client
+
+        # The first loop's batch is still in flight when the second loop binds.
+        pending = asyncio.run_coroutine_threadsafe(score("first"), loop)
+        second, second_pool = asyncio.run(score("second"))
+        first, first_pool = pending.result(timeout=5)
+
+        assert (first["description"], second["description"]) == ("first", "second")
+        assert first_pool is not second_pool
+        assert (loop, first_pool) in used
+        assert {pool for _, pool in used} == {first_pool, second_pool}
+        assert not first_pool.is_closed
+
+        # Pools of loops that have since closed are dropped when the next loop binds.
+        asyncio.run(score("third"))
+        assert loop in client._states and len(client._states) == 2
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+@pytest.mark.parametrize("text", ["Cyber CEO who codes at night", "cozy vintage jazz dinner"])
+def test_gateway_server_scores_with_the_public_scorer(text):
+    from fastapi.testclient import TestClient
+    from protocol_aura.api.gateway_server import app
+
+    response = TestClient(app).post("/v1/vibes", json={"texts": [text]})
+
+    assert response.status_code == 200
+    scored = response.json()["vibes"][0]
+    axes, _ = vibe_service.score_axes(text)
+    assert set(scored["axes"]) == set(axes)
+    assert scored["description"]
@@ -0,0 +1,176 @@
+import asyncio
+from collections import Counter
+
+from protocol_aura.agents import BoutiqueAgent
+from protocol_aura.core.config import settings
+from protocol_aura.core.inventory import InventoryService
+from protocol_aura.core.negotiation import NegotiationEngine, NegotiationStatus
+from protocol_aura.protocol import AuraAccept, AuraReject
+
+PROMPT = "Cyber CEO who codes at night"
+
+
+def test_reserve_holds_stock_until_released(registry, inventory):
+    entry = registry.get("cyber-noir")
+    row = entry.row_of("cn002")
+    stock = int(entry.stock[row])
+
+    assert inventory.reserve(entry, ["cn002"] * stock, "s1") is not None
+    assert inventory.held("cyber-noir") == {"cn002": stock}
+    assert not inventory.in_stock_mask(entry)[row]
+    assert inventory.reserve(entry, ["cn002"], "s2") is None
+
+    assert inventory.release("cyber-noir", "s1") is not None
+    assert inventory.held("cyber-noir") == {}
+    assert inventory.in_stock_mask(entry)[row]
+    assert inventory.reserve(entry, ["cn002"], "s2") is not None
+
+
+def test_re_reserving_a_session_replaces_its_hold(registry, inventory):
+    entry = registry.get("cyber-noir")
+    inventory.reserve(entry, ["cn001", "cn002"], "s1")
+    inventory.reserve(entry, ["cn003"], "s1")
+    assert inventory.held("cyber-noir") == {"cn003": 1}
+
+
+def test_expired_reservation_frees_stock(registry):
+    inventory = InventoryService(registry, ttl_seconds=0)
+    entry = registry.get("cyber-noir")
+    row = entry.row_of("cn002")
+
+    assert inventory.reserve(entry, ["cn002"] * int(entry.stock[row]), "s1") is not None
+    assert inventory.get_reservation("cyber-noir", "s1") is None
+    assert inventory.held("cyber-noir") == {}
+    assert inventory.in_stock_mask(entry)[row]
+    assert inventory.commit("cyber-noir", "s1") is None
+
+
+def test_commit_decrements_catalog_stock(registry, inventory):
+    entry = registry.get("cyber-noir")
+    stock = int(entry.stock[entry.row_of("cn001")])
+
+    inventory.reserve(entry, ["cn001", "cn001"], "s1")
+    assert inventory.commit("cyber-noir", "s1") is not None
+
+    updated = registry.get("cyber-noir")
+    assert int(updated.stock[updated.row_of("cn001")]) == stock - 2
+    assert int(entry.stock[entry.row_of("cn001")]) == stock
+    assert inventory.held("cyber-noir") == {}
+
+
+def _boutique(registry, inventory) -> BoutiqueAgent:
+    entry = registry.get("cyber-noir")
+    return BoutiqueAgent(
+        entry.store_id,
+        entry.manifold.store_name,
+        entry.manifold,
+        flexibility=0.6,
+        catalog=entry,
+        inventory=inventory,
+        history_limit=0,
+    )
+
+
+def test_repeated_accepts_cannot_take_the_last_unit_twice(registry, inventory, shopper):
+    registry.apply("cyber-noir", stock={product_id: 1 for product_id in registry.get("cyber-noir").product_ids})
+    boutique = _boutique(registry, inventory)
+    engine = NegotiationEngine(max_sessions=64)
+
+    async def negotiate():
+        return [await engine.start_negotiation(shopper, boutique, PROMPT) for _ in range(40)]
+
+    sessions = asyncio.run(negotiate())
+    accepted = [session for session in sessions if session.status == NegotiationStatus.ACCEPTED]
+    sold = Counter(p.id for session in accepted for p in session.final_result.accepted_products)
+
+    assert accepted and len(accepted) < len(sessions)
+    assert max(sold.values()) == 1
+    assert inventory.held("cyber-noir") == dict(sold)
+    assert all(inventory.get_reservation("cyber-noir", s.session_id).reservation_id == s.reservation_id for s in accepted)
+
+
+def test_confirm_commits_and_cancel_releases_an_accepted_hold(registry, inventory, boutique, shopper):
+    engine = NegotiationEngine(max_sessions=8)
+    before = registry.get("cyber-noir")
+
+    async def go():
+        kept = await engine.start_negotiation(shopper, boutique, PROMPT)
+        dropped = await engine.start_negotiation(shopper, boutique, PROMPT)
+        return kept, dropped, await engine.confirm(kept, boutique), await engine.cancel(dropped, boutique)
+
+    kept, dropped, confirmed, cancelled = asyncio.run(go())
+    assert confirmed.reservation_id == kept.reservation_id
+    assert cancelled is not None and dropped.reservation_id == ""
+    assert inventory.held("cyber-noir") == {}
+
+    after = registry.get("cyber-noir")
+    for product in kept.final_result.accepted_products:
+        assert after.stock[after.row_of(product.id)] == before.stock[before.row_of(product.id)] - 1
+    assert asyncio.run(engine.confirm(kept, boutique)) is None
+
+
+def test_failed_re_reserve_keeps_the_existing_hold(registry, inventory):
+    entry = registry.get("cyber-noir")
+    stock = int(entry.stock[entry.row_of("cn002")])
+    inventory.reserve(entry, ["cn002"] * stock, "s1")
+
+    assert inventory.reserve(entry, ["cn002"] * (stock + 1), "s1") is None
+    assert inventory.held("cyber-noir") == {"cn002": stock}
+    assert inventory.reserve(entry, ["cn002"] * stock + ["cn001"], "s1") is not None
+    assert inventory.held("cyber-noir") == {"cn002": stock, "cn001": 1}
+
+
+def test_accepts_commit_stock_when_configured(registry, inventory, boutique, shopper, monkeypatch):
+    monkeypatch.setattr(settings, "commit_accepted_stock", True)
+    before = registry.get("cyber-noir")
+
+    session = asyncio.run(NegotiationEngine(max_sessions=8).start_negotiation(shopper, boutique, PROMPT))
+    assert session.status == NegotiationStatus.ACCEPTED
+    assert inventory.held("cyber-noir") == {}
+
+    after = registry.get("cyber-noir")
+    for product in session.final_result.accepted_products:
+        assert after.stock[after.row_of(product.id)] == before.stock[before.row_of(product.id)] - 1
+
+
+def test_implicit_accept_goes_through_the_store(registry, inventory, boutique, shopper):
+    class Undecided(type(shopper)):
+        async def process_message(self, message):
+            return None
+
+    undecided = Undecided(shopper.agent_id, shopper.name, shopper.mandate, shopper.style_goal)
+    entry = registry.get("cyber-noir")
+    for product_id in entry.product_ids:
+        other = f"hold-{product_id}"
+        inventory.reserve(entry, [product_id] * int(entry.stock[entry.row_of(product_id)]), other)
+    inventory.release("cyber-noir", "hold-cn001")
+
+    session = asyncio.run(NegotiationEngine(max_sessions=8).start_negotiation(undecided, boutique, PROMPT))
+    assert isinstance(session.final_result, AuraAccept)
+    assert session.status == NegotiationStatus.ACCEPTED
+    assert session.reservation_id
+    assert inventory.get_reservation("cyber-noir", session.session_id).items == {"cn001": 1}
+
+
+def test_sold_out_store_rejects_instead_of_offering(registry, inventory, boutique, shopper):
+    entry = registry.get("cyber-noir")
+    for product_id in entry.product_ids:
+        inventory.reserve(entry, [product_id] * int(entry.stock[entry.row_of(product_id)]), f"hold-{product_id}")
+
+    session = asyncio.run(NegotiationEngine(max_sessions=8).start_negotiation(shopper, boutique, PROMPT))
+    assert session.status == NegotiationStatus.REJECTED
+    assert isinstance(session.rounds[0].store_message, AuraReject)
+    assert len(session.rounds) == 1
+
+
+def test_budget_fallback_only_offers_in_stock_rows(registry, inventory, boutique, shopper):
+    entry = registry.get("cyber-noir")
+    query = asyncio.run(shopper.create_query(PROMPT))
+    query = query.model_copy(update={"constraints": query.constraints.model_copy(update={"categories": ["no-such-category"]})})
+    cheapest = entry.products[int(entry.price_order[0])].id
+    inventory.reserve(entry, [cheapest] * int(entry.stock[entry.row_of(cheapest)]), "hold")
+
+    offer = asyncio.run(boutique.process_message(query))
+    held = inventory.held("cyber-noir")
+    assert [p.id for p in offer.option_a.products] != [cheapest]
+    assert all(held.get(p.id, 0) < entry.stock[entry.row_of(p.id)] for p in offer.option_a.products)
@@ -0,0 +1,28 @@
+from protocol_aura.agents import BoutiqueAgent
+from protocol_aura.data.loader import ProductTable, load_catalog
+from protocol_aura.data.synthetic import write_synthetic_catalog
+from protocol_aura.protocol import AuraProfile, decode_message, dump_message, encode_message, parse_message
+from protocol_aura.protocol.models import BrandManifold
+
+
+def test_bulk_loaded_manifold_serializes_its_products(tmp_path):
+    write_synthetic_catalog(tmp_path, 200, 16)
+    manifold = load_catalog(tmp_path)
+    assert isinstance(manifold.products, ProductTable)
+
+    restored = BrandManifold.model_validate_json(manifold.model_dump_json())
+    assert [p.id for p in restored.products] == manifold.products.ids
+    assert restored.products[7] == manifold.products[7]
+    assert len(manifold.model_dump()["products"]) == 200
+
+
+def test_bulk_loaded_boutique_profile_goes_over_the_wire(tmp_path):
+    write_synthetic_catalog(tmp_path, 200, 16)
+    manifold = load_catalog(tmp_path)
+    boutique = BoutiqueAgent(manifold.store_id, manifold.store_name, manifold, history_limit=0)
+    profile = boutique.get_profile()
+
+    for decoded in (parse_message(dump_message(profile)), decode_message(encode_message(profile))):
+        assert isinstance(decoded, AuraProfile)
+        assert len(decoded.manifold.products) == 200
+        assert [p.id for p in decoded.featured_products] == manifold.products.ids[:5]
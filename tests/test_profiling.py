@@ -0,0 +1,47 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from protocol_aura.api.profiling import PACKAGE_DIR, _SamplingRun
+
+
+ENGINE = str(Path(PACKAGE_DIR) / "core" / "negotiation.py")
+MODELS = str(Path(PACKAGE_DIR) / "protocol" / "models.py")
+
+
+def _frame(function: str, file_path: str, time: float, *children) -> SimpleNamespace:
+    return SimpleNamespace(function=function, file_path=file_path, line_no=1, time=time, children=list(children))
+
+
+def _run(root) -> _SamplingRun:
+    run = _SamplingRun.__new__(_SamplingRun)
+    run.session = SimpleNamespace(root_frame=lambda: root)
+    return run
+
+
+def test_sampling_summary_ranks_package_frames_by_cumulative_time():
+    root = _frame(
+        "run", "/usr/lib/python3/asyncio/events.py", 1.0,
+        _frame(
+            "start", ENGINE, 0.9,
+            _frame("score", MODELS, 0.3, _frame("dot", "/site-packages/numpy/core.py", 0.25)),
+            _frame("score", MODELS, 0.2),
+            _frame("json", "/usr/lib/python3/json/encoder.py", 0.35),
+        ),
+    )
+
+    top = _run(root).top_functions(5)
+
+    assert [name for name, _ in top] == ["start (negotiation.py:1)", "score (models.py:1)"]
+    assert top[1][1] == 0.5
+
+
+def test_recursive_frames_are_counted_once():
+    root = _frame("walk", ENGINE, 1.0, _frame("walk", ENGINE, 0.8, _frame("walk", ENGINE, 0.5)))
+
+    assert _run(root).top_functions(5) == [("walk (negotiation.py:1)", 1.0)]
+
+
+def test_summary_falls_back_to_all_frames_without_package_frames():
+    root = _frame("run", "/usr/lib/python3/asyncio/events.py", 1.0)
+
+    assert _run(root).top_functions(5) == [("run (events.py:1)", 1.0)]
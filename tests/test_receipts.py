@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from protocol_aura.core.negotiation import NegotiationEngine
+from protocol_aura.core.receipts import (
+    EMPTY_ROOT,
+    MerkleLog,
+    _subtree_root,
+    build_receipt,
+    leaf_hash,
+    prove_message,
+    verify_inclusion,
+    verify_proof,
+    verify_receipt,
+    verify_receipts,
+)
+
+PROMPT = "Cyber CEO who codes at night"
+
+
+def _leaves(size: int) -> list[bytes]:
+    return [leaf_hash(f"message {i}".encode()) for i in range(size)]
+
+
+@pytest.fixture
+def session(shopper, boutique):
+    return asyncio.run(NegotiationEngine(max_sessions=8).start_negotiation(shopper, boutique, PROMPT))
+
+
+@pytest.mark.parametrize("size", range(0, 18))
+def test_incremental_root_matches_the_recursive_root(size):
+    leaves = _leaves(size)
+    assert MerkleLog(leaves).root() == _subtree_root(leaves)
+
+
+def test_empty_log_has_the_empty_root():
+    assert MerkleLog().root() == EMPTY_ROOT == hashlib.sha256(b"").digest()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13, 17])
+def test_every_leaf_has_a_valid_inclusion_proof(size):
+    leaves = _leaves(size)
+    log = MerkleLog(leaves)
+    root = log.root()
+    for index, leaf in enumerate(leaves):
+        assert verify_inclusion(leaf, index, size, log.proof(index), root)
+
+
+def test_inclusion_proofs_reject_tampering():
+    leaves = _leaves(7)
+    log = MerkleLog(leaves)
+    root, path = log.root(), log.proof(3)
+
+    assert not verify_inclusion(leaf_hash(b"forged"), 3, 7, path, root)
+    assert not verify_inclusion(leaves[3], 4, 7, path, root)
+    assert not verify_inclusion(leaves[3], 3, 4, path, root)
+    assert not verify_inclusion(leaves[3], 3, 7, path[:-1], root)
+    assert not verify_inclusion(leaves[3], 3, 7, [*path, path[0]], root)
+    assert not verify_inclusion(leaves[3], 3, 7, [bytes(32), *path[1:]], root)
+    assert not verify_inclusion(leaves[3], 7, 7, path, root)
+    with pytest.raises(IndexError):
+        log.proof(7)
+
+
+def test_session_messages_prove_against_the_recorded_root(session):
+    assert session.transcript_size >= 2
+    for index in range(session.transcript_size):
+        proof = prove_message(session, index)
+        assert proof.root == session.transcript_root
+        assert verify_proof(proof)
+        assert not verify_proof(proof.model_copy(update={"message": proof.message[:-1] + " }"}))
+
+
+def test_receipts_verify_against_their_sessions(session, shopper, boutique):
+    other = asyncio.run(NegotiationEngine(max_sessions=8).start_negotiation(shopper, boutique, PROMPT))
+    receipt = build_receipt(session)
+
+    assert verify_receipt(receipt)
+    assert verify_receipt(receipt, session)
+    assert not verify_receipt(receipt, other)
+    assert not verify_receipt(receipt.model_copy(update={"root": "00" * 32}))
+    assert not verify_receipt(receipt.model_copy(update={"leaf_hashes": receipt.leaf_hashes[:-1]}))
+
+    receipts = [receipt, build_receipt(other)]
+    assert verify_receipts(receipts, {session.session_id: session, other.session_id: other}) == [True, True]
+    assert verify_receipts(receipts, {session.session_id: session}) == [True, False]
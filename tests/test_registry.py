@@ -0,0 +1,85 @@
+from protocol_aura.data.registry import CatalogEntry
+from protocol_aura.protocol import Product
+
+
+def _product(product_id: str, price: float = 99.0) -> Product:
+    return Product(
+        id=product_id,
+        name=f"Test {product_id}",
+        price=price,
+        category="accessories",
+        description="Test product",
+        stock=3,
+    )
+
+
+def _snapshot(entry: CatalogEntry) -> dict:
+    return {
+        "size": entry.size,
+        "ids": list(entry.product_ids),
+        "row_index": dict(entry.row_index),
+        "prices": entry.prices.copy(),
+        "stock": entry.stock.copy(),
+        "active": entry.active.copy(),
+        "price_order": entry.price_order.copy(),
+        "products": [p.model_dump() for p in entry.manifold.products],
+    }
+
+
+def _assert_unchanged(entry: CatalogEntry, before: dict):
+    after = _snapshot(entry)
+    assert after["size"] == before["size"]
+    assert after["ids"] == before["ids"]
+    assert after["row_index"] == before["row_index"]
+    assert after["products"] == before["products"]
+    for key in ("prices", "stock", "active", "price_order"):
+        assert (after[key] == before[key]).all(), key
+
+
+def test_apply_leaves_the_previous_snapshot_untouched(registry):
+    old = registry.get("cyber-noir")
+    before = _snapshot(old)
+
+    new = registry.apply(
+        "cyber-noir",
+        prices={"cn001": 1.0},
+        stock={"cn002": 0},
+        upserts=[_product("new-1"), _product("new-2")],
+        deletes=["cn003"],
+    )
+
+    _assert_unchanged(old, before)
+    assert old.row_of("new-1") is None
+    assert old.product("cn003") is not None
+    assert registry.get("cyber-noir") is new
+    assert new.product("new-1").price == 99.0
+    assert new.product("cn001").price == 1.0
+    assert new.product("cn003") is None
+    assert len(new.product_ids) == new.size == old.size + 2
+
+
+def test_branches_from_one_snapshot_are_independent(registry):
+    base = registry.get("cyber-noir")
+    before = _snapshot(base)
+
+    left = base.apply(upserts=[_product("left", 10.0)])
+    right = base.apply(upserts=[_product("right", 20.0)])
+
+    _assert_unchanged(base, before)
+    assert left.product("left") is not None and left.row_of("right") is None
+    assert right.product("right") is not None and right.row_of("left") is None
+    assert left.row_of("left") == right.row_of("right") == base.size
+    assert "right" not in left.row_index and "left" not in right.row_index
+
+
+def test_readers_keep_their_generation_across_compaction(registry):
+    old = registry.get("cyber-noir")
+    before = _snapshot(old)
+    for i in range(40):
+        registry.apply("cyber-noir", upserts=[_product(f"bulk-{i}", 5.0 + i)])
+    compacted = registry.compact("cyber-noir")
+
+    _assert_unchanged(old, before)
+    assert compacted.pending_changes == 0
+    assert compacted.product("bulk-39").price == 44.0
+    assert [compacted.products[r].id for r in compacted.price_order[:1]] == ["bulk-0"]
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import random
+import struct
+
+import pytest
+from fastapi.testclient import TestClient
+
+from protocol_aura.protocol import (
+    AURA_CONTENT_TYPE,
+    AuraAccept,
+    decode_message,
+    decode_payload,
+    dump_message,
+    encode_message,
+    encode_payload,
+    parse_message,
+)
+from protocol_aura.protocol.wire import MAGIC, VERSION, _HEADER
+
+PROMPT = "Cyber CEO who codes at night"
+
+
+@pytest.fixture
+def offer(boutique, shopper):
+    query = asyncio.run(shopper.create_query(PROMPT))
+    return asyncio.run(boutique.process_message(query))
+
+
+def _frame(header: object, blobs: bytes = b"") -> bytes:
+    raw = json.dumps(header).encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, len(raw)) + raw + blobs
+
+
+def test_message_round_trip(offer):
+    decoded = decode_message(encode_message(offer))
+    assert dump_message(decoded) == dump_message(offer)
+
+
+def test_payload_round_trip_keeps_embedding_precision():
+    payload = {
+        "single": {"embedding": [0.5, -1.25, 3.0]},
+        "double": {"embedding": [0.1, 0.2]},
+        "zeros": {"embedding": [0.0] * 8},
+        "products": [{"id": "a", "vibe_vector": {"embedding": [0.5, -1.25, 3.0]}}] * 3,
+    }
+    encoded = encode_payload(payload)
+    assert decode_payload(encoded) == payload
+    assert len(encoded) < len(json.dumps(payload))
+
+
+def test_truncated_frames_raise_value_error(offer):
+    encoded = encode_message(offer)
+    for size in range(len(encoded)):
+        try:
+            decode_message(encoded[:size])
+        except ValueError:
+            continue
+        pytest.fail(f"decoding {size} of {len(encoded)} bytes did not raise")
+
+
+def test_garbage_frames_raise_value_error():
+    rng = random.Random(7)
+    prefix = _HEADER.pack(MAGIC, VERSION, 4)
+    for _ in range(500):
+        noise = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 64)))
+        for frame in (noise, prefix + noise):
+            with pytest.raises(ValueError):
+                decode_payload(frame)
+
+
+@pytest.mark.parametrize("frame", [
+    _frame([]),
+    _frame({"body": {}}),
+    _frame({"products": []}),
+    _frame({"body": {"embedding": 3}, "products": []}),
+    _frame({"body": {"products": [5]}, "products": []}),
+    _frame({"body": {"products": ["x"]}, "products": []}),
+    _frame({"body": {"products": [0]}, "products": ["not a product"]}, b""),
+    _frame({"body": {}, "products": []}, b"f"),
+    _frame({"body": {}, "products": []}, struct.pack("<cI", b"f", 1000)),
+    _frame({"body": {}, "products": []}, struct.pack("<cI", b"q", 1)),
+    _HEADER.pack(MAGIC, VERSION, 1 << 20) + b"{}",
+])
+def test_malformed_frames_raise_value_error(frame):
+    with pytest.raises(ValueError):
+        decode_message(frame)
+
+
+def test_malformed_frame_is_a_client_error():
+    from protocol_aura.api.main import app
+
+    client = TestClient(app)
+    response = client.post(
+        "/boutiques/cyber-noir/messages",
+        content=_frame({"body": {"embedding": 9}, "products": []}),
+        headers={"content-type": AURA_CONTENT_TYPE},
+    )
+    assert response.status_code == 422
+    assert "Malformed AURA frame" in response.json()["detail"]
+
+
+def test_stateless_endpoint_refuses_accepts(offer):
+    from protocol_aura.api.main import app
+    from protocol_aura.core.inventory import inventory_service
+
+    accept = AuraAccept(
+        shopper_id=offer.shopper_id,
+        store_id=offer.store_id,
+        session_id="stateless-accept",
+        accepted_bundle="A",
+        accepted_products=offer.option_a.products,
+        final_vibe=offer.option_a.achievable_vibe,
+        total_price=offer.option_a.total_price,
+    )
+    response = TestClient(app).post("/boutiques/cyber-noir/messages", content=dump_message(accept))
+
+    assert response.status_code == 422
+    assert inventory_service.get_reservation("cyber-noir", "stateless-accept") is None
+
+
+def _strict_loads(raw: bytes):
+    def reject(constant):
+        raise ValueError(f"non-JSON constant {constant}")
+
+    return json.loads(raw, parse_constant=reject)
+
+
+def test_unbounded_budget_is_null_on_the_wire(shopper):
+    query = asyncio.run(shopper.create_query(PROMPT))
+    query = query.model_copy(update={"constraints": query.constraints.model_copy(update={"max_budget": float("inf")})})
+
+    raw = dump_message(query)
+    assert _strict_loads(raw)["constraints"]["max_budget"] is None
+    assert parse_message(raw).constraints.max_budget == float("inf")
+    assert decode_message(encode_message(query)).constraints.max_budget == float("inf")